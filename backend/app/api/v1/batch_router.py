@@ -3,15 +3,14 @@
 from __future__ import annotations
 
 import json
-from pathlib import Path
 from typing import Dict, List
 
 from fastapi import APIRouter, HTTPException
-from celery.result import AsyncResult
 
-from workers.celery_app import celery_app  # Celery 인스턴스
-from config import RESULT_DIR              # ✅ 절대 경로 사용
+from utils import paths                    # 배치 경로(샤딩/레거시) 결정
 from utils.rcache import _r               # Redis 연결 재사용
+from utils.task_status import bulk_task_meta, cached  # 결과 키 일괄 조회 + 짧은 캐시
+from workers import batch_stats                       # 배치 집계 카운터 (O(1) 조회)
 
 router = APIRouter(prefix="/api/v1/batch", tags=["batch"])
 
@@ -19,8 +18,12 @@ def _batch_tasks_key(batch_id: str) -> str:
     return f"batch:{batch_id}:tasks"
 
 def _load_task_ids_from_meta(batch_id: str) -> List[str]:
-    """RESULT_DIR/{batch_id}.json에서 task_id 목록을 읽는다."""
-    meta_path = Path(RESULT_DIR) / f"{batch_id}.json"
+    """배치 메타(utils.paths.batch_meta_path)에서 task_id 목록을 읽는다."""
+    try:
+        meta_path = paths.batch_meta_path(batch_id)
+    except ValueError:
+        # 배치 id 규칙([\w-])에 안 맞으면 그런 배치는 없다
+        raise HTTPException(status_code=404, detail="batch meta not found")
     if not meta_path.exists():
         raise HTTPException(status_code=404, detail="batch meta not found")
 
@@ -46,9 +49,34 @@ def batch_status(batch_id: str):
       "done": 2,
       "progress": 0.6667,
       "by_state": { "PENDING": 0, "PROGRESS": 1, "STARTED": 0, "RETRY": 0, "FAILURE": 0, "REVOKED": 0, "SUCCESS": 2 },
-      "source": "redis" | "meta"
+      "percent": 45,
+      "source": "counters" | "redis" | "meta"
     }
+    집계 카운터(workers/batch_stats)가 있으면 작업 수와 무관하게 그 값만 읽고,
+    없으면(카운터 도입 이전 배치 등) 작업별 상태를 일괄 조회해 계산합니다.
+    같은 배치 요청은 PROGRESS_CACHE_TTL 동안 한 번 계산한 결과를 재사용합니다.
     """
+    return cached(("batch_status", batch_id), lambda: _batch_status(batch_id))
+
+
+def _batch_status(batch_id: str) -> dict:
+    agg = batch_stats.read(batch_id)
+    if agg and agg["total"] > 0:
+        total = agg["total"]
+        done = agg["success"] + agg["failure"]
+        return {
+            "batch_id": batch_id,
+            "total": total,
+            "done": done,
+            "progress": round(done / total, 4),
+            "by_state": {
+                "PENDING": agg["queued"], "PROGRESS": agg["progress"], "STARTED": 0, "RETRY": 0,
+                "FAILURE": agg["failure"], "REVOKED": 0, "SUCCESS": agg["success"],
+            },
+            "percent": min(100, agg["pct_sum"] // total),
+            "source": "counters",
+        }
+
     # 1) Redis 인덱스가 있으면 우선 사용
     redis_key = _batch_tasks_key(batch_id)
     ids: List[str] = []
@@ -69,6 +97,7 @@ def batch_status(batch_id: str):
             "done": 0,
             "progress": 0.0,
             "by_state": {},
+            "percent": 0,
             "source": source,
         }
 
@@ -77,16 +106,21 @@ def batch_status(batch_id: str):
     by_state: Dict[str, int] = {k: 0 for k in known_states}
     other_count = 0
     done = 0
+    pct_sum = 0
 
+    metas = bulk_task_meta(ids)
     for tid in ids:
-        r = AsyncResult(tid, app=celery_app)
-        state = (r.state or "PENDING").upper()
+        meta = metas.get(tid, {})
+        state = (meta.get("status") or "PENDING").upper()
         if state not in by_state:
             other_count += 1
             state = "PENDING"  # 알 수 없는 상태는 PENDING으로 흡수
         by_state[state] += 1
         if state in ("SUCCESS", "FAILURE", "REVOKED"):
             done += 1
+            pct_sum += 100
+        elif state == "PROGRESS" and isinstance(meta.get("result"), dict):
+            pct_sum += int(meta["result"].get("percent") or 0)
 
     progress = round(done / total, 4)
 
@@ -102,5 +136,6 @@ def batch_status(batch_id: str):
         "done": done,
         "progress": progress,
         "by_state": by_state,
+        "percent": min(100, pct_sum // total),
         "source": source,
     }
@@ -4,90 +4,391 @@ from __future__ import annotations
 
 import os
 import json
+import asyncio
+import logging
 from uuid import uuid4
 from typing import List, Optional
 from pathlib import Path
 from zipfile import ZipFile, BadZipFile
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Query
-from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Request, Body
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.datastructures import UploadFile as StarletteUploadFile
 
-from config import RESULT_DIR, ZIP_MAX_FILES, ZIP_MAX_BYTES, ALLOWED_SINGLE_EXTS
+from config import ZIP_MAX_FILES, ZIP_MAX_BYTES, ZIP_MAX_UNCOMPRESSED_BYTES, ALLOWED_SINGLE_EXTS
+from core.security import owner_key                  # u:<user_id> / ip:<host>
+from core.cost_model import estimate_cost             # 업로드 시점 비용 추정 → OCR 큐/시간 제한
+from utils import paths                               # 배치 메타/ZIP 경로(샤딩)
+from utils.result_store import atomic_write_json      # temp + rename
 from utils.file_manager import save_upload            # (abs_path, saved_name, sha) <- save_upload(upfile, batch_id)
-from workers.tasks import process_pdf                 # Celery task
+from utils import blob_store, upload_session          # 내용 주소 저장소 / 이어받기(resumable) 업로드
+from utils.file_manager import _is_allowed_ext, _target_path
+from workers import batch_stats, fair_queue                        # 공정 스케줄러 → process_pdf 투입
 from utils.rcache import get_ocr_text, _r             # Redis 연결 재사용
-from utils.zip_handler import build_batch_zip         # ZIP 생성기
+from utils.zip_handler import (                      # 스트리밍 ZIP 내보내기 / 업로드 ZIP 해제
+    batch_entries, stream_zip, STORE_MODES, check_archive, extract_member, ZipRejected,
+)
 
 router = APIRouter(prefix="/api/v1/ocr", tags=["ocr"])
+logger = logging.getLogger(__name__)
 
 ASYNC_ONLY = os.getenv("ASYNC_ONLY", "true").lower() == "true"
 MAX_FILES = int(os.getenv("MAX_FILES", "50"))
 MAX_BATCH_BYTES = int(os.getenv("MAX_BATCH_BYTES", "200000000"))  # 200MB
+UPLOAD_SAVE_CONCURRENCY = max(1, int(os.getenv("UPLOAD_SAVE_CONCURRENCY", "4")))  # 동시에 저장/투입하는 파일 수
 
 def _batch_tasks_key(batch_id: str) -> str:
     return f"batch:{batch_id}:tasks"
 
 
-@router.post("/upload")
-async def upload(files: List[UploadFile] = File(...)):
+def _user_owner(request: Request) -> str:
+    """로그인 사용자 식별(u:<id>). IP 기준 식별은 공유될 수 있으므로 blob 조회/연결에는 쓰지 않는다 → 401"""
+    owner = owner_key(request)
+    if not owner.startswith("u:"):
+        raise HTTPException(status_code=401, detail={"ok": False, "error": "auth_required"})
+    return owner
+
+
+async def _enqueue(*, owner: str, lane: str, batch_id: str,
+                   abs_path: str, saved_name: str, sha: str, sha256: str) -> tuple[str, dict]:
+    """
+    저장된 파일 하나를 비용 추정 → 공정 대기열 투입 → 배치 인덱싱/집계 등록. (task_id, cost)
+    인덱싱은 투입 직후 바로 한다 — 응답 도중 클라이언트가 끊겨도 이미 투입된 작업이 배치에서 빠지지 않는다.
+    """
+    # 비용 추정(페이지 수/텍스트 레이어) → OCR short/long 라우팅
+    cost = await run_in_threadpool(estimate_cost, abs_path)
+
+    # 공정 대기열 → Celery 큐 투입
+    # (sha256이 커밋된 결과와 같으면 파이프라인이 OCR/LLM 없이 그 결과를 재사용)
+    task_id = fair_queue.submit(owner=owner, lane=lane, kwargs=dict(
+        file_path=abs_path,     # 절대경로
+        filename=saved_name,    # 정규화 저장명
+        batch_id=batch_id,
+        sha=sha,
+        sha256=sha256,
+        cost=cost,
+        owner=owner,            # 커밋된 결과 재사용은 같은 사용자 것만
+    ))
+
+    # 이 사용자가 보유한 내용으로 기록 → 이후 같은 내용은 /upload-by-hash 로 본문 없이 등록 가능
+    if owner.startswith("u:"):
+        blob_store.claim(owner, sha256)
+
+    # 배치 인덱싱 + 집계 카운터 등록(queued)
+    await run_in_threadpool(_index_batch_tasks, batch_id, [task_id])
+    return task_id, cost
+
+
+def _index_batch_tasks(batch_id: str, task_ids: List[str]) -> None:
+    """배치 인덱싱(rpush) + 집계 등록을 파이프라인 한 번으로"""
+    if not task_ids:
+        return
+    pipe = _r.pipeline(transaction=False)
+    pipe.rpush(_batch_tasks_key(batch_id), *task_ids)
+    batch_stats.register_many(batch_id, task_ids, pipe=pipe)
+    pipe.execute()
+
+
+def _write_batch_meta(batch_id: str, task_items: List[dict]) -> None:
+    atomic_write_json(paths.batch_meta_path(batch_id), {"batch_id": batch_id, "tasks": task_items})
+
+
+async def _save_and_enqueue(files: List[UploadFile], batch_id: str, owner: str, lane: str):
+    """
+    파일을 최대 UPLOAD_SAVE_CONCURRENCY개씩 동시에 저장하고, 저장이 끝난 파일부터 바로 투입한다.
+    끝난 순서대로 (index, item, error) 를 내보낸다 — item/error 중 하나만 채워짐.
+    """
+    sem = asyncio.Semaphore(UPLOAD_SAVE_CONCURRENCY)
+
+    async def one(idx: int, f: UploadFile):
+        async with sem:
+            try:
+                abs_path, saved_name, sha, sha256 = await save_upload(f, batch_id)
+                task_id, cost = await _enqueue(owner=owner, lane=lane, batch_id=batch_id,
+                                               abs_path=abs_path, saved_name=saved_name,
+                                               sha=sha, sha256=sha256)
+            except Exception as e:
+                return idx, None, {"filename": f.filename, "error": "upload_failed", "detail": str(e)}
+        return idx, {
+            "task_id": task_id,
+            "filename": saved_name,
+            "sha": sha,
+            "cost_class": cost.get("class"),
+        }, None
+
+    for fut in asyncio.as_completed([one(i, f) for i, f in enumerate(files)]):
+        yield await fut
+
+
+_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "required": ["files"],
+            "properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}},
+        }}},
+    },
+}
+
+
+@router.post("/upload", openapi_extra=_UPLOAD_OPENAPI)
+async def upload(request: Request, stream: bool = Query(False, description="NDJSON으로 작업 id를 생성되는 대로 전송")):
     """
-    응답 스키마:
+    multipart "files" 필드의 파일들을 저장 + 작업 투입.
+    - 파일은 동시에(최대 UPLOAD_SAVE_CONCURRENCY) 저장되고, 저장이 끝난 파일부터 바로 큐에 들어간다
+    - 배치 인덱싱(batch:{id}:tasks)/집계 등록은 작업마다 투입 직후 파이프라인 한 번으로 기록
+
+    응답 스키마(기본):
     {
       "batch_id": "<string>",
       "tasks": [
-        { "task_id": "<uuid>", "filename": "<str>", "sha": "<short-sha>" }
-      ]
+        { "task_id": "<uuid>", "filename": "<str>", "sha": "<short-sha>", "cost_class": "short|long" }
+      ],
+      "errors": [ { "filename", "error", "detail" } ]   # 실패한 파일이 있을 때만
     }
+
+    ?stream=true 또는 Accept: application/x-ndjson 이면 한 줄에 하나씩(NDJSON, 완료 순서):
+      {"type": "batch", "batch_id"}
+      {"type": "task", "index", "task_id", "filename", "sha", "cost_class"}
+      {"type": "error", "index", "filename", "error", "detail"}
+      {"type": "done", "batch_id", "count", "errors"}
     """
-    if not files:
-        raise HTTPException(status_code=400, detail="no files")
     if not ASYNC_ONLY:
         raise HTTPException(status_code=503, detail="Server misconfig: async only expected")
-    if len(files) > MAX_FILES:
-        raise HTTPException(status_code=413, detail=f"too many files ({len(files)}/{MAX_FILES})")
+    # 폼은 직접 파싱해서 닫는 시점을 관리한다 (스트리밍 응답 중에도 파일을 읽어야 하므로)
+    form = await request.form()
+    try:
+        files = [f for f in form.getlist("files") if isinstance(f, StarletteUploadFile)]
+        if not files:
+            raise HTTPException(status_code=400, detail="no files")
+        if len(files) > MAX_FILES:
+            raise HTTPException(status_code=413, detail=f"too many files ({len(files)}/{MAX_FILES})")
+
+        # 총 용량 간이 체크 (헤더 기반, 일부 클라이언트는 미제공 가능)
+        total_bytes = 0
+        for f in files:
+            size_hdr = f.headers.get("content-length")
+            if size_hdr and size_hdr.isdigit():
+                total_bytes += int(size_hdr)
+                if total_bytes > MAX_BATCH_BYTES:
+                    raise HTTPException(status_code=413, detail=f"batch size exceeds limit ({MAX_BATCH_BYTES} bytes)")
+    except BaseException:
+        await form.close()
+        raise
 
     batch_id = uuid4().hex[:16]
-    task_items: List[dict] = []
-
-    # 총 용량 간이 체크 (헤더 기반, 일부 클라이언트는 미제공 가능)
-    total_bytes = 0
-    for f in files:
-        size_hdr = f.headers.get("content-length")
-        if size_hdr and size_hdr.isdigit():
-            total_bytes += int(size_hdr)
-            if total_bytes > MAX_BATCH_BYTES:
-                raise HTTPException(status_code=413, detail=f"batch size exceeds limit ({MAX_BATCH_BYTES} bytes)")
-
-    for f in files:
-        # ✅ 인자 순서 복구: save_upload(upfile, batch_id)
-        abs_path, saved_name, sha = await save_upload(f, batch_id)
-
-        # Celery 큐 투입
-        t = process_pdf.delay(
-            file_path=abs_path,     # 절대경로
-            filename=saved_name,    # 정규화 저장명
-            batch_id=batch_id,
-            sha=sha,
-        )
 
-        # 배치 인덱싱(집계용)
-        _r.rpush(_batch_tasks_key(batch_id), t.id)
+    # 공정 스케줄링: 작은 단일 파일은 priority 레인, 나머지는 배치 라운드로빈
+    owner = owner_key(request)
+    sizes = [f.size for f in files if f.size is not None]
+    lane = fair_queue.pick_lane(len(files), sum(sizes) if len(sizes) == len(files) else -1)
+
+    def _finish(done: List[tuple]) -> List[dict]:
+        """업로드 메타 저장 (참고용). finally에서 불리므로 await 없이 — 연결이 끊겨 취소된 중에도 기록된다."""
+        task_items = [item for _, item in sorted(done, key=lambda x: x[0])]
+        try:
+            _write_batch_meta(batch_id, task_items)
+        except OSError as e:
+            logger.warning("batch meta write failed for %s: %s", batch_id, e)
+        return task_items
+
+    if stream or "application/x-ndjson" in (request.headers.get("accept") or ""):
+        async def ndjson():
+            done, errors = [], []
+            try:
+                yield json.dumps({"type": "batch", "batch_id": batch_id}) + "\n"
+                async for idx, item, err in _save_and_enqueue(files, batch_id, owner, lane):
+                    if item:
+                        done.append((idx, item))
+                        yield json.dumps({"type": "task", "index": idx, **item}, ensure_ascii=False) + "\n"
+                    else:
+                        errors.append(err)
+                        yield json.dumps({"type": "error", "index": idx, **err}, ensure_ascii=False) + "\n"
+                yield json.dumps({"type": "done", "batch_id": batch_id,
+                                  "count": len(done), "errors": len(errors)}) + "\n"
+            finally:
+                _finish(done)
+                await form.close()
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    try:
+        done, errors = [], []
+        async for idx, item, err in _save_and_enqueue(files, batch_id, owner, lane):
+            if item:
+                done.append((idx, item))
+            else:
+                errors.append(err)
+    finally:
+        task_items = _finish(done)
+        await form.close()
+    if not task_items:
+        raise HTTPException(status_code=500, detail={"batch_id": batch_id, "errors": errors})
+
+    out = {"batch_id": batch_id, "tasks": task_items}
+    if errors:
+        out["errors"] = errors
+    return out
+
+
+def _append_batch_meta(batch_id: str, item: dict) -> None:
+    """
+    배치 메타에 작업 하나 추가 (파일을 하나씩 받는 경로: 이어받기 / 해시 등록).
+    한 배치에 여러 파일이 동시에 끝날 수 있으므로 배치별 Redis 락 안에서 읽고 temp + rename으로 쓴다.
+    메타를 못 읽으면(손상) 덮어쓰지 않고 건너뛴다 — 작업 목록의 기준은 batch:{id}:tasks.
+    """
+    meta_path = paths.batch_meta_path(batch_id)
+    lock = _r.lock(f"batch:{batch_id}:meta-lock", timeout=30)
+    if not lock.acquire(blocking=True, blocking_timeout=30):
+        logger.warning("batch meta lock busy for %s, not appending", batch_id)
+        return
+    try:
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            meta = {"batch_id": batch_id, "tasks": []}
+        except (OSError, ValueError) as e:
+            logger.warning("batch meta unreadable for %s, not appending: %s", batch_id, e)
+            return
+        meta.setdefault("tasks", []).append(item)
+        atomic_write_json(meta_path, meta)
+    finally:
+        try:
+            lock.release()
+        except Exception:
+            pass
 
-        task_items.append({
-            "task_id": t.id,
-            "filename": saved_name,
-            "sha": sha,
-        })
 
-    # 업로드 메타 저장 (참고용)
-    meta_path = Path(RESULT_DIR) / f"{batch_id}.json"
-    meta_path.parent.mkdir(parents=True, exist_ok=True)
-    meta_path.write_text(json.dumps({
-        "batch_id": batch_id,
-        "tasks": task_items,
-    }, ensure_ascii=False, indent=2), encoding="utf-8")
+# ---------- 이어받기(resumable) 업로드 ----------
+def _session_error(e: "upload_session.UploadSessionError") -> HTTPException:
+    return HTTPException(status_code=e.status, detail={"ok": False, "error": e.code, **e.extra})
 
-    return {"batch_id": batch_id, "tasks": task_items}
+
+@router.post("/uploads")
+def create_upload(
+    filename: str = Body(..., embed=True),
+    size: int = Body(..., embed=True),
+    batch_id: Optional[str] = Body(None, embed=True),
+):
+    """
+    이어받기 업로드 세션 생성.
+    이후 PUT /uploads/{upload_id}?offset=N (본문 = 파일의 N번째 바이트부터) 을 반복하고
+    POST /uploads/{upload_id}/finalize 로 작업을 투입한다.
+    끊기면 GET /uploads/{upload_id} 의 offset부터 다시 보낸다.
+    같은 batch_id로 여러 파일을 받을 수 있다(없으면 새로 발급).
+    """
+    batch = batch_id or uuid4().hex[:16]
+    try:
+        paths.staging_dir(batch)
+    except ValueError:
+        raise HTTPException(status_code=400, detail={"ok": False, "error": "invalid_batch_id"})
+    try:
+        return upload_session.create(batch, filename, size)
+    except upload_session.UploadSessionError as e:
+        raise _session_error(e)
+
+
+@router.get("/uploads/{upload_id}")
+def get_upload(upload_id: str):
+    """현재까지 받은 바이트 수(offset)"""
+    try:
+        return upload_session.status(upload_id)
+    except upload_session.UploadSessionError as e:
+        raise _session_error(e)
+
+
+@router.put("/uploads/{upload_id}")
+async def put_upload_chunk(upload_id: str, request: Request, offset: int = Query(..., ge=0)):
+    """청크 업로드. 본문(raw bytes)을 offset 위치에 바로 이어 쓰며 SHA를 누적한다."""
+    try:
+        return await upload_session.append(upload_id, offset, request.stream())
+    except upload_session.UploadSessionError as e:
+        raise _session_error(e)
+
+
+@router.delete("/uploads/{upload_id}")
+def abort_upload(upload_id: str):
+    if not upload_session.abort(upload_id):
+        raise HTTPException(status_code=404, detail={"ok": False, "error": "upload_not_found"})
+    return {"ok": True}
+
+
+@router.post("/uploads/{upload_id}/finalize")
+async def finalize_upload(upload_id: str, request: Request):
+    """
+    다 받은 파일을 작업으로 투입 (파일은 이미 제자리에 있고 SHA도 계산돼 있어 다시 읽지 않는다).
+    응답은 /upload 와 같은 형식: {"batch_id", "tasks": [{task_id, filename, sha, cost_class}]}
+    """
+    try:
+        abs_path, saved_name, sha, sha256, state = upload_session.finalize(upload_id)
+    except upload_session.UploadSessionError as e:
+        raise _session_error(e)
+    batch_id = state["batch_id"]
+
+    task_id, cost = await _enqueue(owner=owner_key(request), lane=fair_queue.pick_lane(1, state["size"]),
+                                   batch_id=batch_id, abs_path=abs_path, saved_name=saved_name,
+                                   sha=sha, sha256=sha256)
+
+    item = {"task_id": task_id, "filename": saved_name, "sha": sha, "cost_class": cost.get("class")}
+    await run_in_threadpool(_append_batch_meta, batch_id, item)
+
+    return {"batch_id": batch_id, "tasks": [item]}
+
+
+# ---------- 내용 해시로 업로드 생략 ----------
+@router.post("/blobs/check")
+def check_blobs(request: Request, hashes: List[str] = Body(..., embed=True)):
+    """
+    본문을 보내기 전에 SHA-256(hex)으로 보유 여부 확인. 로그인 필요, 본인이 올린 적 있는 내용만 알려준다.
+    known: 이미 저장된 내용 → /upload-by-hash 로 본문 없이 등록 가능
+    committed: 커밋된 결과가 있는 내용 → 등록하면 OCR/LLM 없이 결과 재사용
+    """
+    owner = _user_owner(request)
+    hashes = blob_store.owned(owner, [h.lower() for h in hashes[:MAX_FILES * 4] if isinstance(h, str)])
+    return {
+        "known": [h for h in hashes if blob_store.exists(h)],
+        "committed": [h for h in hashes if blob_store.is_committed(owner, h)],
+    }
+
+
+@router.post("/upload-by-hash")
+async def upload_by_hash(
+    request: Request,
+    sha256: str = Body(..., embed=True),
+    filename: str = Body(..., embed=True),
+    batch_id: Optional[str] = Body(None, embed=True),
+):
+    """
+    본인이 이미 올린 내용(blob)을 본문 없이 배치에 등록 (하드 링크). 로그인 필요.
+    응답은 /upload 와 같은 형식. 모르는(또는 본인 것이 아닌) 해시면 404 → 클라이언트는 일반 업로드로 진행.
+    """
+    owner = _user_owner(request)
+    sha256 = sha256.lower()
+    if not blob_store.valid_hash(sha256):
+        raise HTTPException(status_code=400, detail={"ok": False, "error": "invalid_sha256"})
+    # 다른 사용자의 내용인지 여부도 드러나지 않게 없는 해시와 같은 응답
+    if not blob_store.owned(owner, [sha256]):
+        raise HTTPException(status_code=404, detail={"ok": False, "error": "unknown_blob"})
+    if not _is_allowed_ext(filename or ""):
+        raise HTTPException(status_code=400, detail={"ok": False, "error": "invalid_ext"})
+    batch = batch_id or uuid4().hex[:16]
+    try:
+        abs_path, saved_name = _target_path(batch, filename)
+    except ValueError:
+        raise HTTPException(status_code=400, detail={"ok": False, "error": "invalid_batch_id"})
+    if not blob_store.link_into(sha256, abs_path):
+        # _target_path가 잡아 둔 빈 자리 파일 정리
+        abs_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=404, detail={"ok": False, "error": "unknown_blob"})
+
+    size = abs_path.stat().st_size
+    task_id, cost = await _enqueue(owner=owner, lane=fair_queue.pick_lane(1, size),
+                                   batch_id=batch, abs_path=str(abs_path), saved_name=saved_name,
+                                   sha=sha256[:12], sha256=sha256)
+    item = {"task_id": task_id, "filename": saved_name, "sha": sha256[:12], "cost_class": cost.get("class")}
+    await run_in_threadpool(_append_batch_meta, batch, item)
+    return {"batch_id": batch, "tasks": [item]}
 
 
 @router.get("/raw/{task_id}")
@@ -114,60 +415,89 @@ def get_ocr_raw(task_id: str, download: bool = False):
 
 
 @router.get("/export")
-def export_zip(batch: str = Query(..., description="batch_id 값")):
+def export_zip(
+    batch: str = Query(..., description="batch_id 값"),
+    originals: bool = Query(False, description="원본 파일도 originals/ 아래에 포함"),
+    store: str = Query("auto", description="원본 압축: auto(이미 압축된 포맷은 무압축) | all(전부 무압축) | none"),
+):
     """
     결과 ZIP 다운로드.
     프론트 호출: GET /api/v1/ocr/export?batch=<batch_id>
-    결과 ZIP 경로 규칙: {RESULT_DIR}/{batch}.zip
-    - 없으면 즉석 생성 시도(build_batch_zip)
+    - 요청 시점의 결과 폴더 내용으로 ZIP을 만들면서 바로 전송한다 (디스크 캐시/임시 파일 없음)
     """
-    # 없으면 생성 시도
-    zip_path = Path(RESULT_DIR) / f"{batch}.zip"
-    if not zip_path.exists():
-        try:
-            built = build_batch_zip(batch)
-            zip_path = Path(built)
-        except FileNotFoundError:
-            raise HTTPException(status_code=404, detail="Result zip not found and cannot be created")
+    if store not in STORE_MODES:
+        raise HTTPException(status_code=400, detail=f"store must be one of {list(STORE_MODES)}")
+    try:
+        entries = batch_entries(batch, include_originals=originals, store=store)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid batch id")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Result not found")
 
-    return FileResponse(
-        str(zip_path),
-        filename=f"{batch}.zip",
+    return StreamingResponse(
+        stream_zip(entries),
         media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{batch}.zip"'},
     )
 
 
+def _spool_size(f) -> int:
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    f.seek(0)
+    return size
+
+
 @router.post("/upload-zip")
-async def upload_zip(file: UploadFile = File(...), batch_id: Optional[str] = None):
+async def upload_zip(request: Request, file: UploadFile = File(...), batch_id: Optional[str] = None):
+    """
+    ZIP 업로드 → 멤버를 하나씩 풀면서 바로 작업 투입.
+    - 업로드 본문은 Starlette가 디스크 임시 파일로 spool 해 둔 것을 그대로 연다 (메모리 사본 없음)
+    - 멤버는 청크 단위로 해제하며 SHA 계산, 저장이 끝나면 다음 멤버를 풀기 전에 투입
+    - zip bomb 방어: 전체 해제 크기 / 멤버 크기 / 압축률 한도 (config ZIP_MAX_*)
+    """
     batch = batch_id or uuid4().hex[:12]
     if not file.filename.lower().endswith('.zip'):
         raise HTTPException(status_code=400, detail={"ok": False, "error": "not_zip"})
-    data = await file.read()
-    if len(data) > ZIP_MAX_BYTES:
+    spool = file.file
+    size = await run_in_threadpool(_spool_size, spool)
+    if size > ZIP_MAX_BYTES:
         raise HTTPException(status_code=413, detail={"ok": False, "error": "zip_too_large", "limit": ZIP_MAX_BYTES})
-    from io import BytesIO
     try:
-        zf = ZipFile(BytesIO(data))
+        zf = ZipFile(spool)
     except BadZipFile:
         raise HTTPException(status_code=400, detail={"ok": False, "error": "bad_zip"})
-    infos = [i for i in zf.infolist() if not i.is_dir()]
-    if len(infos) == 0:
-        raise HTTPException(status_code=400, detail={"ok": False, "error": "zip_empty"})
-    if len(infos) > ZIP_MAX_FILES:
-        raise HTTPException(status_code=413, detail={"ok": False, "error": "too_many_files", "limit": ZIP_MAX_FILES})
+    with zf:
+        infos = [i for i in zf.infolist() if not i.is_dir()]
+        if len(infos) == 0:
+            raise HTTPException(status_code=400, detail={"ok": False, "error": "zip_empty"})
+        if len(infos) > ZIP_MAX_FILES:
+            raise HTTPException(status_code=413, detail={"ok": False, "error": "too_many_files", "limit": ZIP_MAX_FILES})
+        try:
+            check_archive(infos)
+        except ZipRejected as e:
+            raise HTTPException(status_code=413, detail={"ok": False, "error": e.code, "limit": ZIP_MAX_UNCOMPRESSED_BYTES})
+        return await _ingest_zip_members(request, zf, infos, batch)
+
+
+async def _ingest_zip_members(request: Request, zf: ZipFile, infos, batch: str) -> dict:
+    owner = owner_key(request)
     enqueued = []
     errors = []
     for info in infos:
         name = Path(info.filename).name
         if Path(name).suffix.lower() not in ALLOWED_SINGLE_EXTS:
             errors.append({"name": name, "error": "invalid_ext"}); continue
-        content = zf.read(info)
-        from starlette.datastructures import UploadFile as SUploadFile
-        up = SUploadFile(filename=name, file=BytesIO(content))
         try:
-            abs_path, saved_name, sha = await save_upload(up, batch)
-            task = process_pdf.delay(batch, saved_name)
-            enqueued.append({"name": name, "task_id": task.id})
+            abs_path, saved_name, sha, sha256 = await run_in_threadpool(extract_member, zf, info, batch)
+        except ZipRejected as e:
+            errors.append({"name": name, "error": e.code, "detail": str(e)}); continue
+        except Exception as e:
+            errors.append({"name": name, "error": "upload_failed", "detail": str(e)}); continue
+        try:
+            task_id, _ = await _enqueue(owner=owner, lane="normal", batch_id=batch,
+                                        abs_path=abs_path, saved_name=saved_name, sha=sha, sha256=sha256)
+            enqueued.append({"name": name, "task_id": task_id})
         except Exception as e:
             errors.append({"name": name, "error": "upload_failed", "detail": str(e)})
     return {"ok": len(enqueued) > 0, "batch": batch, "files": enqueued, "errors": errors}
@@ -8,6 +8,8 @@ from pathlib import Path
 import os
 import json
 
+from utils import paths, result_store, task_index
+
 router = APIRouter(prefix="/api/v1/task", tags=["Task"])
 
 # === Celery 인스턴스 안전 로드 ===
@@ -34,21 +36,26 @@ _celery = _get_celery_app()
 
 # === 파일 기반 fallback ===
 RESULT_DIR = Path(os.getenv("RESULT_DIR", "ocr_store/uploads")).resolve()
+# 인덱스(task:index)에 없을 때 배치 폴더 전체 스캔까지 할지 (기존 결과는 백필 권장)
+RESULT_SCAN_FALLBACK = os.getenv("TASK_RESULT_SCAN_FALLBACK", "false").lower() == "true"
 
 def _find_result_path_by_task(task_id: str) -> Path | None:
     """
-    RESULT_DIR/<batch>/<task_id>.json 을 모를 때를 대비해,
-    1단계(배치 디렉토리)만 빠르게 훑어서 <task_id>.json이 있으면 반환한다.
+    task_id → 결과 JSON 경로.
+    finalize가 기록한 인덱스(utils/task_index)로 바로 찾고,
+    TASK_RESULT_SCAN_FALLBACK=true 일 때만 배치 폴더(레거시+샤딩)의 <task_id>/meta.json, <task_id>.json 을 훑는다.
     """
-    if not RESULT_DIR.exists():
+    hit = task_index.lookup_path(task_id)
+    if hit:
+        return hit
+    if not RESULT_SCAN_FALLBACK or not RESULT_DIR.exists():
         return None
     try:
-        for batch in RESULT_DIR.iterdir():
-            if not batch.is_dir():
-                continue
-            cand = batch / f"{task_id}.json"
-            if cand.exists():
-                return cand
+        for batch in paths.iter_batch_dirs(RESULT_DIR):
+            for cand in (batch / task_id / "meta.json", batch / f"{task_id}.json"):
+                if cand.is_file():
+                    task_index.put(task_id, batch.name, cand)   # 다음 조회부터는 인덱스로
+                    return cand
     except Exception:
         pass
     return None
@@ -65,7 +72,7 @@ def _json_response(payload: dict) -> JSONResponse:
     )
 
 @router.get("/status/{task_id}")
-def get_task_status(task_id: str):
+def get_task_status(task_id: str, full: bool = True):
     """
     표준 스키마 + 파일 기반 fallback.
     Celery가 SUCCESS를 바로 못 올려줘도 결과 JSON이 있으면 SUCCESS로 확정한다.
@@ -79,6 +86,8 @@ def get_task_status(task_id: str):
       "successful": bool,
       "task_id": str
     }
+    결과 백엔드에는 포인터만 있으므로 full=true(기본)면 결과 폴더의 정본 레코드를 읽어 돌려준다.
+    full=false면 포인터(식별자 + 목록 표시용 필드)만 반환.
     """
     # 1) Celery 우선 조회
     res = AsyncResult(task_id, app=_celery)
@@ -91,6 +100,8 @@ def get_task_status(task_id: str):
                 payload = json.loads(payload)
             except Exception:
                 payload = {"raw": payload}
+        if full:
+            payload = result_store.hydrate(payload)
         return _json_response({
             "state": state, "status": state, "result": payload,
             "ready": True, "successful": True, "task_id": task_id,
@@ -30,6 +30,7 @@ OCR_PSM_DEFAULT = _to_int(os.getenv("OCR_PSM_DEFAULT", "6"), 6)
 OCR_USER_DPI = _to_int(os.getenv("OCR_USER_DPI", "300"), 300)
 OCR_UPSCALE = _to_float(os.getenv("OCR_UPSCALE", "2.0"), 2.0)   # PIL 업스케일은 보수적으로
 OCR_DESKEW = _to_bool(os.getenv("OCR_DESKEW", "true"), True)    # PIL 디스큐는 약하게
+OCR_IMAGE_MAX_SIDE = _to_int(os.getenv("OCR_IMAGE_MAX_SIDE", "3508"), 3508)   # 이미지 OCR 작업 해상도 상한(긴 변, A4 300dpi)
 TESSDATA_PREFIX = os.getenv("TESSDATA_PREFIX", "").strip()
 
 # ---------- absolute paths ----------
@@ -50,8 +51,37 @@ def ensure_data_dirs() -> None:
 
 
 # --- Upload & ZIP limits ---
-ALLOWED_SINGLE_EXTS = {'.pdf', '.docx', '.hwp', '.pptx', '.xlsx'}
+IMAGE_EXTS = {'.jpg', '.jpeg', '.png', '.tif', '.tiff'}   # PDF 변환 없이 바로 OCR (core.ocr_engine.extract_text_from_image)
+ALLOWED_SINGLE_EXTS = {'.pdf', '.docx', '.hwp', '.hwpx', '.pptx', '.xlsx'} | IMAGE_EXTS
 ZIP_MAX_FILES = int(os.getenv('ZIP_MAX_FILES', '200'))
 ZIP_MAX_BYTES = int(os.getenv('ZIP_MAX_BYTES', str(200 * 1024 * 1024)))
+# zip bomb 방어: 멤버별 압축률 / 멤버 크기 / 전체 해제 크기 상한
+ZIP_MAX_RATIO = int(os.getenv('ZIP_MAX_RATIO', '100'))
+ZIP_MAX_MEMBER_BYTES = int(os.getenv('ZIP_MAX_MEMBER_BYTES', str(200 * 1024 * 1024)))
+ZIP_MAX_UNCOMPRESSED_BYTES = int(os.getenv('ZIP_MAX_UNCOMPRESSED_BYTES', str(1024 * 1024 * 1024)))
+# 이어받기(resumable) 업로드: 파일 하나 상한 / PUT 한 번 상한 / 세션 유지(초, 마지막 청크 기준)
+RESUMABLE_MAX_BYTES = int(os.getenv('RESUMABLE_MAX_BYTES', str(1024 * 1024 * 1024)))
+UPLOAD_CHUNK_MAX_BYTES = int(os.getenv('UPLOAD_CHUNK_MAX_BYTES', str(64 * 1024 * 1024)))
+UPLOAD_SESSION_TTL = int(os.getenv('UPLOAD_SESSION_TTL', str(24 * 3600)))
 LOFFICE_BIN = os.getenv('LOFFICE_BIN')
+# LibreOffice 상주 인스턴스 풀 (converters/loffice.py, 프로세스당)
+LOFFICE_POOL_SIZE = _to_int(os.getenv("LOFFICE_POOL_SIZE", "1"), 1)
+LOFFICE_MAX_CONVERSIONS = _to_int(os.getenv("LOFFICE_MAX_CONVERSIONS", "200"), 200)   # 이만큼 변환하면 재시작
+LOFFICE_START_TIMEOUT = _to_int(os.getenv("LOFFICE_START_TIMEOUT", "30"), 30)
+LOFFICE_PROFILE_DIR = os.getenv("LOFFICE_PROFILE_DIR", "")                          # 슬롯별 프로필 루트(기본: 임시 폴더)
 HWP5TXT_BIN = os.getenv('HWP5TXT_BIN')
+# 변환 산출물 캐시 (converters/convert_cache.py): 원본 sha256 + 변환기 버전 → 추출 텍스트 / 렌더링 PDF
+CONVERT_CACHE_DIR = _abs(os.getenv("CONVERT_CACHE_DIR", str(Path(UPLOAD_DIR) / ".convert")))
+CONVERT_CACHE_MAX_BYTES = _to_int(os.getenv("CONVERT_CACHE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)), 2 * 1024 * 1024 * 1024)
+
+# --- Cost-aware routing (core/cost_model.py) ---
+# OCR 단계 예상 소요(초) 기준으로 short/long 큐와 시간 제한을 나눈다.
+COST_SHORT_MAX_SECONDS = _to_float(os.getenv("COST_SHORT_MAX_SECONDS", "60"), 60.0)
+COST_SCAN_SEC_PER_PAGE = _to_float(os.getenv("COST_SCAN_SEC_PER_PAGE", "4.0"), 4.0)      # 스캔 PDF(OCR)
+COST_TEXT_SEC_PER_PAGE = _to_float(os.getenv("COST_TEXT_SEC_PER_PAGE", "0.02"), 0.02)    # 텍스트 레이어 PDF
+COST_DOC_SEC_PER_FILE = _to_float(os.getenv("COST_DOC_SEC_PER_FILE", "2.0"), 2.0)        # DOCX/HWP 등 텍스트 추출
+COST_CALIB_MIN_SAMPLES = _to_int(os.getenv("COST_CALIB_MIN_SAMPLES", "20"), 20)          # 보정값 사용 최소 샘플 수
+COST_SHORT_SOFT_LIMIT = _to_int(os.getenv("COST_SHORT_SOFT_LIMIT", "180"), 180)
+COST_SHORT_HARD_LIMIT = _to_int(os.getenv("COST_SHORT_HARD_LIMIT", "240"), 240)
+COST_LONG_SOFT_LIMIT = _to_int(os.getenv("COST_LONG_SOFT_LIMIT", "3600"), 3600)
+COST_LONG_HARD_LIMIT = _to_int(os.getenv("COST_LONG_HARD_LIMIT", "3900"), 3900)
@@ -0,0 +1,211 @@
+"""
+Conversion artifact cache keyed by source content hash.
+
+Extracted text and soffice-rendered PDFs are stored once per (content, converter):
+
+    <CONVERT_CACHE_DIR>/<ab>/<sha256>.<converter>.<ext>
+
+- The key is the upload's SHA-256 (computed while saving, see utils.file_manager),
+  so a cache lookup never re-reads the source file.
+- <converter> carries a version (e.g. "docx-lxml-v1"); bumping it when an
+  extractor's output changes invalidates old artifacts without a purge.
+- Artifacts are written to a temp name and renamed, so a visible file is complete;
+  PDFs are additionally checked for the %PDF- header.
+- Hits bump the file's mtime; when the directory grows past
+  CONVERT_CACHE_MAX_BYTES the least recently used artifacts are evicted.
+  Only artifacts the cache holds alone (st_nlink == 1) count toward the limit
+  or are eviction candidates: unlinking one still hard-linked from a task's
+  work dir frees nothing. Puts update a running per-process byte count and
+  only rescan the directory when it crosses the limit or every _RESCAN_EVERY
+  puts (other workers write to the same directory).
+
+Everything here is best-effort: any filesystem error is a cache miss.
+"""
+import logging
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+from typing import Optional
+
+from config import CONVERT_CACHE_DIR, CONVERT_CACHE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(CONVERT_CACHE_DIR)
+_HEX64 = re.compile(r"^[0-9a-f]{64}$")
+_PDF_MAGIC = b"%PDF-"
+_EVICT_TO = 0.9          # evict down to 90% of the limit so the next few puts stay under it
+_RESCAN_EVERY = 64       # puts between full rescans to pick up other processes' writes
+_evict_lock = threading.Lock()
+_size: Optional[int] = None   # reclaimable bytes as of the last scan plus this process's puts
+_puts = 0
+
+
+def valid_hash(sha256: Optional[str]) -> bool:
+    return bool(sha256) and bool(_HEX64.match(sha256))
+
+
+def artifact_path(sha256: Optional[str], converter: str, suffix: str) -> Optional[Path]:
+    """Cache location for an artifact, or None if the hash is not a SHA-256 hex digest."""
+    if not valid_hash(sha256):
+        return None
+    return CACHE_DIR / sha256[:2] / f"{sha256}.{converter}{suffix}"
+
+
+def _valid(path: Path) -> bool:
+    try:
+        if not path.is_file() or path.stat().st_size == 0:
+            return False
+        if path.suffix == ".pdf":
+            with open(path, "rb") as f:
+                return f.read(len(_PDF_MAGIC)) == _PDF_MAGIC
+        return True
+    except OSError:
+        return False
+
+
+def get(sha256: Optional[str], converter: str, suffix: str) -> Optional[Path]:
+    """Valid cached artifact (and mark it recently used), else None."""
+    path = artifact_path(sha256, converter, suffix)
+    if path is None or not _valid(path):
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return path
+
+
+def read_text(sha256: Optional[str], converter: str) -> Optional[str]:
+    path = get(sha256, converter, ".txt")
+    if path is None:
+        return None
+    try:
+        return path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _tmp_for(path: Path) -> Path:
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def put_file(sha256: Optional[str], converter: str, suffix: str, src_path) -> Optional[Path]:
+    """Cache a produced artifact (hard link when possible, else copy)."""
+    path = artifact_path(sha256, converter, suffix)
+    if path is None:
+        return None
+    tmp = _tmp_for(path)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(src_path, tmp)
+        except OSError:
+            shutil.copyfile(src_path, tmp)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.debug("convert cache put failed for %s: %s", path.name, e)
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return None
+    _after_put(path)
+    return path
+
+
+def put_text(sha256: Optional[str], converter: str, text: str) -> Optional[Path]:
+    path = artifact_path(sha256, converter, ".txt")
+    if path is None or not text:
+        return None
+    tmp = _tmp_for(path)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.debug("convert cache put failed for %s: %s", path.name, e)
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return None
+    _after_put(path)
+    return path
+
+
+def link_out(cached: Path, dst) -> bool:
+    """Materialize a cached artifact at dst (hard link, else copy). Eviction then only drops the cache's link."""
+    dst = Path(dst)
+    try:
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        if dst.exists():
+            if os.path.samefile(cached, dst):
+                return True
+            dst.unlink()
+        try:
+            os.link(cached, dst)
+        except OSError:
+            shutil.copyfile(cached, dst)
+        return True
+    except OSError:
+        return False
+
+
+def _after_put(path: Path, max_bytes: int = CONVERT_CACHE_MAX_BYTES) -> None:
+    """Account for a new artifact; scan and evict only when the running total says so."""
+    global _size, _puts
+    if max_bytes <= 0:
+        return
+    try:
+        st = path.stat()
+    except OSError:
+        return
+    with _evict_lock:
+        _puts += 1
+        if _size is not None and _puts % _RESCAN_EVERY:
+            if st.st_nlink == 1:
+                _size += st.st_size
+            if _size <= max_bytes:
+                return
+    evict(max_bytes)
+
+
+def evict(max_bytes: int = CONVERT_CACHE_MAX_BYTES) -> int:
+    """Drop least recently used artifacts until the cache fits in max_bytes. Returns files removed."""
+    global _size
+    if max_bytes <= 0 or not CACHE_DIR.is_dir():
+        return 0
+    with _evict_lock:
+        entries = []
+        total = 0
+        for p in CACHE_DIR.glob("??/*"):
+            if p.name.startswith("."):
+                continue
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            if st.st_nlink != 1:
+                continue   # still linked from a work dir: removing it would free nothing
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        _size = total
+        if total <= max_bytes:
+            return 0
+        target = int(max_bytes * _EVICT_TO)
+        removed = 0
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= target:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        _size = total
+        logger.info("convert cache evicted %d artifacts (now %d bytes)", removed, total)
+        return removed
@@ -1,39 +1,98 @@
 import os
 import io
+import re
+import math
+import time
 import hashlib
 from dataclasses import dataclass
 from typing import Optional, Literal, Dict
 
-from .docx_extractor import extract_docx_to_text, render_docx_to_pdf_via_loffice
-from .hwp_extractor import extract_hwp_to_text, render_hwp_to_pdf_via_loffice
-from .loffice import has_soffice
+from . import convert_cache
+from .docx_extractor import extract_docx_to_text, iter_docx_text
+from .hwp_extractor import extract_hwp_to_text, hwp_to_text
+from .hwpx_extractor import extract_hwpx_to_text, iter_hwpx_text
+from .pptx_extractor import extract_pptx_to_text, iter_pptx_text
+from .xlsx_extractor import extract_xlsx_to_text, iter_xlsx_text
+from .loffice import has_soffice, convert_to_pdf
 
 IngestKind = Literal["pdf", "text"]
 
 @dataclass
 class IngestResult:
     kind: IngestKind                 # "pdf" -> use pdf_path; "text" -> use text_path
-    src_ext: str                     # original extension without dot (pdf|docx|hwp)
+    src_ext: str                     # original extension without dot (pdf|docx|hwp|hwpx|pptx|xlsx)
     pdf_path: Optional[str] = None
     text_path: Optional[str] = None
     meta: Dict = None                # {"route": "...", "used": ["..."], "notes": "..."}
 
-def _sha12(path: str) -> str:
-    h = hashlib.sha1()
+# converter identity for the artifact cache: bump the version when an extractor's output changes
+CONVERTERS = {
+    "docx": "docx-lxml-v1",
+    "hwp": "hwp5txt-v1",
+    "hwpx": "hwpx-lxml-v1",
+    "pptx": "pptx-v1",
+    "xlsx": "xlsx-v1",
+    "txt": "txt-v1",
+    "soffice": "soffice-pdf-v1",
+}
+
+def _sha256(path: str) -> str:
+    """Only for callers that did not get the hash from the upload (CLI / ad-hoc use)."""
+    h = hashlib.sha256()
     with open(path, "rb") as f:
         while True:
             chunk = f.read(1024 * 1024)
             if not chunk:
                 break
             h.update(chunk)
-    return h.hexdigest()[:12]
+    return h.hexdigest()
 
-def ingest_document(src_path: str, work_dir: str) -> IngestResult:
+def _render_via_loffice(src_path: str, out_pdf: str, sha256: Optional[str] = None) -> bool:
+    """
+    soffice renders to <work_dir>/<basename>.pdf; move it to the deterministic out_pdf name.
+    With sha256, a cached rendering of the same content is reused and new renderings are cached.
+    """
+    hit = convert_cache.get(sha256, CONVERTERS["soffice"], ".pdf")
+    if hit is not None and convert_cache.link_out(hit, out_pdf):
+        return True
+    out_dir = os.path.dirname(out_pdf) or "."
+    if not convert_to_pdf(src_path, out_dir=out_dir):
+        return False
+    produced = os.path.join(out_dir, os.path.splitext(os.path.basename(src_path))[0] + ".pdf")
+    if produced != out_pdf and os.path.exists(produced):
+        try:
+            os.replace(produced, out_pdf)
+        except Exception:
+            return False
+    if not os.path.exists(out_pdf):
+        return False
+    convert_cache.put_file(sha256, CONVERTERS["soffice"], ".pdf", out_pdf)
+    return True
+
+def _cached_text(sha256: str, ext: str, out_txt: str, meta: Dict) -> bool:
+    """Materialize a cached text extraction at out_txt. True on hit."""
+    hit = convert_cache.get(sha256, CONVERTERS[ext], ".txt")
+    if hit is None or not convert_cache.link_out(hit, out_txt):
+        return False
+    meta["used"].append("cache")
+    meta["route"] = f"{ext}->text(cache)"
+    return True
+
+# native text extractors for zipped XML formats (OOXML, OWPML) that need no rendering
+_OOXML_TEXT = {
+    "pptx": (extract_pptx_to_text, "python-pptx"),
+    "xlsx": (extract_xlsx_to_text, "openpyxl(read_only)"),
+    "hwpx": (extract_hwpx_to_text, "lxml.iterparse"),
+}
+
+def ingest_document(src_path: str, work_dir: str, sha256: Optional[str] = None) -> IngestResult:
     """
     Normalize incoming file into either:
       - PDF   (kind="pdf": use existing OCR/pass-through pipeline), or
       - TEXT  (kind="text": skip OCR, go straight to LLM)
-    Work products are written under work_dir.
+    Work products are written under work_dir. sha256 is the source's content hash
+    (pass the one computed at upload; it is only recomputed when missing) and keys
+    the conversion cache, so the same content is never converted twice.
     Behavior is controlled by env flags:
       ENABLE_LOFFICE=true|false  - allow soffice pdf rendering when possible
       ENABLE_HWP_TXT=true|false  - allow HWP text extraction via hwp5txt/pyhwp
@@ -47,7 +106,9 @@ def ingest_document(src_path: str, work_dir: str) -> IngestResult:
     enable_hwp_txt = os.environ.get("ENABLE_HWP_TXT", "true").lower() == "true"
 
     base = os.path.splitext(os.path.basename(src_path))[0]
-    shs = _sha12(src_path)
+    if not convert_cache.valid_hash(sha256):
+        sha256 = _sha256(src_path)
+    shs = sha256[:12]
     # deterministic output paths under work_dir
     out_pdf = os.path.join(work_dir, f"{base}.{shs}.pdf")
     out_txt = os.path.join(work_dir, f"{base}.{shs}.txt")
@@ -59,16 +120,19 @@ def ingest_document(src_path: str, work_dir: str) -> IngestResult:
 
     # Case 2) DOCX
     if ext == "docx":
+        if _cached_text(sha256, ext, out_txt, meta):
+            return IngestResult(kind="text", src_ext="docx", text_path=out_txt, meta=meta)
         # Prefer direct text extraction as fast path
         try:
             extract_docx_to_text(src_path, out_txt)
-            meta["used"].append("python-docx")
+            convert_cache.put_file(sha256, CONVERTERS[ext], ".txt", out_txt)
+            meta["used"].append("lxml.iterparse")
             meta["route"] = "docx->text"
             return IngestResult(kind="text", src_ext="docx", text_path=out_txt, meta=meta)
         except ImportError:
-            # If python-docx missing and soffice is allowed, try render to PDF
+            # If lxml missing and soffice is allowed, try render to PDF
             if enable_loffice and has_soffice():
-                ok = render_docx_to_pdf_via_loffice(src_path, out_pdf)
+                ok = _render_via_loffice(src_path, out_pdf, sha256)
                 if ok:
                     meta["used"].append("soffice")
                     meta["route"] = "docx->pdf(soffice)"
@@ -77,7 +141,7 @@ def ingest_document(src_path: str, work_dir: str) -> IngestResult:
         except Exception:
             # Fallback to PDF render if possible
             if enable_loffice and has_soffice():
-                ok = render_docx_to_pdf_via_loffice(src_path, out_pdf)
+                ok = _render_via_loffice(src_path, out_pdf, sha256)
                 if ok:
                     meta["used"].append("soffice")
                     meta["route"] = "docx->pdf(soffice)"
@@ -89,14 +153,17 @@ def ingest_document(src_path: str, work_dir: str) -> IngestResult:
     if ext == "hwp":
         # Try text extraction first if allowed
         if enable_hwp_txt:
+            if _cached_text(sha256, ext, out_txt, meta):
+                return IngestResult(kind="text", src_ext="hwp", text_path=out_txt, meta=meta)
             ok = extract_hwp_to_text(src_path, out_txt)
             if ok:
+                convert_cache.put_file(sha256, CONVERTERS[ext], ".txt", out_txt)
                 meta["used"].append("hwp5txt/pyhwp")
                 meta["route"] = "hwp->text"
                 return IngestResult(kind="text", src_ext="hwp", text_path=out_txt, meta=meta)
         # Else try rendering to PDF via LibreOffice (if available)
         if enable_loffice and has_soffice():
-            ok = render_hwp_to_pdf_via_loffice(src_path, out_pdf)
+            ok = _render_via_loffice(src_path, out_pdf, sha256)
             if ok:
                 meta["used"].append("soffice")
                 meta["route"] = "hwp->pdf(soffice)"
@@ -104,5 +171,153 @@ def ingest_document(src_path: str, work_dir: str) -> IngestResult:
         # Nothing worked
         raise RuntimeError("HWP ingestion failed: neither text extraction nor PDF rendering is available.")
 
+    # Case 4) PPTX / XLSX / HWPX: stream slide text + notes / cell values / section XML straight to text
+    if ext in _OOXML_TEXT:
+        extractor, used = _OOXML_TEXT[ext]
+        if _cached_text(sha256, ext, out_txt, meta):
+            return IngestResult(kind="text", src_ext=ext, text_path=out_txt, meta=meta)
+        try:
+            units = extractor(src_path, out_txt)
+            convert_cache.put_file(sha256, CONVERTERS[ext], ".txt", out_txt)
+            meta["used"].append(used)
+            meta["route"] = f"{ext}->text"
+            meta["units"] = units   # slides / worksheets / sections
+            return IngestResult(kind="text", src_ext=ext, text_path=out_txt, meta=meta)
+        except Exception:
+            if enable_loffice and has_soffice() and _render_via_loffice(src_path, out_pdf, sha256):
+                meta["used"].append("soffice")
+                meta["route"] = f"{ext}->pdf(soffice)"
+                return IngestResult(kind="pdf", src_ext=ext, pdf_path=out_pdf, meta=meta)
+            raise
+
     # Unknown extension
-    raise ValueError(f"Unsupported extension: .{ext}. Allowed: .pdf, .docx, .hwp")
+    raise ValueError(f"Unsupported extension: .{ext}. Allowed: .pdf, .docx, .hwp, .hwpx, .pptx, .xlsx")
+
+
+# ---------------------------------------------------------------------------
+# In-memory text ingest (pipeline fast path)
+# ---------------------------------------------------------------------------
+
+# ext -> (line iterator, used label, marker that starts a page-like unit)
+_TEXT_ITERS = {
+    "docx": (iter_docx_text, "lxml.iterparse", None),
+    "pptx": (iter_pptx_text, "python-pptx", "[Slide "),
+    "xlsx": (iter_xlsx_text, "openpyxl(read_only)", "[Sheet: "),
+    "hwpx": (iter_hwpx_text, "lxml.iterparse", None),
+}
+# plain text: BOM-aware UTF-8 first, then the legacy Korean code pages
+_TXT_ENCODINGS = ("utf-8-sig", "cp949", "euc-kr")
+# page estimate for formats without pages (roughly one A4 page of Korean prose)
+_CHARS_PER_PAGE = int(os.environ.get("INGEST_CHARS_PER_PAGE", "1800"))
+_HANGUL_RE = re.compile(r"[가-힣]")
+
+def _read_plain_text(src_path: str) -> str:
+    with open(src_path, "rb") as f:
+        raw = f.read()
+    for enc in _TXT_ENCODINGS:
+        try:
+            return raw.decode(enc)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode("utf-8", errors="replace")
+
+def _text_stats(text: str) -> Dict:
+    """Same shape as the OCR engine's ocr_stats (avg_conf is None: nothing was recognized)."""
+    n = len(text)
+    h = len(_HANGUL_RE.findall(text))
+    return {
+        "chars": n,
+        "lines": text.count("\n") + 1 if text else 0,
+        "hangul_ratio": round(h / n, 3) if n else 0.0,
+        "avg_conf": None,
+    }
+
+def _ms(t0: float) -> int:
+    return int((time.perf_counter() - t0) * 1000)
+
+def extract_text(src_path: str, work_dir: Optional[str] = None, sha256: Optional[str] = None) -> Dict:
+    """
+    Text of a non-PDF document, built in memory for the pipeline (no .txt work product):
+    extractors stream lines straight into the returned text, so Office documents
+    skip OCR and the file is read exactly once.
+    With sha256 (the upload's content hash; never recomputed here) results go through
+    the conversion cache: a cached extraction or rendering of the same content is reused.
+
+    Returns:
+      {
+        "ok": bool,              # True when text was extracted
+        "text": str,
+        "route": "docx->text" | "txt->text" | "doc->pdf(soffice)" | ...,
+        "used": [...],
+        "pdf_path": Optional[str],   # set when only a PDF rendering was possible (OCR it)
+        "perf": [{"name": "...", "ms": int}],
+        "pages": Optional[int],  # slides / sheets, else estimated from text length
+        "stats": {"chars", "lines", "hangul_ratio", "avg_conf"},
+        "error": Optional[str],
+      }
+
+    When no text route exists (doc/odt/rtf, missing extractor, empty result) and
+    work_dir is given, the document is rendered to <work_dir>/<basename>.pdf via soffice.
+    Same env flags as ingest_document (ENABLE_LOFFICE, ENABLE_HWP_TXT).
+    """
+    t0 = time.perf_counter()
+    _, ext = os.path.splitext(src_path)
+    ext = (ext or "").lower().strip(".")
+    out = {"ok": False, "text": "", "route": None, "used": [], "pdf_path": None,
+           "perf": [], "pages": None, "stats": _text_stats(""), "error": None}
+
+    enable_loffice = os.environ.get("ENABLE_LOFFICE", "true").lower() == "true"
+    enable_hwp_txt = os.environ.get("ENABLE_HWP_TXT", "true").lower() == "true"
+
+    text, units, used = None, None, None
+    text_route = ext in _TEXT_ITERS or ext == "txt" or (ext == "hwp" and enable_hwp_txt)
+    t_ext = time.perf_counter()
+    cached = convert_cache.read_text(sha256, CONVERTERS[ext]) if text_route else None
+    try:
+        if cached is not None:
+            text, used = cached, "cache"
+            marker = _TEXT_ITERS.get(ext, (None, None, None))[2]
+            if marker:
+                units = sum(1 for line in cached.split("\n") if line.startswith(marker)) or None
+        elif ext == "txt":
+            text, used = _read_plain_text(src_path), "plain"
+        elif ext in _TEXT_ITERS:
+            it, used, marker = _TEXT_ITERS[ext]
+            lines = []
+            for line in it(src_path):
+                if marker and line.startswith(marker):
+                    units = (units or 0) + 1
+                lines.append(line)
+            text = "\n".join(lines)
+        elif ext == "hwp" and enable_hwp_txt:
+            text, used = hwp_to_text(src_path), "hwp5txt"
+    except Exception as e:
+        out["error"] = f"{type(e).__name__}: {e}"
+    out["perf"].append({"name": f"extract:{ext}", "ms": _ms(t_ext)})
+
+    text = (text or "").strip()
+    if text and cached is None:
+        convert_cache.put_text(sha256, CONVERTERS[ext], text)
+    if text:
+        out.update({
+            "ok": True,
+            "text": text,
+            "route": f"{ext}->text" + ("(cache)" if cached is not None else ""),
+            "used": [used],
+            "pages": units or max(1, math.ceil(len(text) / _CHARS_PER_PAGE)),
+            "stats": _text_stats(text),
+            "error": None,
+        })
+    elif work_dir and enable_loffice and has_soffice():
+        t_pdf = time.perf_counter()
+        os.makedirs(work_dir, exist_ok=True)
+        base = os.path.splitext(os.path.basename(src_path))[0]
+        out_pdf = os.path.join(work_dir, f"{base}.pdf")
+        if _render_via_loffice(src_path, out_pdf, sha256):
+            out.update({"pdf_path": out_pdf, "route": f"{ext}->pdf(soffice)", "used": ["soffice"]})
+        out["perf"].append({"name": "render:soffice", "ms": _ms(t_pdf)})
+    if not out["ok"] and not out["pdf_path"] and not out["error"]:
+        out["error"] = f"no text extracted from .{ext}"
+
+    out["perf"].append({"name": "ingest", "ms": _ms(t0)})
+    return out
@@ -1,26 +1,176 @@
 import io
 import os
-from typing import Optional
+import re
+import zipfile
+from typing import Iterator, List, Optional
 
-def _write_utf8(path: str, text: str) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with io.open(path, "w", encoding="utf-8") as f:
-        f.write(text)
+_DOCUMENT = "word/document.xml"
+_PART_RX = re.compile(r"^word/(header|footer)(\d*)\.xml$")
+# footnote/endnote separators are layout, not content
+_NOTE_SKIP_TYPES = {"separator", "continuationSeparator", "continuationNotice"}
 
-def extract_docx_to_text(src_path: str, out_txt_path: str) -> None:
+def _local(tag) -> str:
+    return tag.rpartition("}")[2] if isinstance(tag, str) else ""
+
+def _wattr(el, name: str) -> Optional[str]:
+    """w:-prefixed attribute regardless of the namespace URI (strict vs transitional)."""
+    for k, v in el.attrib.items():
+        if _local(k) == name:
+            return v
+    return None
+
+def _iter_part(fp, note_kind: Optional[str] = None) -> Iterator[str]:
     """
-    Extracts plain text from DOCX using python-docx.
-    Raises ImportError if python-docx is not installed.
+    Stream one WordprocessingML part with iterparse and yield lines in reading order:
+    paragraphs (runs joined, <w:tab/> -> tab, <w:br/>/<w:cr/> -> newline), tables as one
+    tab-separated line per row (cell paragraphs joined with spaces), footnote/endnote
+    references inline as [^id]. With note_kind set, each footnote/endnote is prefixed
+    with its [^id] marker. Processed elements are cleared so memory stays constant.
+    """
+    from lxml import etree
+
+    paras: List[List[str]] = []   # open <w:p> buffers (text boxes nest paragraphs)
+    cells: List[List[str]] = []   # open <w:tc> contents
+    rows: List[List[str]] = []    # open <w:tr> cells
+    skip = 0                      # inside mc:Fallback (duplicate of mc:Choice) or a skipped note
+    note_id: Optional[str] = None
+
+    def sink(line: str):
+        """Where a finished line goes: the enclosing table cell, or out."""
+        if cells:
+            cells[-1].append(line)
+            return None
+        return line
+
+    for event, el in etree.iterparse(fp, events=("start", "end"), huge_tree=True):
+        name = _local(el.tag)
+        if event == "start":
+            if name == "Fallback" or (name == note_kind and _wattr(el, "type") in _NOTE_SKIP_TYPES):
+                skip += 1
+            elif skip:
+                pass
+            elif name == note_kind:
+                note_id = _wattr(el, "id")
+            elif name == "p":
+                paras.append([])
+            elif name == "tbl":
+                # text that precedes a table inside the same paragraph comes first
+                if paras:
+                    pending = "".join(paras[-1]).strip()
+                    paras[-1].clear()
+                    if pending:
+                        out = sink(pending)
+                        if out is not None:
+                            yield out
+            elif name == "tr":
+                rows.append([])
+            elif name == "tc":
+                cells.append([])
+            continue
+
+        if name == "Fallback" or (name == note_kind and _wattr(el, "type") in _NOTE_SKIP_TYPES):
+            skip -= 1
+        elif skip:
+            pass
+        elif name == "t":
+            if paras:
+                paras[-1].append(el.text or "")
+        elif name in ("tab", "br", "cr"):
+            # <w:tabs><w:tab/> in paragraph properties are tab stops, not characters
+            parent = el.getparent()
+            if paras and parent is not None and _local(parent.tag) == "r":
+                paras[-1].append("\t" if name == "tab" else "\n")
+        elif name in ("footnoteReference", "endnoteReference"):
+            if paras:
+                paras[-1].append(f"[^{_wattr(el, 'id')}]")
+        elif name == "p":
+            text = "".join(paras.pop()).strip() if paras else ""
+            if text and note_id is not None:
+                text, note_id = f"[^{note_id}] {text}", None
+            if text:
+                out = sink(text)
+                if out is not None:
+                    yield out
+        elif name == "tc":
+            content = " ".join(cells.pop()) if cells else ""
+            if rows:
+                rows[-1].append(content)
+        elif name == "tr":
+            row = rows.pop() if rows else []
+            if any(c.strip() for c in row):
+                out = sink("\t".join(row))
+                if out is not None:
+                    yield out
+        elif name == note_kind:
+            note_id = None
+
+        # constant memory: drop the finished element and already-processed siblings
+        el.clear(keep_tail=True)
+        parent = el.getparent()
+        if parent is not None:
+            while el.getprevious() is not None:
+                del parent[0]
+
+def _parts(names, kind: str) -> List[str]:
+    found = [(int(m.group(2) or 0), n) for n in names for m in [_PART_RX.match(n)] if m and m.group(1) == kind]
+    return [n for _, n in sorted(found)]
+
+def _iter_unique(zf: zipfile.ZipFile, parts: List[str]) -> Iterator[str]:
+    """Header/footer parts repeat across sections (first/even/default); emit each distinct one once."""
+    seen = set()
+    for name in parts:
+        with zf.open(name) as fp:
+            lines = list(_iter_part(fp))
+        key = "\n".join(lines)
+        if lines and key not in seen:
+            seen.add(key)
+            yield from lines
+
+def iter_docx_text(src_path: str) -> Iterator[str]:
+    """
+    Yields DOCX text lines in reading order: "[Header]" block, body paragraphs and tables
+    (word/document.xml streamed with lxml.iterparse, constant memory), "[Footnotes]" /
+    "[Endnotes]" blocks, then a "[Footer]" block. Sections that are empty are omitted.
+    Raises ImportError if lxml is not installed, zipfile.BadZipFile / KeyError for broken files.
     """
     try:
-        import docx  # python-docx
+        import lxml  # noqa: F401
     except Exception as e:
-        raise ImportError("python-docx is required for DOCX text extraction. pip install python-docx") from e
+        raise ImportError("lxml is required for DOCX text extraction. pip install lxml") from e
+
+    with zipfile.ZipFile(src_path) as zf:
+        names = set(zf.namelist())
+        if _DOCUMENT not in names:
+            raise KeyError(f"{_DOCUMENT} not found")
+
+        def block(marker: str, lines: Iterator[str]) -> Iterator[str]:
+            first = True
+            for line in lines:
+                if first:
+                    yield marker
+                    first = False
+                yield line
 
-    doc = docx.Document(src_path)
-    # Join paragraphs with newlines; avoids losing structure but stays simple
-    text = "\n".join([p.text for p in doc.paragraphs])
-    _write_utf8(out_txt_path, text)
+        yield from block("[Header]", _iter_unique(zf, _parts(names, "header")))
+        with zf.open(_DOCUMENT) as fp:
+            yield from _iter_part(fp)
+        for part, kind, marker in (("word/footnotes.xml", "footnote", "[Footnotes]"),
+                                   ("word/endnotes.xml", "endnote", "[Endnotes]")):
+            if part in names:
+                with zf.open(part) as fp:
+                    yield from block(marker, _iter_part(fp, note_kind=kind))
+        yield from block("[Footer]", _iter_unique(zf, _parts(names, "footer")))
+
+def extract_docx_to_text(src_path: str, out_txt_path: str) -> None:
+    """
+    Extracts DOCX text (headers, body paragraphs and tables, footnotes, footers)
+    straight to out_txt_path, line by line.
+    Raises ImportError if lxml is not installed.
+    """
+    os.makedirs(os.path.dirname(out_txt_path) or ".", exist_ok=True)
+    with io.open(out_txt_path, "w", encoding="utf-8") as f:
+        for line in iter_docx_text(src_path):
+            f.write(line + "\n")
 
 def render_docx_to_pdf_via_loffice(src_path: str, out_pdf_path: str) -> bool:
     """
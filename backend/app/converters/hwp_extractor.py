@@ -9,6 +9,20 @@ def _write_utf8(path: str, text: str) -> None:
     with io.open(path, "w", encoding="utf-8") as f:
         f.write(text)
 
+def hwp_to_text(src_path: str) -> Optional[str]:
+    """
+    Text of an HWP file via hwp5txt (external binary), kept in memory.
+    Returns None if hwp5txt is unavailable or fails.
+    """
+    hwp5 = os.environ.get("HWP_TXT_BIN") or "hwp5txt"
+    if shutil.which(hwp5) is None:
+        return None
+    try:
+        p = subprocess.run([hwp5, src_path], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except Exception:
+        return None
+    return p.stdout.decode("utf-8", errors="replace")
+
 def extract_hwp_to_text(src_path: str, out_txt_path: str) -> bool:
     """
     Try extracting text from HWP.
@@ -17,15 +31,10 @@ def extract_hwp_to_text(src_path: str, out_txt_path: str) -> bool:
     Returns True on success, False otherwise.
     """
     # 1) hwp5txt (recommended for simplicity)
-    hwp5 = os.environ.get("HWP_TXT_BIN") or "hwp5txt"
-    if shutil.which(hwp5) is not None:
-        try:
-            p = subprocess.run([hwp5, src_path], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            text = p.stdout.decode("utf-8", errors="replace")
-            _write_utf8(out_txt_path, text)
-            return True
-        except Exception:
-            pass
+    text = hwp_to_text(src_path)
+    if text is not None:
+        _write_utf8(out_txt_path, text)
+        return True
 
     # 2) pyhwp fallback (best-effort; environment dependent)
     try:
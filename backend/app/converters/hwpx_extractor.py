@@ -0,0 +1,158 @@
+import io
+import os
+import re
+import zipfile
+from typing import Iterator, List
+
+# HWPX = ZIP container of OWPML XML. Body text lives in Contents/section*.xml,
+# reading order of the sections is given by the OPF spine in Contents/content.hpf.
+_SECTION_RX = re.compile(r"^Contents/section(\d+)\.xml$", re.I)
+_MANIFEST = "Contents/content.hpf"
+
+
+def _local(tag) -> str:
+    return tag.rpartition("}")[2] if isinstance(tag, str) else ""
+
+
+def _section_names(zf: zipfile.ZipFile) -> List[str]:
+    """Section parts in reading order (OPF spine → numeric fallback)."""
+    names = set(zf.namelist())
+    ordered: List[str] = []
+    if _MANIFEST in names:
+        try:
+            from lxml import etree
+            root = etree.fromstring(zf.read(_MANIFEST))
+            hrefs = {}
+            for el in root.iter():
+                if _local(el.tag) == "item" and el.get("id") and el.get("href"):
+                    hrefs[el.get("id")] = el.get("href")
+            for el in root.iter():
+                if _local(el.tag) == "itemref":
+                    href = hrefs.get(el.get("idref") or "")
+                    if href and _SECTION_RX.match(href) and href in names:
+                        ordered.append(href)
+        except Exception:
+            ordered = []
+    if not ordered:
+        found = [(int(m.group(1)), n) for n in names for m in [_SECTION_RX.match(n)] if m]
+        ordered = [n for _, n in sorted(found)]
+    return ordered
+
+
+def _t_text(el) -> str:
+    """<hp:t> text including inline <hp:tab/>, <hp:lineBreak/> and their tails."""
+    parts = [el.text or ""]
+    for ch in el:
+        name = _local(ch.tag)
+        if name == "tab":
+            parts.append("\t")
+        elif name == "lineBreak":
+            parts.append("\n")
+        parts.append(ch.tail or "")
+    return "".join(parts)
+
+
+def _iter_section(fp) -> Iterator[str]:
+    """
+    Stream one section XML with iterparse and yield lines in document order:
+    paragraphs as-is, tables as one tab-separated line per row (cell paragraphs
+    joined with spaces). Processed elements are cleared so memory stays constant.
+    """
+    from lxml import etree
+
+    paras: List[List[str]] = []   # open <hp:p> buffers (paragraphs nest through tables)
+    cells: List[List[str]] = []   # open <hp:tc> contents
+    rows: List[List[str]] = []    # open <hp:tr> cells
+    in_t = 0                      # inside <hp:t>: keep inline children until the run text is read
+
+    def sink(line: str):
+        """Where a finished line goes: the enclosing table cell, or out."""
+        if cells:
+            cells[-1].append(line)
+            return None
+        return line
+
+    for event, el in etree.iterparse(fp, events=("start", "end"), huge_tree=True):
+        name = _local(el.tag)
+        if event == "start":
+            if name == "t":
+                in_t += 1
+            elif name == "p":
+                paras.append([])
+            elif name == "tbl":
+                # text that precedes the table inside the same paragraph comes first
+                if paras:
+                    pending = "".join(paras[-1]).strip()
+                    paras[-1].clear()
+                    if pending:
+                        out = sink(pending)
+                        if out is not None:
+                            yield out
+            elif name == "tr":
+                rows.append([])
+            elif name == "tc":
+                cells.append([])
+            continue
+
+        if name == "t":
+            in_t -= 1
+            if paras:
+                paras[-1].append(_t_text(el))
+        elif name == "p":
+            text = "".join(paras.pop()).strip() if paras else ""
+            if text:
+                out = sink(text)
+                if out is not None:
+                    yield out
+        elif name == "tc":
+            content = " ".join(cells.pop()) if cells else ""
+            if rows:
+                rows[-1].append(content)
+        elif name == "tr":
+            row = rows.pop() if rows else []
+            if any(c.strip() for c in row):
+                out = sink("\t".join(row))
+                if out is not None:
+                    yield out
+
+        # constant memory: drop the finished element and already-processed siblings
+        if in_t:
+            continue
+        el.clear(keep_tail=True)
+        parent = el.getparent()
+        if parent is not None:
+            while el.getprevious() is not None:
+                del parent[0]
+
+
+def iter_hwpx_text(src_path: str) -> Iterator[str]:
+    """
+    Yields text lines of an HWPX document, section by section.
+    Raises ImportError if lxml is not installed, zipfile.BadZipFile for broken containers.
+    """
+    try:
+        import lxml  # noqa: F401
+    except Exception as e:
+        raise ImportError("lxml is required for HWPX text extraction. pip install lxml") from e
+
+    with zipfile.ZipFile(src_path) as zf:
+        sections = _section_names(zf)
+        if not sections:
+            raise ValueError("HWPX has no Contents/section*.xml")
+        for name in sections:
+            with zf.open(name) as fp:
+                yield from _iter_section(fp)
+
+
+def extract_hwpx_to_text(src_path: str, out_txt_path: str) -> int:
+    """
+    Extracts paragraphs and table cells from HWPX straight to out_txt_path (line by line).
+    Returns the number of sections.
+    """
+    os.makedirs(os.path.dirname(out_txt_path) or ".", exist_ok=True)
+    with zipfile.ZipFile(src_path) as zf:
+        n_sections = len(_section_names(zf))
+    with io.open(out_txt_path, "w", encoding="utf-8") as f:
+        for line in iter_hwpx_text(src_path):
+            f.write(line + "\n")
+    return n_sections
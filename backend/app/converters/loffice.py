@@ -1,37 +1,398 @@
+"""
+LibreOffice (soffice) conversion to PDF through a pool of resident instances.
+
+Spawning `soffice --headless --convert-to` per file costs several seconds of
+startup, and two spawns sharing the default user profile collide. Instead each
+pool slot owns an isolated profile directory (-env:UserInstallation) and, when
+the `uno` module is importable (LibreOffice's Python bindings), keeps one
+headless soffice running and drives it over a named pipe:
+
+    soffice --headless --accept=pipe,name=<slot pipe>;urp;StarOffice.ComponentContext
+
+Instances are health-checked before use, recycled after LOFFICE_MAX_CONVERSIONS
+conversions (or after any failure), and killed by a watchdog if a conversion
+exceeds its timeout. Without `uno`, slots fall back to one-shot
+`--convert-to` runs that still use the slot's private profile, so concurrent
+conversions no longer collide (startup cost remains).
+
+Pool size is per process (each Celery prefork child has its own pool):
+LOFFICE_POOL_SIZE, LOFFICE_MAX_CONVERSIONS, LOFFICE_START_TIMEOUT,
+LOFFICE_PROFILE_DIR (see config.py).
+
+Lifetime: prefork children leave through os._exit, which skips atexit, so the
+worker calls shutdown_pool() from worker_process_shutdown. As a backstop for
+children that are killed outright, soffice is spawned with PR_SET_PDEATHSIG
+(Linux) and every spawned process group is recorded under PID_DIR; a new pool
+reaps groups whose owning process is gone.
+
+`uno` is not a pip package: install the distribution's python3-uno (or run the
+worker under LibreOffice's bundled Python) to get resident instances.
+"""
+import atexit
+import ctypes
+import logging
 import os
+import queue
 import shutil
+import signal
 import subprocess
-from typing import Optional
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from config import (
+    LOFFICE_BIN, LOFFICE_POOL_SIZE, LOFFICE_MAX_CONVERSIONS,
+    LOFFICE_START_TIMEOUT, LOFFICE_PROFILE_DIR,
+)
+
+try:  # only available when running under LibreOffice's Python (or with python3-uno)
+    import uno
+    from com.sun.star.beans import PropertyValue
+    HAS_UNO = True
+except Exception:
+    uno = None
+    PropertyValue = None
+    HAS_UNO = False
+
+logger = logging.getLogger(__name__)
+
+# spawned soffice process groups: <owner pid>-<tag> → pgid
+PID_DIR = Path(tempfile.gettempdir()) / "sumflow-lo-pids"
+
+_PR_SET_PDEATHSIG = 1
+try:
+    _libc = ctypes.CDLL("libc.so.6", use_errno=True) if sys.platform.startswith("linux") else None
+except OSError:
+    _libc = None
+
+# component service → PDF export filter
+_PDF_FILTERS = (
+    ("com.sun.star.text.GenericTextDocument", "writer_pdf_Export"),
+    ("com.sun.star.sheet.SpreadsheetDocument", "calc_pdf_Export"),
+    ("com.sun.star.presentation.PresentationDocument", "impress_pdf_Export"),
+    ("com.sun.star.drawing.DrawingDocument", "draw_pdf_Export"),
+)
+
+
+def _bin_name(explicit_bin: Optional[str] = None) -> str:
+    return explicit_bin or LOFFICE_BIN or os.environ.get("LOFFICE_BIN") or "soffice"
+
 
 def has_soffice(explicit_bin: Optional[str] = None) -> bool:
     """
     Check if LibreOffice (soffice) is available in PATH or via explicit binary.
     """
-    bin_name = explicit_bin or os.environ.get("LOFFICE_BIN") or "soffice"
-    return shutil.which(bin_name) is not None
+    return shutil.which(_bin_name(explicit_bin)) is not None
+
+
+def _props(**kw):
+    out = []
+    for k, v in kw.items():
+        p = PropertyValue()
+        p.Name, p.Value = k, v
+        out.append(p)
+    return tuple(out)
+
+
+def _kill_group(proc: Optional[subprocess.Popen]) -> None:
+    """soffice forks soffice.bin, so signal the whole session."""
+    if proc is None or proc.poll() is not None:
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except Exception:
+        try:
+            proc.kill()
+        except Exception:
+            pass
+    try:
+        proc.wait(timeout=10)
+    except Exception:
+        pass
+
+
+def _die_with_parent() -> None:
+    """preexec_fn: have the kernel SIGKILL soffice when the spawning worker dies."""
+    try:
+        _libc.prctl(_PR_SET_PDEATHSIG, signal.SIGKILL)
+    except Exception:
+        pass
+
+
+def _spawn(cmd: List[str]) -> subprocess.Popen:
+    return subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                            start_new_session=True,
+                            preexec_fn=_die_with_parent if _libc is not None else None)
+
+
+def _track(tag: str, proc: subprocess.Popen) -> None:
+    try:
+        PID_DIR.mkdir(parents=True, exist_ok=True)
+        (PID_DIR / f"{os.getpid()}-{tag}").write_text(str(proc.pid))
+    except OSError:
+        pass
+
+
+def _untrack(tag: str) -> None:
+    try:
+        (PID_DIR / f"{os.getpid()}-{tag}").unlink()
+    except OSError:
+        pass
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _is_soffice(pid: int) -> bool:
+    """Guard against pid reuse; without /proc we cannot tell, so trust the record."""
+    cmdline = Path(f"/proc/{pid}/cmdline")
+    if not Path("/proc").is_dir():
+        return True
+    try:
+        return b"soffice" in cmdline.read_bytes()
+    except OSError:
+        return False
+
+
+def reap_orphans() -> int:
+    """Kill soffice groups left behind by worker processes that no longer exist. Returns groups killed."""
+    killed = 0
+    try:
+        records = list(PID_DIR.iterdir())
+    except OSError:
+        return 0
+    for rec in records:
+        try:
+            owner = int(rec.name.split("-", 1)[0])
+            pgid = int(rec.read_text().strip())
+        except (OSError, ValueError):
+            continue
+        if _alive(owner):
+            continue
+        if _alive(pgid) and _is_soffice(pgid):
+            try:
+                os.killpg(pgid, signal.SIGKILL)
+                killed += 1
+            except OSError:
+                pass
+        try:
+            rec.unlink()
+        except OSError:
+            pass
+    if killed:
+        logger.warning("reaped %d orphaned soffice process group(s)", killed)
+    return killed
+
+
+class _Instance:
+    """One pool slot: a private profile and (with UNO) one resident soffice."""
+
+    def __init__(self, slot: int, bin_name: str, profile_root: Path):
+        self.slot = slot
+        self.bin_name = bin_name
+        self.profile = profile_root / f"{os.getpid()}-{slot}"
+        self.pipe = f"sumflow_lo_{os.getpid()}_{slot}"
+        self.proc: Optional[subprocess.Popen] = None
+        self.desktop = None
+        self.uses = 0
+
+    def _base_cmd(self) -> List[str]:
+        return [
+            self.bin_name,
+            f"-env:UserInstallation={self.profile.resolve().as_uri()}",
+            "--headless", "--invisible", "--nologo", "--norestore",
+            "--nodefault", "--nofirststartwizard", "--nolockcheck",
+        ]
+
+    # ----- resident instance (UNO) -----
+    def start(self) -> None:
+        self.profile.mkdir(parents=True, exist_ok=True)
+        cmd = self._base_cmd() + [f"--accept=pipe,name={self.pipe};urp;StarOffice.ComponentContext"]
+        self.proc = _spawn(cmd)
+        _track(str(self.slot), self.proc)
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local)
+        url = f"uno:pipe,name={self.pipe};urp;StarOffice.ComponentContext"
+        deadline = time.time() + LOFFICE_START_TIMEOUT
+        while True:
+            try:
+                ctx = resolver.resolve(url)
+                self.desktop = ctx.ServiceManager.createInstanceWithContext(
+                    "com.sun.star.frame.Desktop", ctx)
+                break
+            except Exception:
+                if self.proc.poll() is not None or time.time() > deadline:
+                    self.stop()
+                    raise RuntimeError(f"soffice slot {self.slot} did not start")
+                time.sleep(0.25)
+        self.uses = 0
+        logger.info("soffice slot %s started (pid=%s)", self.slot, self.proc.pid)
+
+    def healthy(self) -> bool:
+        if self.proc is None or self.proc.poll() is not None or self.desktop is None:
+            return False
+        try:
+            self.desktop.getComponents()
+            return True
+        except Exception:
+            return False
+
+    def stop(self) -> None:
+        if self.desktop is not None:
+            try:
+                self.desktop.terminate()
+            except Exception:
+                pass
+        self.desktop = None
+        if self.proc is not None:
+            try:
+                self.proc.wait(timeout=5)
+            except Exception:
+                _kill_group(self.proc)
+            _untrack(str(self.slot))
+        self.proc = None
+
+    def _convert_uno(self, src: Path, out_pdf: Path) -> None:
+        doc = self.desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(str(src)), "_blank", 0,
+            _props(Hidden=True, ReadOnly=True, UpdateDocMode=0),
+        )
+        if doc is None:
+            raise RuntimeError(f"soffice could not load {src.name}")
+        try:
+            filt = next((f for svc, f in _PDF_FILTERS if doc.supportsService(svc)), "writer_pdf_Export")
+            doc.storeToURL(uno.systemPathToFileUrl(str(out_pdf)), _props(FilterName=filt))
+        finally:
+            try:
+                doc.close(True)
+            except Exception:
+                pass
+
+    # ----- one-shot fallback (no UNO) -----
+    def _convert_cli(self, src: Path, out_dir: Path, timeout: int) -> None:
+        self.profile.mkdir(parents=True, exist_ok=True)
+        cmd = self._base_cmd() + ["--convert-to", "pdf", "--outdir", str(out_dir), str(src)]
+        proc = _spawn(cmd)
+        tag = f"{self.slot}-cli"
+        _track(tag, proc)
+        try:
+            if proc.wait(timeout=timeout) != 0:
+                raise RuntimeError(f"soffice exited with {proc.returncode}")
+        except subprocess.TimeoutExpired:
+            _kill_group(proc)
+            raise
+        finally:
+            _untrack(tag)
+
+    def convert(self, src: Path, out_dir: Path, timeout: int) -> Path:
+        out_pdf = out_dir / (src.stem + ".pdf")
+        if not HAS_UNO:
+            self._convert_cli(src, out_dir, timeout)
+            return out_pdf
+        if not self.healthy():
+            self.stop()
+            self.start()
+        # UNO calls cannot time out on their own: kill the instance if it hangs,
+        # which makes the pending call fail with a disposed-bridge error.
+        watchdog = threading.Timer(timeout, _kill_group, args=(self.proc,))
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            self._convert_uno(src, out_pdf)
+        finally:
+            watchdog.cancel()
+        self.uses += 1
+        return out_pdf
+
+
+class LibreOfficePool:
+    """Fixed number of slots handed out through a queue (blocking when all are busy)."""
+
+    def __init__(self, size: int, max_conversions: int, bin_name: str, profile_root: Path):
+        self.max_conversions = max(1, max_conversions)
+        self.profile_root = profile_root
+        self._slots: List[_Instance] = [_Instance(i, bin_name, profile_root) for i in range(max(1, size))]
+        self._idle: "queue.Queue[_Instance]" = queue.Queue()
+        for s in self._slots:
+            self._idle.put(s)
+
+    def convert(self, src_path: str, out_dir: str, timeout: int = 300) -> bool:
+        src, out = Path(src_path).resolve(), Path(out_dir).resolve()
+        out.mkdir(parents=True, exist_ok=True)
+        try:
+            inst = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            logger.warning("no free soffice slot for %s", src.name)
+            return False
+        ok = False
+        try:
+            ok = inst.convert(src, out, timeout).exists()
+        except Exception as e:
+            logger.warning("soffice slot %s failed on %s: %s", inst.slot, src.name, e)
+        finally:
+            # recycle after failures and every max_conversions documents (leaks, stale caches)
+            if HAS_UNO and (not ok or inst.uses >= self.max_conversions):
+                inst.stop()
+            self._idle.put(inst)
+        return ok
+
+    def shutdown(self) -> None:
+        for s in self._slots:
+            s.stop()
+            shutil.rmtree(s.profile, ignore_errors=True)
+        try:
+            self.profile_root.rmdir()
+        except OSError:
+            pass
+
+
+_pool: Optional[LibreOfficePool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(explicit_bin: Optional[str] = None) -> LibreOfficePool:
+    """Per-process pool (re-created after fork so children never share a parent's instances)."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            reap_orphans()
+            root = Path(LOFFICE_PROFILE_DIR) if LOFFICE_PROFILE_DIR else \
+                Path(tempfile.gettempdir()) / f"sumflow-lo-{os.getpid()}"
+            _pool = LibreOfficePool(LOFFICE_POOL_SIZE, LOFFICE_MAX_CONVERSIONS, _bin_name(explicit_bin), root)
+            _pool_pid = os.getpid()
+            atexit.register(shutdown_pool)
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop this process's instances (worker_process_shutdown / atexit). Safe to call repeatedly."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        pool, owned = _pool, _pool_pid == os.getpid()
+        _pool, _pool_pid = None, None
+    if pool is not None and owned:
+        pool.shutdown()
+
 
 def convert_to_pdf(src_path: str, out_dir: str, explicit_bin: Optional[str] = None, timeout: int = 300) -> bool:
     """
-    Use LibreOffice headless to convert a given document to PDF.
+    Convert a document to PDF using a pooled LibreOffice instance.
+    The PDF is written into out_dir as <basename>.pdf.
     Returns True on success, False otherwise.
     """
     os.makedirs(out_dir, exist_ok=True)
-    bin_name = explicit_bin or os.environ.get("LOFFICE_BIN") or "soffice"
-    if shutil.which(bin_name) is None:
-        return False
-
-    try:
-        # LibreOffice writes the PDF into out_dir with the same base filename
-        cmd = [
-            bin_name,
-            "--headless",
-            "--nologo",
-            "--nofirststartwizard",
-            "--convert-to", "pdf",
-            "--outdir", out_dir,
-            src_path,
-        ]
-        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
-        return True
-    except Exception:
+    if not has_soffice(explicit_bin):
         return False
+    return get_pool(explicit_bin).convert(src_path, out_dir, timeout=timeout)
@@ -0,0 +1,61 @@
+import io
+import os
+from typing import Iterator
+
+def _iter_shape_text(shape) -> Iterator[str]:
+    """Text of one shape in document order (groups are walked recursively, tables row by row)."""
+    if hasattr(shape, "shapes"):  # group shape
+        for sub in shape.shapes:
+            yield from _iter_shape_text(sub)
+        return
+    if getattr(shape, "has_table", False):
+        for row in shape.table.rows:
+            cells = [c.text.strip() for c in row.cells]
+            if any(cells):
+                yield "\t".join(cells)
+        return
+    if getattr(shape, "has_text_frame", False):
+        for para in shape.text_frame.paragraphs:
+            t = (para.text or "").replace("\v", "\n").strip()
+            if t:
+                yield t
+
+def iter_pptx_text(src_path: str) -> Iterator[str]:
+    """
+    Yields lines of slide text, slide by slide: a "[Slide N]" marker, shape text
+    (top-to-bottom, left-to-right), tables as tab-separated rows, then speaker notes.
+    Raises ImportError if python-pptx is not installed.
+    """
+    try:
+        from pptx import Presentation  # python-pptx
+    except Exception as e:
+        raise ImportError("python-pptx is required for PPTX text extraction. pip install python-pptx") from e
+
+    prs = Presentation(src_path)
+    for n, slide in enumerate(prs.slides, start=1):
+        yield f"[Slide {n}]"
+        shapes = sorted(slide.shapes, key=lambda s: ((s.top or 0), (s.left or 0)))
+        for shape in shapes:
+            yield from _iter_shape_text(shape)
+        if slide.has_notes_slide:
+            frame = slide.notes_slide.notes_text_frame
+            notes = (frame.text or "").strip() if frame is not None else ""
+            if notes:
+                yield "[Notes]"
+                yield notes
+        yield ""
+
+def extract_pptx_to_text(src_path: str, out_txt_path: str) -> int:
+    """
+    Extracts slide text and notes from PPTX straight to out_txt_path (line by line).
+    Returns the number of slides.
+    Raises ImportError if python-pptx is not installed.
+    """
+    os.makedirs(os.path.dirname(out_txt_path) or ".", exist_ok=True)
+    slides = 0
+    with io.open(out_txt_path, "w", encoding="utf-8") as f:
+        for line in iter_pptx_text(src_path):
+            if line.startswith("[Slide "):
+                slides += 1
+            f.write(line + "\n")
+    return slides
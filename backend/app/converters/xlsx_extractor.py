@@ -0,0 +1,55 @@
+import io
+import os
+from datetime import date, datetime, time
+from typing import Iterator
+
+def _cell(v) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    if isinstance(v, (datetime, date, time)):
+        return v.isoformat()
+    return str(v).strip()
+
+def iter_xlsx_text(src_path: str) -> Iterator[str]:
+    """
+    Yields a "[Sheet: name]" marker per worksheet followed by one tab-separated line per
+    non-empty row. Uses openpyxl read-only + values-only mode, so rows are streamed from
+    the sheet XML and large sheets stay in bounded memory. Formula cells yield their
+    cached values (data_only=True).
+    Raises ImportError if openpyxl is not installed.
+    """
+    try:
+        from openpyxl import load_workbook
+    except Exception as e:
+        raise ImportError("openpyxl is required for XLSX text extraction. pip install openpyxl") from e
+
+    wb = load_workbook(src_path, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            yield f"[Sheet: {ws.title}]"
+            for row in ws.iter_rows(values_only=True):
+                cells = [_cell(v) for v in row]
+                while cells and not cells[-1]:
+                    cells.pop()
+                if cells:
+                    yield "\t".join(cells)
+            yield ""
+    finally:
+        wb.close()
+
+def extract_xlsx_to_text(src_path: str, out_txt_path: str) -> int:
+    """
+    Extracts cell values from XLSX straight to out_txt_path (row by row).
+    Returns the number of worksheets.
+    Raises ImportError if openpyxl is not installed.
+    """
+    os.makedirs(os.path.dirname(out_txt_path) or ".", exist_ok=True)
+    sheets = 0
+    with io.open(out_txt_path, "w", encoding="utf-8") as f:
+        for line in iter_xlsx_text(src_path):
+            if line.startswith("[Sheet: "):
+                sheets += 1
+            f.write(line + "\n")
+    return sheets
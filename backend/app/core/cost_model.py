@@ -0,0 +1,133 @@
+# backend/app/core/cost_model.py
+"""
+업로드 시점 작업 비용(OCR/ingest 단계 소요) 추정 + 실측 기반 보정.
+
+- estimate_cost(path): 파일 종류 / 페이지 수(fitz 가벼운 open, 이미지는 프레임 수) / 텍스트 레이어 유무로 예상 초를 계산
+- record_actual(cost, actual_sec): 실측값을 Redis에 남겨 다음 추정에 반영
+    cost:samples       LIST  최근 샘플(JSON, 최신순)
+    cost:calib:{kind}  HASH  {"sec": 누적 실측 초, "units": 누적 단위(페이지/파일), "n": 샘플 수}
+"""
+from __future__ import annotations
+
+import json, os, time
+from typing import Optional
+
+import fitz
+
+from config import (
+    IMAGE_EXTS,
+    COST_SHORT_MAX_SECONDS,
+    COST_SCAN_SEC_PER_PAGE,
+    COST_TEXT_SEC_PER_PAGE,
+    COST_DOC_SEC_PER_FILE,
+    COST_CALIB_MIN_SAMPLES,
+)
+from core.ocr_engine import _count_frames   # 이미지 프레임 수 규칙(MPO는 1)을 OCR과 공유
+from utils.rcache import _r
+
+_SAMPLES_KEY = "cost:samples"
+_SAMPLES_KEEP = 5000
+
+# 종류별 기본 단가(초/단위)
+_DEFAULT_RATE = {
+    "pdf_scan": COST_SCAN_SEC_PER_PAGE,
+    "pdf_text": COST_TEXT_SEC_PER_PAGE,
+    "doc": COST_DOC_SEC_PER_FILE,
+    "image": COST_SCAN_SEC_PER_PAGE,   # 프레임 하나 ≈ 스캔 한 페이지 (실측으로 따로 보정)
+}
+
+
+def _calib_key(kind: str) -> str:
+    return f"cost:calib:{kind}"
+
+
+def _rate(kind: str) -> float:
+    """실측 샘플이 충분하면 보정 단가, 아니면 기본 단가"""
+    default = _DEFAULT_RATE.get(kind, COST_SCAN_SEC_PER_PAGE)
+    try:
+        h = _r.hgetall(_calib_key(kind)) or {}
+        n = int(h.get("n") or 0)
+        units = float(h.get("units") or 0)
+        if n >= COST_CALIB_MIN_SAMPLES and units > 0:
+            return float(h.get("sec") or 0) / units
+    except Exception:
+        pass
+    return default
+
+
+def _probe_pdf(path: str, sample_pages: int = 3) -> tuple[int, bool]:
+    """페이지 수 + 앞쪽 몇 페이지에 텍스트 레이어가 있는지 (렌더링 없이 메타만 확인)"""
+    with fitz.open(path) as doc:
+        pages = len(doc)
+        has_text = False
+        for i in range(min(pages, sample_pages)):
+            if len((doc[i].get_text("text") or "").strip()) >= 40:
+                has_text = True
+                break
+    return pages, has_text
+
+
+def _probe_image(path: str) -> int:
+    """OCR할 프레임 수 (헤더만 읽음, 디코딩 없음). MPO는 첫 프레임만 — ocr_engine과 같은 규칙"""
+    return _count_frames(path)
+
+
+def estimate_cost(path: str) -> dict:
+    """
+    반환: {"kind", "ext", "pages", "has_text_layer", "units", "est_seconds", "class"}
+      - class: "short" | "long" (COST_SHORT_MAX_SECONDS 기준)
+      - 파일을 열 수 없으면 보수적으로 long
+    """
+    ext = os.path.splitext(path)[1].lower()
+    pages: Optional[int] = None
+    has_text: Optional[bool] = None
+
+    if ext == ".pdf":
+        try:
+            pages, has_text = _probe_pdf(path)
+            kind = "pdf_text" if has_text else "pdf_scan"
+            units = max(1, pages)
+        except Exception:
+            return {"kind": "unknown", "ext": ext, "pages": None, "has_text_layer": None,
+                    "units": 1, "est_seconds": None, "class": "long"}
+    elif ext in IMAGE_EXTS:
+        try:
+            pages = _probe_image(path)
+        except Exception:
+            return {"kind": "unknown", "ext": ext, "pages": None, "has_text_layer": None,
+                    "units": 1, "est_seconds": None, "class": "long"}
+        kind, units, has_text = "image", max(1, pages), False
+    else:
+        kind, units = "doc", 1
+
+    est = round(_rate(kind) * units, 2)
+    return {
+        "kind": kind,
+        "ext": ext,
+        "pages": pages,
+        "has_text_layer": has_text,
+        "units": units,
+        "est_seconds": est,
+        "class": "short" if est <= COST_SHORT_MAX_SECONDS else "long",
+    }
+
+
+def record_actual(cost: Optional[dict], actual_sec: float) -> None:
+    """예상 vs 실측 저장 + 종류별 단가 보정 누적. Redis 장애 시 조용히 무시."""
+    if not cost or not cost.get("kind") or cost.get("kind") == "unknown":
+        return
+    sample = {
+        "kind": cost["kind"], "ext": cost.get("ext"), "pages": cost.get("pages"),
+        "class": cost.get("class"), "est": cost.get("est_seconds"),
+        "actual": round(actual_sec, 2), "at": int(time.time()),
+    }
+    try:
+        pipe = _r.pipeline()
+        pipe.lpush(_SAMPLES_KEY, json.dumps(sample))
+        pipe.ltrim(_SAMPLES_KEY, 0, _SAMPLES_KEEP - 1)
+        pipe.hincrbyfloat(_calib_key(cost["kind"]), "sec", actual_sec)
+        pipe.hincrbyfloat(_calib_key(cost["kind"]), "units", float(cost.get("units") or 1))
+        pipe.hincrby(_calib_key(cost["kind"]), "n", 1)
+        pipe.execute()
+    except Exception:
+        pass
@@ -19,6 +19,16 @@ def _env_timeout_sec() -> int:
     except Exception:
         return 420
 
+def _env_keep_alive():
+    """
+    모델 상주 시간(OLLAMA_KEEP_ALIVE). "30m", "2h" 같은 duration 문자열 또는 초 단위 숫자.
+    숫자 문자열은 int로 보낸다("-1" = 무기한 상주, Ollama가 문자열 "-1"은 거부함).
+    """
+    v = (os.getenv("OLLAMA_KEEP_ALIVE", "30m") or "").strip()
+    if re.fullmatch(r"-?\d+", v):
+        return int(v)
+    return v or "30m"
+
 def _httpx_timeout():
     """
     connect=30s, read/write는 OLLAMA_TIMEOUT(초).
@@ -152,12 +162,24 @@ def _extract_chat_content(json_obj: dict) -> str:
 # Ollama Calls (chat / generate)
 # ---------------------------
 
-def _call_ollama_chat(text: str, *, strong: bool = False) -> str:
+def _record_load(js: dict, stats: dict | None) -> None:
+    """응답의 load_duration(ns)을 stats["load_ms"]에 누적 (모델 콜드스타트 지표)."""
+    if stats is None or not isinstance(js, dict):
+        return
+    try:
+        ns = int(js.get("load_duration") or 0)
+    except Exception:
+        ns = 0
+    if ns > 0:
+        stats["load_ms"] = stats.get("load_ms", 0) + ns // 1_000_000
+
+def _call_ollama_chat(text: str, *, strong: bool = False, stats: dict | None = None) -> str:
     """
     Ollama /api/chat 호출 (단발, 스트림 X).
     - 성공 시 content 문자열
     - 실패/예외 시 빈 문자열
     - 상세 로깅 + 12초 고정 패턴 의심 신호 기록
+    - stats가 주어지면 모델 로딩 시간(load_ms)을 기록
     """
     host = _env_host()
     model = _env_model()
@@ -173,6 +195,7 @@ def _call_ollama_chat(text: str, *, strong: bool = False) -> str:
         "model": model,
         "messages":[system_msg, user_msg],
         "stream": False,
+        "keep_alive": _env_keep_alive(),
         "options": {
             "temperature": float(os.getenv("OLLAMA_TEMPERATURE", "0.2")),
             "num_ctx": int(os.getenv("OLLAMA_NUM_CTX", "8192")),
@@ -194,6 +217,7 @@ def _call_ollama_chat(text: str, *, strong: bool = False) -> str:
         try:
             js = r.json()
             content = _extract_chat_content(js)
+            _record_load(js, stats)
         except Exception as jex:
             # JSON 파싱 실패 시 text 그대로
             log.warning("[ollama/chat] JSON parse failed: %s", jex)
@@ -224,12 +248,13 @@ def _call_ollama_chat(text: str, *, strong: bool = False) -> str:
         log.error("[ollama/chat] request error after %.3fs: %s", elapsed, rex)
         return ""
 
-def _call_ollama_generate(text: str, *, strong: bool = False) -> str:
+def _call_ollama_generate(text: str, *, strong: bool = False, stats: dict | None = None) -> str:
     """
     Ollama /api/generate 호출 (백업 경로).
     - 성공 시 response 문자열
     - 실패/예외 시 빈 문자열
     - 상세 로깅 + 12초 고정 패턴 의심 신호 기록
+    - stats가 주어지면 모델 로딩 시간(load_ms)을 기록
     """
     host = _env_host()
     model = _env_model()
@@ -243,6 +268,7 @@ def _call_ollama_generate(text: str, *, strong: bool = False) -> str:
         "model": model,
         "prompt": system_plus_user,
         "stream": False,
+        "keep_alive": _env_keep_alive(),
         "options": {
             "temperature": float(os.getenv("OLLAMA_TEMPERATURE", "0.2")),
             "num_ctx": int(os.getenv("OLLAMA_NUM_CTX", "8192")),
@@ -264,6 +290,7 @@ def _call_ollama_generate(text: str, *, strong: bool = False) -> str:
         try:
             js = r.json()
             content = (js.get("response","") or "").strip()
+            _record_load(js, stats)
         except Exception as jex:
             log.warning("[ollama/generate] JSON parse failed: %s", jex)
             content = (r.text or "").strip()
@@ -293,6 +320,39 @@ def _call_ollama_generate(text: str, *, strong: bool = False) -> str:
         log.error("[ollama/generate] request error after %.3fs: %s", elapsed, rex)
         return ""
 
+# ---------------------------
+# Model residency (warm-up / heartbeat)
+# ---------------------------
+
+def warm_up_model() -> dict:
+    """
+    프롬프트 없이 /api/generate를 호출해 모델을 메모리에 올리고 keep_alive를 갱신한다.
+    워커 부팅 시(worker_ready)와 업무시간 heartbeat에서 사용.
+    반환: {"ok": bool, "ms": 총 소요, "load_ms": 모델 로딩(콜드스타트) 시간, "model": str}
+      - 이미 상주 중이면 load_ms ≈ 0
+    """
+    host = _env_host()
+    model = _env_model()
+    data = {"model": model, "keep_alive": _env_keep_alive(), "stream": False}
+    stats: dict = {}
+
+    t0 = time.monotonic()
+    ok = False
+    try:
+        with httpx.Client(timeout=_httpx_timeout()) as client:
+            r = client.post(f"{host}/api/generate", json=data, headers={"Content-Type":"application/json"})
+        r.raise_for_status()
+        _record_load(r.json(), stats)
+        ok = True
+    except Exception as e:
+        log.warning("[ollama/warmup] failed: %s", e)
+    ms = int((time.monotonic() - t0) * 1000)
+
+    load_ms = stats.get("load_ms", 0)
+    log.info("[ollama/warmup] model=%s ok=%s elapsed=%sms load=%sms keep_alive=%s",
+             model, ok, ms, load_ms, data["keep_alive"])
+    return {"ok": ok, "ms": ms, "load_ms": load_ms, "model": model}
+
 # ---------------------------
 # Summarize (public)
 # ---------------------------
@@ -302,8 +362,8 @@ def summarize_with_ollama(text: str, retries: int = 2):
     반환: (summary: str, ok: bool, meta: dict)
       meta 예시:
         {
-          "perf": [{"name":"llm","ms": 12034}],
-          "llm_meta": {"attempts": 2, "last_reason": "retry_too_short_or_error_token", "elapsed_sum": 12.1},
+          "perf": [{"name":"llm","ms": 12034}, {"name":"llm_load","ms": 4210}],
+          "llm_meta": {"attempts": 2, "last_reason": "retry_too_short_or_error_token", "elapsed_sum": 12.1, "load_ms": 4210},
           "llm_data": {"summary":"...", "category_name":"주/부"},
           "error": "...(있을 경우)"
         }
@@ -316,15 +376,16 @@ def summarize_with_ollama(text: str, retries: int = 2):
     attempts = 0
     elapsed_sum = 0.0
     last_reason = None
+    stats: dict = {}   # {"load_ms": int} - 모델 로딩(콜드스타트) 시간
 
     # 입력 과다 시 앞/뒤만 남기기
     text = _clip_for_heavy_input(text)
 
     def _try_chat_then_generate(src: str, *, strong: bool) -> str:
         """chat 먼저, 실패하면 generate 백업 경로"""
-        out = _call_ollama_chat(src, strong=strong)
+        out = _call_ollama_chat(src, strong=strong, stats=stats)
         if not _is_valid_summary(out):
-            out = _call_ollama_generate(src, strong=strong)
+            out = _call_ollama_generate(src, strong=strong, stats=stats)
         return out or ""
 
     # 1차 시도 (기본 지시)
@@ -335,7 +396,7 @@ def summarize_with_ollama(text: str, retries: int = 2):
 
     if _is_valid_summary(summary):
         ms = int((time.monotonic() - t0) * 1000)
-        return _finalize_ok(summary, attempts, elapsed_sum, ms)
+        return _finalize_ok(summary, attempts, elapsed_sum, ms, stats.get("load_ms", 0))
 
     last_reason = "too_short_or_bad_format" if summary else "empty_or_transport_error"
 
@@ -349,7 +410,7 @@ def summarize_with_ollama(text: str, retries: int = 2):
 
             if _is_valid_summary(summary2):
                 ms = int((time.monotonic() - t0) * 1000)
-                return _finalize_ok(summary2, attempts, elapsed_sum, ms)
+                return _finalize_ok(summary2, attempts, elapsed_sum, ms, stats.get("load_ms", 0))
 
             last_reason = "retry_bad_format_or_short" if summary2 else "retry_empty_or_transport_error"
             summary = summary2  # 마지막 응답 유지
@@ -360,9 +421,11 @@ def summarize_with_ollama(text: str, retries: int = 2):
         time.sleep(2 * (i + 1))
 
     ms_total = int((time.monotonic() - t0) * 1000)
+    load_ms = stats.get("load_ms", 0)
     meta = {
-        "perf":[{"name":"llm", "ms": ms_total}],
-        "llm_meta": {"attempts": attempts, "last_reason": last_reason, "elapsed_sum": round(elapsed_sum, 3)}
+        "perf": _llm_perf(ms_total, load_ms),
+        "llm_meta": {"attempts": attempts, "last_reason": last_reason,
+                     "elapsed_sum": round(elapsed_sum, 3), "load_ms": load_ms}
     }
     if last_err:
         meta["error"] = str(last_err)
@@ -373,15 +436,23 @@ def summarize_with_ollama(text: str, retries: int = 2):
 # Finalize helper
 # ---------------------------
 
-def _finalize_ok(output: str, attempts: int, elapsed_sum: float, ms: int):
+def _llm_perf(ms: int, load_ms: int) -> list:
+    """llm 총 소요 + (있으면) 모델 로딩 시간을 별도 지표(llm_load)로 분리"""
+    perf = [{"name": "llm", "ms": ms}]
+    if load_ms:
+        perf.append({"name": "llm_load", "ms": load_ms})
+    return perf
+
+def _finalize_ok(output: str, attempts: int, elapsed_sum: float, ms: int, load_ms: int = 0):
     obj = _parse_two_line_output(output)
 
     if not obj:
         summary_text = output.strip()
         summary_text = re.sub(r"<\|file_separator\|>", "", summary_text).strip()
         meta = {
-            "perf":[{"name":"llm", "ms": ms}],
-            "llm_meta": {"attempts": attempts, "last_reason": None, "elapsed_sum": round(elapsed_sum, 3)},
+            "perf": _llm_perf(ms, load_ms),
+            "llm_meta": {"attempts": attempts, "last_reason": None,
+                         "elapsed_sum": round(elapsed_sum, 3), "load_ms": load_ms},
             "llm_raw": output.strip(),   
         }
         return summary_text, True, meta
@@ -391,8 +462,9 @@ def _finalize_ok(output: str, attempts: int, elapsed_sum: float, ms: int):
     category_name = (obj.get("category_name") or "").strip()
 
     meta = {
-        "perf":[{"name":"llm", "ms": ms}],
-        "llm_meta": {"attempts": attempts, "last_reason": None, "elapsed_sum": round(elapsed_sum, 3)},
+        "perf": _llm_perf(ms, load_ms),
+        "llm_meta": {"attempts": attempts, "last_reason": None,
+                     "elapsed_sum": round(elapsed_sum, 3), "load_ms": load_ms},
         "llm_data": {
             "summary": summary_text,
             "category_name": category_name
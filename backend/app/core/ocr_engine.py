@@ -5,10 +5,16 @@ import os
 import io
 import time
 import re
+from typing import Iterator
+
 import fitz
 import pytesseract
+from celery.exceptions import SoftTimeLimitExceeded
 from PIL import Image, ImageOps, ImageFilter
 
+# 소프트 시간 제한(SoftTimeLimitExceeded)은 Exception이라 아래의 광범위한 except에 삼켜지기 쉽다.
+# 페이지/단계 실패를 건너뛰는 모든 except Exception 앞에서 다시 올려 ocr_stage의 long 승격이 동작하게 한다.
+
 # .env 기반 설정
 from config import (
     OCR_TEXTLAYER_FIRST,
@@ -18,6 +24,7 @@ from config import (
     OCR_USER_DPI,
     OCR_UPSCALE,
     OCR_DESKEW,
+    OCR_IMAGE_MAX_SIDE,
     TESSDATA_PREFIX,
 )
 
@@ -29,9 +36,10 @@ def _deskew_like(g: Image.Image) -> Image.Image:
     return g
 
 
-def _preprocess(img: Image.Image) -> Image.Image:
+def _preprocess(img: Image.Image, upscale: float | None = None) -> Image.Image:
     """
     흑백 -> 자동대비 -> 이진화 -> 미디안 -> (선택) 간이 디스큐 -> (선택) 업스케일
+    upscale: 기본 OCR_UPSCALE (이미지 경로는 작업 해상도 상한에 맞춰 낮춰서 넘긴다)
     """
     g = ImageOps.grayscale(img)
     g = ImageOps.autocontrast(g)
@@ -41,9 +49,10 @@ def _preprocess(img: Image.Image) -> Image.Image:
     if OCR_DESKEW:
         g = _deskew_like(g)
 
-    if OCR_UPSCALE and OCR_UPSCALE > 1.0:
+    upscale = OCR_UPSCALE if upscale is None else upscale
+    if upscale and upscale > 1.0:
         w, h = g.size
-        g = g.resize((max(1, int(w * OCR_UPSCALE)), max(1, int(h * OCR_UPSCALE))))
+        g = g.resize((max(1, int(w * upscale)), max(1, int(h * upscale))))
 
     return g
 
@@ -72,11 +81,15 @@ def _avg_conf(pil_img: Image.Image, lang: str, psm: int) -> float | None:
                 v = float(c)
                 if v >= 0:
                     confs.append(v)
+            except SoftTimeLimitExceeded:
+                raise
             except Exception:
                 pass
         if not confs:
             return None
         return round(sum(confs) / len(confs), 2)
+    except SoftTimeLimitExceeded:
+        raise
     except Exception:
         return None
 
@@ -88,6 +101,8 @@ def _has_sufficient_text_layer(page: fitz.Page, min_chars: int = 40) -> tuple[bo
         if len(t) >= min_chars:
             return True, t
         return False, ""
+    except SoftTimeLimitExceeded:
+        raise
     except Exception:
         return False, ""
 
@@ -105,6 +120,112 @@ def _pixmap_to_pil(pix: fitz.Pixmap) -> Image.Image:
     return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
 
 
+def _ocr_pass(frames: Iterator[tuple[Image.Image, float | None]], lang: str, psm: int,
+              text_chunks: list[str], confs: list[float]) -> None:
+    """
+    PDF/이미지 공통 OCR 루프: 전처리 → Tesseract → 평균 confidence.
+    frames는 (이미지, 업스케일) 를 한 장씩 내주는 이터레이터 — 한 번에 한 페이지만 메모리에 둔다.
+    """
+    config = f"--oem 1 --psm {psm}"
+    while True:
+        try:
+            item = next(frames)
+        except StopIteration:
+            break
+        except SoftTimeLimitExceeded:
+            raise
+        except Exception:
+            # 프레임별 실패는 이터레이터 안에서 건너뛴다 — 여기까지 올라온 예외는 더 읽을 수 없다는 뜻
+            break
+        try:
+            img, upscale = item
+            g = _preprocess(img, upscale)
+            text = pytesseract.image_to_string(g, lang=lang, config=config)
+            if text and text.strip():
+                text_chunks.append(text)
+            c = _avg_conf(g, lang, psm)
+            if c is not None:
+                confs.append(c)
+        except SoftTimeLimitExceeded:
+            raise
+        except Exception:
+            # 개별 페이지 실패는 건너뛰고 계속
+            continue
+
+
+def _pdf_frames(doc: fitz.Document, dpi: int) -> Iterator[tuple[Image.Image, float | None]]:
+    for p in doc:
+        try:
+            yield _pixmap_to_pil(p.get_pixmap(dpi=dpi)), None
+        except SoftTimeLimitExceeded:
+            raise
+        except Exception:
+            continue
+
+
+def _fit_frame(frame: Image.Image, max_side: int) -> tuple[Image.Image, float]:
+    """
+    긴 변이 max_side를 넘는 사진은 OCR 전에 줄이고, 작으면 전처리 업스케일을 max_side 안으로 제한.
+    returns (RGB 이미지, 전처리에 넘길 업스케일)
+    """
+    frame = ImageOps.exif_transpose(frame)   # 휴대폰 사진 회전 정보 반영
+    if frame.mode not in ("RGB", "L"):
+        frame = frame.convert("RGB")
+    long_side = max(frame.size) or 1
+    if max_side and long_side > max_side:
+        frame.thumbnail((max_side, max_side), Image.LANCZOS)
+        return frame, 1.0
+    up = OCR_UPSCALE or 1.0
+    if max_side:
+        up = min(up, max_side / long_side)
+    return frame, max(1.0, up)
+
+
+# 휴대폰 카메라의 MPO는 JPEG 본 사진 뒤에 미리보기/깊이 맵 프레임이 붙는다 → 첫 프레임만 OCR
+_JPEG_FORMATS = ("JPEG", "MPO")
+
+
+def _image_frames(file_path: str, max_side: int) -> Iterator[tuple[Image.Image, float]]:
+    """
+    이미지 파일의 프레임을 하나씩 디코딩해서 내준다 (멀티페이지 TIFF도 한 번에 한 프레임).
+    JPEG(MPO 포함)는 draft()로 디코딩 단계에서부터 축소해 큰 사진도 전체 해상도로 풀지 않는다.
+    깨진 프레임은 건너뛰고 다음 프레임으로 — 프레임 위치를 못 찾으면(seek 실패) 거기서 끝낸다.
+    """
+    with Image.open(file_path) as im:
+        if max_side and im.format in _JPEG_FORMATS:
+            w, h = im.size
+            scale = max_side / max(w, h, 1)
+            if scale < 1:
+                im.draft("RGB", (max(1, int(w * scale)), max(1, int(h * scale))))
+        last = 0 if im.format == "MPO" else None
+        i = 0
+        while last is None or i <= last:
+            try:
+                im.seek(i)
+            except EOFError:
+                break
+            except SoftTimeLimitExceeded:
+                raise
+            except Exception:
+                break
+            try:
+                frame = _fit_frame(im.copy(), max_side)
+            except SoftTimeLimitExceeded:
+                raise
+            except Exception:
+                frame = None
+            i += 1
+            if frame is not None:
+                yield frame
+
+
+def _count_frames(file_path: str) -> int:
+    with Image.open(file_path) as im:
+        if im.format == "MPO":
+            return 1
+        return int(getattr(im, "n_frames", 1) or 1)
+
+
 def extract_text_from_pdf(file_path: str, lang: str | None = None):
     """
     PDF → (텍스트 레이어 우선) → 이미지 렌더링 → OCR
@@ -156,6 +277,8 @@ def extract_text_from_pdf(file_path: str, lang: str | None = None):
                         "ocr_stats": {**_stats(text), "avg_conf": None},
                     }
                     return text, meta
+    except SoftTimeLimitExceeded:
+        raise
     except Exception:
         # 텍스트 레이어 단계 오류는 무시하고 OCR로 진행
         pass
@@ -165,26 +288,13 @@ def extract_text_from_pdf(file_path: str, lang: str | None = None):
         with fitz.open(file_path) as doc:
             t_render0 = time.perf_counter()
             pages = len(doc) or pages
-            for p in doc:
-                try:
-                    pix = p.get_pixmap(dpi=dpi_primary)
-                    img = _pixmap_to_pil(pix)
-                    g = _preprocess(img)
-                    text = pytesseract.image_to_string(
-                        g, lang=use_lang_primary, config=f"--oem 1 --psm {psm_primary}"
-                    )
-                    if text and text.strip():
-                        text_chunks.append(text)
-                    c = _avg_conf(g, use_lang_primary, psm_primary)
-                    if c is not None:
-                        confs.append(c)
-                except Exception:
-                    # 개별 페이지 실패는 건너뛰고 계속
-                    continue
+            _ocr_pass(_pdf_frames(doc, dpi_primary), use_lang_primary, psm_primary, text_chunks, confs)
             perf.append({
                 "name": f"render+ocr:psm{psm_primary}:{use_lang_primary}",
                 "ms": int((time.perf_counter() - t_render0) * 1000)
             })
+    except SoftTimeLimitExceeded:
+        raise
     except Exception:
         # 문서를 열 수 없거나 전체 실패 시 빈 상태로 진행
         pass
@@ -195,25 +305,13 @@ def extract_text_from_pdf(file_path: str, lang: str | None = None):
             with fitz.open(file_path) as doc:
                 t_render1 = time.perf_counter()
                 pages = len(doc) or pages
-                for p in doc:
-                    try:
-                        pix = p.get_pixmap(dpi=dpi_retry)
-                        img = _pixmap_to_pil(pix)
-                        g = _preprocess(img)
-                        text = pytesseract.image_to_string(
-                            g, lang=use_lang_retry, config=f"--oem 1 --psm {psm_retry}"
-                        )
-                        if text and text.strip():
-                            text_chunks.append(text)
-                        c = _avg_conf(g, use_lang_retry, psm_retry)
-                        if c is not None:
-                            confs.append(c)
-                    except Exception:
-                        continue
+                _ocr_pass(_pdf_frames(doc, dpi_retry), use_lang_retry, psm_retry, text_chunks, confs)
                 perf.append({
                     "name": f"retry:psm{psm_retry}:{use_lang_retry}",
                     "ms": int((time.perf_counter() - t_render1) * 1000)
                 })
+        except SoftTimeLimitExceeded:
+            raise
         except Exception:
             pass
 
@@ -228,3 +326,60 @@ def extract_text_from_pdf(file_path: str, lang: str | None = None):
         },
     }
     return text, meta
+
+
+def extract_text_from_image(file_path: str, lang: str | None = None):
+    """
+    JPG/PNG/TIFF → (PDF 변환 없이) 프레임별 OCR. 전처리/Tesseract 설정/폴백 규칙은 PDF 경로와 같다.
+    - 멀티페이지 TIFF는 프레임을 하나씩 디코딩 (전체를 메모리에 올리지 않음)
+    - 긴 변이 OCR_IMAGE_MAX_SIDE를 넘는 사진은 OCR 전에 축소
+    Returns: (text, meta) — extract_text_from_pdf와 같은 형식 (pages = 프레임 수)
+    """
+    t0 = time.perf_counter()
+    text_chunks: list[str] = []
+    confs: list[float] = []
+    perf: list[dict] = []
+
+    use_lang_primary = lang or OCR_LANG
+    use_lang_retry = OCR_LANG_SECONDARY
+    psm_primary = OCR_PSM_DEFAULT
+    psm_retry = 11 if psm_primary == 6 else 6
+    max_side = max(0, int(OCR_IMAGE_MAX_SIDE or 0))
+
+    if TESSDATA_PREFIX:
+        os.environ["TESSDATA_PREFIX"] = TESSDATA_PREFIX
+
+    try:
+        pages = _count_frames(file_path)
+    except SoftTimeLimitExceeded:
+        raise
+    except Exception:
+        pages = 0
+
+    # 1) 1차 OCR
+    t1 = time.perf_counter()
+    _ocr_pass(_image_frames(file_path, max_side), use_lang_primary, psm_primary, text_chunks, confs)
+    perf.append({
+        "name": f"decode+ocr:psm{psm_primary}:{use_lang_primary}",
+        "ms": int((time.perf_counter() - t1) * 1000)
+    })
+
+    # 2) 폴백: 결과가 비었을 때만 (프레임은 다시 디코딩)
+    if not any((t or "").strip() for t in text_chunks):
+        t2 = time.perf_counter()
+        _ocr_pass(_image_frames(file_path, max_side), use_lang_retry, psm_retry, text_chunks, confs)
+        perf.append({
+            "name": f"retry:psm{psm_retry}:{use_lang_retry}",
+            "ms": int((time.perf_counter() - t2) * 1000)
+        })
+
+    text = "\n\n".join([t for t in text_chunks if t and t.strip()]).strip()
+    meta = {
+        "perf": perf + [{"name": "ocr", "ms": int((time.perf_counter() - t0) * 1000)}],
+        "pages": pages,
+        "ocr_stats": {
+            **_stats(text),
+            "avg_conf": (round(sum(confs) / len(confs), 2) if confs else None),
+        },
+    }
+    return text, meta
@@ -1,6 +1,6 @@
 import os
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 """
@@ -62,4 +62,21 @@ def get_current_user(payload: dict = Depends(decode_access_token)):
         "USER_ID": user_id,
         "IS_ADMIN": payload.get("is_admin", False),
         "EMAIL": payload.get("email"),
-    }    
\ No newline at end of file
+    }    
+
+
+def owner_key(request: Request) -> str:
+    """
+    요청 주체(사용자) 식별 — 공정 스케줄링 단위, blob/커밋 결과 재사용 범위.
+    Bearer 토큰이 유효하면 u:<user_id>, 아니면 클라이언트 IP 기준 ip:<host>.
+    """
+    auth = request.headers.get("authorization") or ""
+    if auth.lower().startswith("bearer "):
+        try:
+            payload = jwt.decode(auth.split(" ", 1)[1], JWT_SECRET, algorithms=[JWT_ALGO])
+            uid = payload.get("user_id") or payload.get("sub")
+            if uid:
+                return f"u:{uid}"
+        except Exception:
+            pass
+    return f"ip:{request.client.host if request.client else 'unknown'}"
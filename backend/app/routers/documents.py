@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Body  # UPDATED
+from fastapi import APIRouter, Depends, HTTPException, Body, Request, Query  # UPDATED
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from sqlalchemy import update, func
 from typing import List, Dict  # UPDATED
 from datetime import datetime
-import time  # NEW
+import json, os, time  # NEW
 
 from core.db import get_db
 from models.document_model import Document
@@ -13,6 +15,13 @@ from core.security import get_current_user
 
 # NEW: Celery 연결 (진행도 조회용)
 from workers.celery_app import celery  # NEW
+from utils.rcache import _r, _ar, progress_channel
+from utils.task_status import bulk_task_meta, cached
+
+# SSE 연결 유지용 주석(ping) 간격(초) — 프록시 idle timeout보다 짧게
+SSE_PING_SECONDS = float(os.getenv("PROGRESS_SSE_PING_SECONDS", "15"))
+# 스트림 하나로 구독할 수 있는 배치 수 상한
+SSE_MAX_BATCHES = int(os.getenv("PROGRESS_SSE_MAX_BATCHES", "50"))
 
 router = APIRouter(prefix="/api/v1", tags=["Documents"])
 
@@ -42,8 +51,11 @@ def soft_delete_document(db: Session, doc: Document):
 
 # ========== PROGRESS (NEW) ==========
 def _calc_progress(async_result) -> Dict:  # NEW
-    state = async_result.state
-    info = async_result.info or {}
+    return _progress_from(async_result.state, async_result.info)
+
+def _progress_from(state: str, info) -> Dict:
+    """Celery 상태(state) + 메타(info)로 진행률 응답 계산 (AsyncResult 없이도 사용)"""
+    info = info if isinstance(info, dict) else {}
     now = time.time()
 
     if state in ("PENDING", "RECEIVED"):
@@ -80,17 +92,90 @@ def _calc_progress(async_result) -> Dict:  # NEW
 
     return {"state": state, "percent": None, "eta_seconds": None, "finish_at": None}
 
+# /progress/{task_id} 보다 먼저 등록해야 "stream"이 task_id로 잡히지 않는다
+@router.get("/progress/stream")  # 여러 배치 진행률을 한 연결로 push (SSE)
+async def stream_progress_multi(request: Request, batches: str = Query(..., description="쉼표로 구분한 batch_id 목록")):
+    """
+    업로드 세션 하나가 여러 배치를 보더라도 EventSource 1개로 받도록 다중 구독.
+    브라우저의 호스트당 연결 수 제한(HTTP/1.1 기준 6개)을 배치 수만큼 소모하지 않는다.
+    이벤트 형식은 /progress/stream/{batch_id} 와 같다 (snapshot은 모든 배치의 작업을 합친 것).
+    """
+    ids = list(dict.fromkeys(b.strip() for b in batches.split(",") if b.strip()))
+    if not ids:
+        raise HTTPException(status_code=400, detail="batches가 비어 있습니다.")
+    if len(ids) > SSE_MAX_BATCHES:
+        raise HTTPException(status_code=400, detail=f"batches는 최대 {SSE_MAX_BATCHES}개까지 가능합니다.")
+    return _sse_response(request, ids)
+
 @router.get("/progress/{task_id}")  # NEW: 단일 폴링
 def get_progress(task_id: str):
     return _calc_progress(celery.AsyncResult(task_id))
 
 @router.post("/progress/batch")  # NEW: 배치 폴링
 def get_progress_batch(payload: dict = Body(...)):
-    ids = payload.get("ids", [])
-    out = {}
-    for tid in ids:
-        out[tid] = _calc_progress(celery.AsyncResult(tid))
-    return {"results": out}
+    ids = [t for t in payload.get("ids", []) if t]
+    # 결과 키를 MGET 한 번으로 읽고, 같은 id 집합 요청은 짧게 캐시 공유
+    return cached(("progress", frozenset(ids)), lambda: {"results": _progress_many(ids)})
+
+def _progress_many(ids: List[str]) -> Dict:
+    metas = bulk_task_meta(ids)
+    return {tid: _progress_from(m["status"], m["result"]) for tid, m in metas.items()}
+
+def _batch_snapshot(batch_ids: List[str]) -> Dict:
+    """구독 시작 시점의 배치 전체 상태 (구독 전에 지나간 이벤트 보완)"""
+    try:
+        pipe = _r.pipeline(transaction=False)
+        for b in batch_ids:
+            pipe.lrange(f"batch:{b}:tasks", 0, -1)
+        ids = [t for chunk in pipe.execute() for t in (chunk or [])]
+    except Exception:
+        ids = []
+    return _progress_many(ids)
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+@router.get("/progress/stream/{batch_id}")  # NEW: 배치 진행률 push (SSE)
+async def stream_progress(batch_id: str, request: Request):
+    """
+    배치 진행 이벤트를 Server-Sent Events로 전달한다.
+    - 연결 직후 `snapshot` 1회 ({"results": {task_id: progress}}), 이후 `progress` 이벤트(task_id 포함 1건씩)
+    - 워커가 Redis pub/sub(progress:{batch_id})로 발행한 이벤트를 그대로 중계하므로
+      클라이언트 수 × 작업 수만큼 AsyncResult를 조회하지 않는다.
+    """
+    return _sse_response(request, [batch_id])
+
+def _sse_response(request: Request, batch_ids: List[str]) -> StreamingResponse:
+    channels = [progress_channel(b) for b in batch_ids]
+
+    async def gen():
+        pubsub = _ar.pubsub()
+        # 구독을 먼저 걸고 스냅샷을 떠야 그 사이 이벤트가 빠지지 않는다
+        await pubsub.subscribe(*channels)
+        try:
+            snap = await run_in_threadpool(_batch_snapshot, batch_ids)
+            yield _sse("snapshot", json.dumps({"results": snap}, ensure_ascii=False))
+            last = time.monotonic()
+            while not await request.is_disconnected():
+                msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if msg and msg.get("type") == "message":
+                    yield _sse("progress", msg["data"])
+                    last = time.monotonic()
+                elif time.monotonic() - last >= SSE_PING_SECONDS:
+                    yield ": ping\n\n"
+                    last = time.monotonic()
+        finally:
+            try:
+                await pubsub.unsubscribe(*channels)
+                await pubsub.close()
+            except Exception:
+                pass
+
+    return StreamingResponse(
+        gen(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # ========== MEMO ==========
 @router.get("/documents/{doc_id}/memos", response_model=List[MemoOut])
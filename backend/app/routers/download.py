@@ -5,6 +5,8 @@ from sqlalchemy import text
 import os, mimetypes
 from typing import Optional, Tuple
 
+from utils import paths
+
 try:
     from core.db import engine
 except Exception:
@@ -86,7 +88,10 @@ def find_original(id_or_key: str) -> Tuple[Optional[Path], Optional[str]]:
     # ── DB 매칭이 없으면 업로드 루트에서 직접 탐색 시도 (폴더/파일 키)
     if not row:
         # 업로드 루트/<id_or_key> 가 디렉터리면 그 안 최대 파일
-        cand_dir = (UPLOADS_DIR / str(id_or_key)).resolve()
+        try:
+            cand_dir = paths.batch_dir(UPLOADS_DIR, str(id_or_key))
+        except ValueError:
+            cand_dir = (UPLOADS_DIR / str(id_or_key)).resolve()
         if cand_dir.is_dir() and _safe_in(UPLOADS_DIR, cand_dir):
             p = _pick_largest_file(cand_dir)
             if p:
@@ -109,7 +114,10 @@ def find_original(id_or_key: str) -> Tuple[Optional[Path], Optional[str]]:
     if not batch_id:
         return None, original or changed
 
-    base = (UPLOADS_DIR / str(batch_id)).resolve()
+    try:
+        base = paths.batch_dir(UPLOADS_DIR, str(batch_id))   # 샤딩 → 레거시 순
+    except ValueError:
+        return None, original or changed
     if not (base.exists() and base.is_dir() and _safe_in(UPLOADS_DIR, base)):
         return None, original or changed
 
@@ -137,7 +145,12 @@ def find_text(id_or_key: str) -> Optional[Path]:
 
     row = _fetch_doc_row(id_or_key)
     result_id = (row or {}).get("RESULT_FOLDER_ID") or id_or_key
-    root = (OCR_DIR / str(result_id)).resolve()
+    # RESULT_FOLDER_ID = "<batch_id>/<task_id>" → 배치 폴더는 샤딩 위치일 수 있음
+    batch_id, _, rest = str(result_id).partition("/")
+    try:
+        root = (paths.batch_dir(OCR_DIR, batch_id) / rest).resolve()
+    except ValueError:
+        return None
     if not (root.exists() and root.is_dir() and _safe_in(OCR_DIR, root)):
         return None
 
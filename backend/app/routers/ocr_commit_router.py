@@ -7,6 +7,10 @@ from sqlalchemy import text
 from celery.result import AsyncResult
 import os, json
 
+from core.security import owner_key
+from utils import blob_store, paths
+from utils.result_store import atomic_write_json, hydrate
+
 # DB import (프로젝트 경로 자동 인식)
 try:
     from core.db import engine
@@ -48,8 +52,9 @@ _CAND_FILENAMES = ("result.json", "summary.json", "meta.json", "task.json")
 
 def _iter_candidates(roots: Iterable[Path], batch_id: str, task_id: str) -> Iterable[Path]:
     for r in roots:
-        yield r / batch_id / f"{task_id}.json"
-        tdir = r / batch_id / task_id
+        bdir = paths.batch_dir(r, batch_id)   # 샤딩(ab/cd/<batch>) → 레거시(<batch>)
+        yield bdir / f"{task_id}.json"
+        tdir = bdir / task_id
         for name in _CAND_FILENAMES:
             yield tdir / name
         if tdir.is_dir():
@@ -75,7 +80,7 @@ def _load_result(batch_id: str, task_id: str) -> dict:
         res = AsyncResult(task_id, app=app_)
         if res.state == "SUCCESS" and res.result:
             if isinstance(res.result, dict):
-                return res.result
+                return hydrate(res.result)
             try:
                 return json.loads(res.result)
             except Exception:
@@ -87,13 +92,10 @@ def _load_result(batch_id: str, task_id: str) -> dict:
 
 def _resolve_result_dir(batch_id: str, task_id: str) -> Path:
     for root in _default_result_roots():
-        tdir = root / batch_id / task_id
-        if tdir.is_dir():
-            return tdir
-        bdir = root / batch_id
+        bdir = paths.batch_dir(root, batch_id)
         if bdir.is_dir():
             return bdir / task_id
-    return _default_result_roots()[0] / batch_id / task_id
+    return paths.batch_dir(_default_result_roots()[0], batch_id) / task_id
 
 # -------------------------------------------------------------------
 # DB 헬퍼
@@ -192,7 +194,11 @@ class CommitReq(BaseModel):
 # -------------------------------------------------------------------
 @router.post("/commit")
 def commit(req: CommitReq, request: Request):
-    data = _load_result(req.batch_id, req.task_id)
+    try:
+        data = _load_result(req.batch_id, req.task_id)
+    except ValueError:
+        # 배치 id 규칙([\w-])에 안 맞음 (utils.paths) → 그런 결과는 없다
+        raise HTTPException(404, "result not found")
 
     # ----- 필드 정리 -----
     original_filename = (
@@ -214,7 +220,8 @@ def commit(req: CommitReq, request: Request):
     meta_rel = Path("meta.json")
     meta_obj = dict(data)
     meta_obj["committed"] = True
-    (result_dir / meta_rel).write_text(json.dumps(meta_obj, ensure_ascii=False, indent=2), encoding="utf-8")
+    # 정본(meta.json)만 원자적으로 갱신 — <task>.json 은 정본을 가리키는 링크
+    atomic_write_json(result_dir / meta_rel, meta_obj)
 
     payload = {
         "ORIGINAL_FILENAME": original_filename,
@@ -247,6 +254,13 @@ def commit(req: CommitReq, request: Request):
     except Exception as e:
         raise HTTPException(500, f"commit failed: {e}")
 
+    # 같은 사용자가 같은 내용을 다시 올리면 이 결과를 재사용 (workers.tasks.process_pdf)
+    # DB 반영이 끝난 뒤에만 기록 — 실패한 커밋의 결과가 재사용되지 않도록
+    # 재사용 범위는 커밋한 로그인 사용자 — IP 기준 식별은 공유될 수 있으므로 기록하지 않는다
+    owner = owner_key(request)
+    if owner.startswith("u:"):
+        blob_store.mark_committed(owner, data.get("sha256"), req.batch_id, req.task_id, result_dir / meta_rel)
+
     return {
         "ok": True,
         "document_id": doc_id,
@@ -0,0 +1,196 @@
+# backend/app/utils/blob_store.py
+"""
+업로드 원본 내용 주소(content-addressed) 저장소.
+
+같은 파일을 여러 배치로 다시 올려도 디스크에는 한 벌만 두고, 배치 폴더에는 하드 링크를 건다.
+
+  {BLOB_DIR}/<ab>/<cd>/<sha256>      내용 한 벌 (기본 BLOB_DIR = UPLOAD_DIR/.blobs, 같은 파일시스템이어야 링크 가능)
+  blob:committed:{owner}  HASH  sha256 → {"batch_id", "task_id", "path"}   그 사용자가 커밋(DB 반영)까지 끝낸 결과
+  blob:owner:{owner}  SET  그 사용자가 본문을 직접 올린 적이 있는 sha256
+
+- 업로드 저장이 끝나면 adopt(): 처음 보는 내용이면 blob으로 등록, 이미 있으면 방금 쓴 파일을 기존 blob 링크로 교체
+- 클라이언트는 본문을 보내기 전에 해시로 존재 여부를 묻고(check), 있으면 link_into()로 배치에 연결만 한다
+  조회/연결은 본문을 올린 사용자 본인 것으로만 한정 (claim / owned) — 해시만 알아서는
+  다른 사용자의 문서 보유 여부를 알아내거나 그 내용을 자기 배치로 가져올 수 없다
+- 커밋된 결과가 있는 내용은 파이프라인이 OCR/LLM을 건너뛰고 그 결과를 재사용한다 (workers.tasks.process_pdf)
+  재사용도 사용자 단위 — 다른 사용자의 요약/카테고리/작업 id가 새 결과로 넘어가지 않는다
+- 하드 링크를 못 거는 환경(다른 파일시스템 등)에서는 조용히 사본으로 동작
+
+정리(어느 배치도 참조하지 않는 blob 삭제):
+  python -m utils.blob_store --gc [--min-age 86400] [--dry-run]
+"""
+from __future__ import annotations
+
+import argparse, json, os, re, shutil, time
+from pathlib import Path
+from typing import List, Optional
+
+from config import UPLOAD_DIR
+from utils.rcache import _r
+
+BLOB_DIR = Path(os.getenv("BLOB_DIR") or Path(UPLOAD_DIR) / ".blobs").resolve()
+COMMITTED_KEY = "blob:committed:{owner}"
+OWNER_KEY = "blob:owner:{owner}"
+
+_HEX64 = re.compile(r"^[0-9a-f]{64}$")
+
+
+def valid_hash(sha256: Optional[str]) -> bool:
+    return bool(sha256) and bool(_HEX64.match(sha256))
+
+
+def blob_path(sha256: str) -> Path:
+    if not valid_hash(sha256):
+        raise ValueError(f"invalid sha256: {sha256!r}")
+    return BLOB_DIR / sha256[:2] / sha256[2:4] / sha256
+
+
+def exists(sha256: str) -> bool:
+    return valid_hash(sha256) and blob_path(sha256).is_file()
+
+
+def _replace_with_link(blob: Path, path: Path) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.link")
+    os.link(blob, tmp)
+    os.replace(tmp, path)
+
+
+def adopt(path, sha256: str) -> Path:
+    """
+    방금 저장한 파일을 blob 저장소에 올린다.
+    같은 내용이 이미 있으면 파일을 기존 blob에 대한 링크로 바꿔 중복 사본을 없앤다.
+    """
+    path = Path(path)
+    blob = blob_path(sha256)
+    try:
+        if blob.is_file():
+            if not os.path.samefile(blob, path):
+                _replace_with_link(blob, path)
+            return path
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(path, blob)
+        except FileExistsError:
+            # 동시에 같은 내용이 올라온 경우
+            _replace_with_link(blob, path)
+    except OSError:
+        pass
+    return path
+
+
+def link_into(sha256: str, dst) -> bool:
+    """이미 있는 blob을 dst(배치 업로드 폴더의 파일)로 연결. blob이 없으면 False."""
+    if not exists(sha256):
+        return False
+    blob, dst = blob_path(sha256), Path(dst)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(blob, dst)
+    except FileExistsError:
+        _replace_with_link(blob, dst)
+    except OSError:
+        shutil.copyfile(blob, dst)
+    return True
+
+
+# ---------- 사용자별 보유 목록 ----------
+def claim(owner: str, sha256: Optional[str]) -> None:
+    """owner가 이 내용의 본문을 직접 올렸음을 기록. Redis 장애 시 조용히 무시 (해시 업로드만 못 할 뿐)."""
+    if not owner or not valid_hash(sha256):
+        return
+    try:
+        _r.sadd(OWNER_KEY.format(owner=owner), sha256)
+    except Exception:
+        pass
+
+
+def owned(owner: str, hashes: List[str]) -> List[str]:
+    """hashes 중 owner가 보유한 것만 (순서 유지)"""
+    hashes = [h for h in hashes if valid_hash(h)]
+    if not owner or not hashes:
+        return []
+    try:
+        pipe = _r.pipeline(transaction=False)
+        for h in hashes:
+            pipe.sismember(OWNER_KEY.format(owner=owner), h)
+        flags = pipe.execute()
+    except Exception:
+        return []
+    return [h for h, ok in zip(hashes, flags) if ok]
+
+
+# ---------- 커밋된 결과 인덱스 ----------
+def mark_committed(owner: Optional[str], sha256: Optional[str], batch_id: str, task_id: str, path) -> None:
+    """커밋 시 호출. Redis 장애 시 조용히 무시 (재사용을 못 할 뿐 처리는 정상 진행)."""
+    if not owner or not valid_hash(sha256):
+        return
+    try:
+        _r.hset(COMMITTED_KEY.format(owner=owner), sha256, json.dumps(
+            {"batch_id": batch_id, "task_id": task_id, "path": str(path)}, ensure_ascii=False))
+    except Exception:
+        pass
+
+
+def committed_result(owner: Optional[str], sha256: Optional[str]) -> Optional[dict]:
+    """owner가 커밋한 같은 내용의 결과 레코드(정본 JSON 전체). 없거나 정본이 사라졌으면 None."""
+    if not owner or not valid_hash(sha256):
+        return None
+    try:
+        raw = _r.hget(COMMITTED_KEY.format(owner=owner), sha256)
+    except Exception:
+        return None
+    if not raw:
+        return None
+    try:
+        ent = json.loads(raw)
+        data = json.loads(Path(ent["path"]).read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    return data if isinstance(data, dict) and data.get("committed") else None
+
+
+def is_committed(owner: Optional[str], sha256: Optional[str]) -> bool:
+    if not owner or not valid_hash(sha256):
+        return False
+    try:
+        return bool(_r.hexists(COMMITTED_KEY.format(owner=owner), sha256))
+    except Exception:
+        return False
+
+
+# ---------- 정리 ----------
+def gc(*, min_age: int = 86400, dry_run: bool = False, log=print) -> int:
+    """링크가 blob 자신뿐(st_nlink == 1)이고 min_age초 이상 지난 blob 삭제"""
+    if not BLOB_DIR.is_dir():
+        return 0
+    cutoff = time.time() - min_age
+    n = 0
+    for p in BLOB_DIR.glob("??/??/*"):
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        if not p.is_file() or st.st_nlink > 1 or st.st_mtime > cutoff:
+            continue
+        log(f"[blob_store] {'would remove' if dry_run else 'remove'} {p.name}")
+        if not dry_run:
+            p.unlink(missing_ok=True)
+        n += 1
+    return n
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="업로드 blob 저장소 관리")
+    ap.add_argument("--gc", action="store_true", help="어느 배치도 참조하지 않는 blob 삭제")
+    ap.add_argument("--min-age", type=int, default=86400, help="이 시간(초) 안에 만든 blob은 남김")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args(argv)
+    if not args.gc:
+        ap.print_help()
+        return
+    print(f"[blob_store] {gc(min_age=args.min_age, dry_run=args.dry_run)} blobs "
+          f"{'to remove' if args.dry_run else 'removed'} under {BLOB_DIR}")
+
+
+if __name__ == "__main__":
+    main()
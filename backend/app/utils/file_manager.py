@@ -6,13 +6,13 @@ from __future__ import annotations
 def _is_allowed_ext(filename: str) -> bool:
     return Path(filename).suffix.lower() in ALLOWED_SINGLE_EXTS
 
-import re, unicodedata, hashlib
+import os, re, unicodedata, hashlib
 from pathlib import Path
 from config import ALLOWED_SINGLE_EXTS
 from typing import Tuple, Optional
 
 import aiofiles
-from config import UPLOAD_DIR
+from utils import blob_store, paths
 
 _SAFE = r"[^0-9A-Za-z가-힣._-]+"  # 허용 문자 외는 전부 "_"
 
@@ -38,16 +38,21 @@ def _dedupe_path(target: Path) -> Path:
             return cand
         i += 1
 
-async def save_upload(upfile, batch_id: str) -> tuple[str, str, str]:
-    """
-    returns (abs_path, saved_name, sha12)
-    - 저장 위치: {UPLOAD_DIR}/{batch_id}/{saved_name}
-    - 동일 파일명 존재 시 자동 번호 접미사 부여
-    """
-    batch_dir = Path(UPLOAD_DIR) / batch_id
+def _reserve_path(target: Path) -> Path:
+    """_dedupe_path와 같은 규칙으로 이름을 고르되, O_EXCL 생성으로 원자적으로 선점"""
+    while True:
+        cand = _dedupe_path(target)
+        try:
+            os.close(os.open(cand, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+            return cand
+        except FileExistsError:
+            continue
+
+def _target_path(batch_id: str, original: str) -> tuple[Path, str]:
+    """배치 업로드 폴더 안의 저장 경로(정규화 + 경로 탈출 방지 + 중복 회피)"""
+    batch_dir = paths.staging_dir(batch_id)
     batch_dir.mkdir(parents=True, exist_ok=True)
 
-    original = getattr(upfile, "filename", "file.pdf")
     saved_name = sanitize_filename(original)
     abs_path = (batch_dir / saved_name).resolve()
 
@@ -59,9 +64,19 @@ async def save_upload(upfile, batch_id: str) -> tuple[str, str, str]:
         abs_path = (batch_dir / "file.pdf").resolve()
         saved_name = "file.pdf"
 
-    # 동명이인 방지
-    abs_path = _dedupe_path(abs_path)
+    # 동명이인 방지 (동시 저장끼리도 같은 이름을 받지 않도록 빈 파일로 자리 확보)
+    abs_path = _reserve_path(abs_path)
     saved_name = abs_path.name  # 접미사가 붙었을 수 있음
+    return abs_path, saved_name
+
+async def save_upload(upfile, batch_id: str) -> tuple[str, str, str, str]:
+    """
+    returns (abs_path, saved_name, sha12, sha256)
+    - 저장 위치: {UPLOAD_DIR}/ab/cd/{batch_id}/{saved_name} (utils.paths.staging_dir)
+    - 동일 파일명 존재 시 자동 번호 접미사 부여
+    - 저장 후 blob 저장소에 등록 (같은 내용이 이미 있으면 하드 링크로 교체)
+    """
+    abs_path, saved_name = _target_path(batch_id, getattr(upfile, "filename", "file.pdf"))
 
     # 파일 저장 + 내용 기반 SHA 계산
     sha256 = hashlib.sha256()
@@ -71,13 +86,45 @@ async def save_upload(upfile, batch_id: str) -> tuple[str, str, str]:
     except Exception:
         pass
 
-    async with aiofiles.open(abs_path, "wb") as f:
-        while True:
-            chunk = await upfile.read(1024 * 1024)
-            if not chunk:
-                break
-            sha256.update(chunk)
-            await f.write(chunk)
+    try:
+        async with aiofiles.open(abs_path, "wb") as f:
+            while True:
+                chunk = await upfile.read(1024 * 1024)
+                if not chunk:
+                    break
+                sha256.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        abs_path.unlink(missing_ok=True)
+        raise
+
+    digest = sha256.hexdigest()
+    blob_store.adopt(abs_path, digest)
+    return str(abs_path), saved_name, digest[:12], digest
 
-    sha = sha256.hexdigest()[:12]
-    return str(abs_path), saved_name, sha
+def save_stream(src, filename: str, batch_id: str, max_bytes: Optional[int] = None,
+                chunk_size: int = 1024 * 1024) -> tuple[str, str, str, str]:
+    """
+    동기 스트림(ZIP 멤버 등)을 청크 단위로 저장하면서 SHA 계산. save_upload와 같은 규칙/반환값.
+    max_bytes를 넘으면 쓰던 파일을 지우고 ValueError.
+    """
+    abs_path, saved_name = _target_path(batch_id, filename)
+    sha256 = hashlib.sha256()
+    written = 0
+    try:
+        with open(abs_path, "wb") as f:
+            while True:
+                chunk = src.read(chunk_size)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if max_bytes is not None and written > max_bytes:
+                    raise ValueError(f"stream exceeds {max_bytes} bytes")
+                sha256.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        abs_path.unlink(missing_ok=True)
+        raise
+    digest = sha256.hexdigest()
+    blob_store.adopt(abs_path, digest)
+    return str(abs_path), saved_name, digest[:12], digest
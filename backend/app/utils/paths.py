@@ -0,0 +1,240 @@
+# backend/app/utils/paths.py
+"""
+배치 단위 저장 경로 결정 (업로드 원본 / 결과 공통).
+
+평면 구조(<root>/<batch_id>/)는 배치가 수십만 개 쌓이면 iterdir/백업/rglob이 느려지므로
+해시 fan-out 구조를 쓴다.
+
+  <root>/<ab>/<cd>/<batch_id>/          ab, cd = sha1(batch_id) 앞 4자리
+  <root>/<ab>/<cd>/<batch_id>.json      배치 메타 등 배치 옆에 두는 파일(sidecar)
+
+- 읽기: 샤딩 위치 → 레거시(<root>/<batch_id>) 순으로 찾으므로 마이그레이션 중에도 그대로 동작
+- 쓰기: 이미 있는 위치를 그대로 쓰고, 새 배치는 STORAGE_LAYOUT(기본 sharded)에 따른다
+- 경로 계산은 모두 이 모듈을 거친다 (tasks / checkpoint / file_manager / zip_handler / 라우터)
+
+레거시 배치 이동(서비스 중 실행 가능):
+  python -m utils.paths --migrate [--root DIR ...] [--dry-run] [--min-age 3600] [--no-link]
+  python -m utils.paths --prune-links [--root DIR ...]
+"""
+from __future__ import annotations
+
+import argparse, hashlib, os, re, shutil, time
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from config import RESULT_DIR, UPLOAD_DIR
+
+STORAGE_LAYOUT = os.getenv("STORAGE_LAYOUT", "sharded").lower()   # sharded | flat
+
+# ingest 단계가 정책명으로 옮겨 두는 원본 보관 루트 (download 라우터도 같은 루트를 본다)
+UPLOADS_ROOT = Path(os.getenv("FILE_UPLOADS_DIR") or Path(RESULT_DIR).resolve().parent / "uploads").resolve()
+
+_ID_RE = re.compile(r"^[\w\-]+$")
+_SHARD_RE = re.compile(r"^[0-9a-f]{2}$")
+
+
+def _check_id(batch_id: str) -> str:
+    batch_id = str(batch_id)
+    if not _ID_RE.match(batch_id):
+        raise ValueError(f"invalid batch id: {batch_id!r}")
+    return batch_id
+
+
+def shard_parts(batch_id: str) -> tuple[str, str]:
+    h = hashlib.sha1(_check_id(batch_id).encode("utf-8")).hexdigest()
+    return h[:2], h[2:4]
+
+
+def sharded_dir(root, batch_id: str) -> Path:
+    a, b = shard_parts(batch_id)
+    return Path(root).resolve() / a / b / batch_id
+
+
+def legacy_dir(root, batch_id: str) -> Path:
+    return Path(root).resolve() / _check_id(batch_id)
+
+
+def batch_dir(root, batch_id: str) -> Path:
+    """배치 폴더. 이미 있는 위치(샤딩 → 레거시)를 우선, 없으면 새로 쓸 위치."""
+    sharded = sharded_dir(root, batch_id)
+    if sharded.is_dir():
+        return sharded
+    legacy = legacy_dir(root, batch_id)
+    if legacy.is_dir():
+        return legacy
+    return legacy if STORAGE_LAYOUT == "flat" else sharded
+
+
+def batch_sidecar(root, batch_id: str, suffix: str) -> Path:
+    """배치 폴더 옆 파일(<batch_id>.json / .zip). 읽기/쓰기 위치 결정은 batch_dir과 같다."""
+    sharded = sharded_dir(root, batch_id).with_name(batch_id + suffix)
+    if sharded.exists():
+        return sharded
+    legacy = legacy_dir(root, batch_id).with_name(batch_id + suffix)
+    if legacy.exists():
+        return legacy
+    return legacy if STORAGE_LAYOUT == "flat" else sharded
+
+
+# ---------- 용도별 단축 ----------
+def result_dir(batch_id: str) -> Path:
+    """RESULT_DIR 아래 배치 결과 폴더"""
+    return batch_dir(RESULT_DIR, batch_id)
+
+def batch_meta_path(batch_id: str) -> Path:
+    """업로드 시 기록하는 배치 메타(tasks 목록)"""
+    return batch_sidecar(RESULT_DIR, batch_id, ".json")
+
+def staging_dir(batch_id: str) -> Path:
+    """업로드 직후 임시 저장 폴더 (UPLOAD_DIR)"""
+    return batch_dir(UPLOAD_DIR, batch_id)
+
+def upload_dir(batch_id: str) -> Path:
+    """ingest 이후 원본 보관 폴더 (UPLOADS_ROOT)"""
+    return batch_dir(UPLOADS_ROOT, batch_id)
+
+
+def iter_batch_dirs(root) -> Iterator[Path]:
+    """루트 아래 모든 배치 폴더 (레거시 + 샤딩). 샤딩 쪽은 ab/cd 두 단계만 내려간다."""
+    root = Path(root).resolve()
+    if not root.is_dir():
+        return
+    for p in root.iterdir():
+        if not p.is_dir():
+            continue
+        if _SHARD_RE.match(p.name) and not p.is_symlink():
+            for q in p.iterdir():
+                if q.is_dir() and _SHARD_RE.match(q.name):
+                    for b in q.iterdir():
+                        if b.is_dir():
+                            yield b
+        elif not p.is_symlink():
+            yield p
+
+
+# ---------- migration ----------
+def _inflight_batches() -> set:
+    """진행 중 작업이 있는 배치 (이동 보류 대상)"""
+    try:
+        from utils.rcache import _r
+        from workers.checkpoint import INFLIGHT_KEY
+        return {m.partition("/")[0] for m in _r.zrange(INFLIGHT_KEY, 0, -1)}
+    except Exception:
+        return set()
+
+
+def _reindex(batch_id: str, new_dir: Path) -> None:
+    from utils import task_index
+    for task_id, f in task_index.iter_batch_results(new_dir):
+        task_index.put(task_id, batch_id, f)
+
+
+def migrate_root(root, *, dry_run: bool = False, min_age: int = 3600,
+                 link: bool = True, reindex: bool = False, log=print) -> int:
+    """
+    레거시 <root>/<batch_id>[.json|.zip] 를 샤딩 위치로 옮긴다 (같은 파일시스템 rename이라 원자적).
+    - 최근 min_age초 안에 바뀌었거나 진행 중 작업이 있는 배치는 건너뛴다 (다음 실행 때 다시 시도)
+    - link=True면 옛 경로에 심볼릭 링크를 남겨, 이미 저장된 절대경로(ctx/결과 JSON의 file_path 등)도 계속 열린다
+    """
+    root = Path(root).resolve()
+    if not root.is_dir():
+        return 0
+    busy = _inflight_batches()
+    cutoff = time.time() - min_age
+    moved = 0
+    for p in list(root.iterdir()):
+        if p.is_symlink() or (p.is_dir() and _SHARD_RE.match(p.name)):
+            continue
+        batch_id = p.name if p.is_dir() else p.stem
+        if not _ID_RE.match(batch_id) or batch_id in busy:
+            continue
+        if p.is_file() and p.suffix not in (".json", ".zip"):
+            continue
+        try:
+            if p.stat().st_mtime > cutoff:
+                continue
+        except FileNotFoundError:
+            continue
+        dst = sharded_dir(root, batch_id)
+        if p.is_file():
+            dst = dst.with_name(p.name)
+        if dst.exists():
+            log(f"[paths] skip {p} (target exists: {dst})")
+            continue
+        log(f"[paths] {'would move' if dry_run else 'move'} {p} -> {dst}")
+        if dry_run:
+            moved += 1
+            continue
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(p, dst)
+        except OSError:
+            shutil.move(str(p), str(dst))   # 다른 파일시스템
+        if link:
+            try:
+                os.symlink(dst, p, target_is_directory=dst.is_dir())
+            except OSError as e:
+                log(f"[paths] link failed for {p}: {e}")
+        if reindex and dst.is_dir():
+            _reindex(batch_id, dst)
+        moved += 1
+    return moved
+
+
+def prune_links(root, *, dry_run: bool = False, log=print) -> int:
+    """migrate가 남긴 호환 링크 정리 (대상이 샤딩 위치에 있는 링크만)"""
+    root = Path(root).resolve()
+    n = 0
+    for p in list(root.iterdir()) if root.is_dir() else []:
+        if not p.is_symlink():
+            continue
+        batch_id = p.stem if p.suffix in (".json", ".zip") else p.name
+        try:
+            target = Path(os.readlink(p))
+            expected = sharded_dir(root, batch_id)
+        except (OSError, ValueError):
+            continue
+        if target.resolve().parent != expected.parent or not target.exists():
+            continue
+        log(f"[paths] {'would unlink' if dry_run else 'unlink'} {p}")
+        if not dry_run:
+            p.unlink()
+        n += 1
+    return n
+
+
+def _default_roots() -> List[str]:
+    out: List[str] = []
+    for r in (RESULT_DIR, UPLOAD_DIR, UPLOADS_ROOT):
+        s = str(Path(r).resolve())
+        if s not in out:
+            out.append(s)
+    return out
+
+
+def main(argv: Optional[list] = None) -> None:
+    ap = argparse.ArgumentParser(description="배치 저장소 샤딩 마이그레이션")
+    ap.add_argument("--migrate", action="store_true", help="레거시 평면 배치를 ab/cd/<batch_id>로 이동")
+    ap.add_argument("--prune-links", action="store_true", help="이동 후 남긴 호환 심볼릭 링크 제거")
+    ap.add_argument("--root", action="append", help="대상 루트(여러 번 지정 가능). 기본: RESULT_DIR, UPLOAD_DIR, FILE_UPLOADS_DIR")
+    ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--min-age", type=int, default=3600, help="최근 이 시간(초) 안에 바뀐 배치는 건너뜀")
+    ap.add_argument("--no-link", action="store_true", help="옛 경로에 호환 링크를 남기지 않음")
+    args = ap.parse_args(argv)
+
+    roots = args.root or _default_roots()
+    result_root = str(Path(RESULT_DIR).resolve())
+    if args.migrate:
+        for r in roots:
+            n = migrate_root(r, dry_run=args.dry_run, min_age=args.min_age, link=not args.no_link,
+                             reindex=(str(Path(r).resolve()) == result_root))
+            print(f"[paths] {r}: {n} entries {'to move' if args.dry_run else 'moved'}")
+    elif args.prune_links:
+        for r in roots:
+            print(f"[paths] {r}: {prune_links(r, dry_run=args.dry_run)} links pruned")
+    else:
+        ap.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 # backend/app/utils/rcache.py
 from __future__ import annotations
 
-import os
+import json, os
 import redis
+import redis.asyncio as aioredis
 from typing import Optional, Dict
 
 def _redis_url() -> str:
@@ -14,6 +15,8 @@ def _redis_url() -> str:
 
 # decode_responses=True → str 입출력
 _r = redis.Redis.from_url(_redis_url(), decode_responses=True)
+# asyncio 클라이언트 (SSE 구독 등 FastAPI 이벤트 루프 안에서 사용)
+_ar = aioredis.Redis.from_url(_redis_url(), decode_responses=True)
 
 def ocr_key(task_id: str) -> str:
     return f"ocr:{task_id}"
@@ -62,3 +65,16 @@ def del_ocr_text(task_id: str) -> None:
         _r.delete(ocr_key(task_id))
     except Exception:
         pass
+
+# ---------- 진행률 push (pub/sub) ----------
+def progress_channel(batch_id: str) -> str:
+    return f"progress:{batch_id}"
+
+def publish_progress(batch_id: Optional[str], event: dict) -> None:
+    """배치 채널로 진행 이벤트 발행. 구독자가 없거나 Redis 장애여도 파이프라인은 계속."""
+    if not batch_id:
+        return
+    try:
+        _r.publish(progress_channel(batch_id), json.dumps(event, ensure_ascii=False))
+    except Exception:
+        pass
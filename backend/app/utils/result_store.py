@@ -0,0 +1,112 @@
+# backend/app/utils/result_store.py
+"""
+작업 결과 레코드 저장/조회.
+
+- 정본(canonical): {배치 결과 폴더}/{task_id}/meta.json  (compact JSON, temp + rename 원자적 기록)
+- {배치 결과 폴더}/{task_id}.json 은 정본을 가리키는 심볼릭 링크(view)일 뿐 따로 쓰지 않는다.
+  링크를 만들 수 없는 환경(Windows 권한 등)에서는 view 없이 정본만 남고, 조회는 항상 정본을 먼저 본다.
+- 커밋 등 후속 갱신도 정본만 다시 쓴다 → 읽는 쪽이 반쯤 쓰인 파일을 보지 않는다.
+- Celery 결과 백엔드에는 전체 레코드 대신 포인터(pointer)만 남기고, 필요할 때 hydrate로 정본을 읽는다.
+"""
+from __future__ import annotations
+
+import json, os, threading
+from pathlib import Path
+from typing import Optional
+
+from utils import paths
+
+CANONICAL_NAME = "meta.json"
+
+
+def canonical_path(batch_id: str, task_id: str) -> Path:
+    return paths.result_dir(batch_id) / task_id / CANONICAL_NAME
+
+
+def view_path(batch_id: str, task_id: str) -> Path:
+    """예전 위치(<task_id>.json). 정본을 가리키는 링크."""
+    return paths.result_dir(batch_id) / f"{task_id}.json"
+
+
+def atomic_write_json(path, obj: dict) -> Path:
+    """compact JSON을 temp 파일에 쓴 뒤 rename"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(obj, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def _link_view(view: Path, target: Path) -> None:
+    if view.is_symlink():
+        return
+    try:
+        if view.exists():
+            view.unlink()        # 예전 버전이 따로 써 둔 전체 사본 → 링크로 교체
+        os.symlink(os.path.relpath(target, view.parent), view)
+    except OSError:
+        pass
+
+
+def write_result(batch_id: str, task_id: str, result: dict) -> Path:
+    """결과 레코드를 정본에 기록하고 view 링크 보장. 정본 경로 반환."""
+    p = atomic_write_json(canonical_path(batch_id, task_id), result)
+    _link_view(view_path(batch_id, task_id), p)
+    return p
+
+
+def find(batch_id: str, task_id: str) -> Optional[Path]:
+    """정본 → (예전 결과) <task_id>.json 순으로 존재하는 파일"""
+    for p in (canonical_path(batch_id, task_id), view_path(batch_id, task_id)):
+        if p.is_file():
+            return p
+    return None
+
+
+def load(batch_id: str, task_id: str) -> Optional[dict]:
+    p = find(batch_id, task_id)
+    if not p:
+        return None
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+
+# ---------- Celery 결과 포인터 ----------
+POINTER_KIND = "result_ref"
+_POINTER_FIELDS = (
+    "task_id", "batch_id", "original_filename", "changed_filename", "sha",
+    "category", "category_name", "llm_ok", "pages", "committed",
+)
+
+
+def pointer(result: dict, path) -> dict:
+    """결과 백엔드에 남길 작은 레코드 (식별자 + 목록 표시용 필드 + 정본 경로)"""
+    ref = {k: result.get(k) for k in _POINTER_FIELDS}
+    ref.update({"kind": POINTER_KIND, "result_path": str(path)})
+    return ref
+
+
+def is_pointer(payload) -> bool:
+    return isinstance(payload, dict) and payload.get("kind") == POINTER_KIND
+
+
+def hydrate(payload):
+    """포인터면 정본 전체 레코드로 바꿔 돌려준다. 정본을 못 읽으면 포인터 그대로."""
+    if not is_pointer(payload):
+        return payload
+    full = None
+    p = Path(payload.get("result_path") or "")
+    if p.name and p.is_file():
+        try:
+            full = json.loads(p.read_text(encoding="utf-8"))
+        except Exception:
+            full = None
+    if full is None and payload.get("batch_id") and payload.get("task_id"):
+        try:
+            full = load(payload["batch_id"], payload["task_id"])
+        except ValueError:
+            full = None
+    return full if isinstance(full, dict) else payload
@@ -0,0 +1,112 @@
+# backend/app/utils/task_index.py
+"""
+task_id → 결과 파일 위치 인덱스 (Redis HASH).
+
+finalize 단계가 결과 JSON을 저장하면서 기록하고,
+/api/v1/task/status 는 RESULT_DIR 아래 배치 폴더를 훑는 대신 여기서 한 번에 찾는다.
+
+  task:index   HASH  task_id → {"batch_id": ..., "path": <결과 JSON 절대경로>}
+
+기존 결과 색인(백필):
+  python -m utils.task_index --backfill [--root RESULT_DIR]
+"""
+from __future__ import annotations
+
+import argparse, json
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from utils import paths
+from utils.rcache import _r
+
+INDEX_KEY = "task:index"
+
+
+def put(task_id: str, batch_id: str, path) -> None:
+    """결과 위치 기록. Redis 장애 시 조용히 무시 (조회 쪽이 폴백)."""
+    if not task_id:
+        return
+    try:
+        _r.hset(INDEX_KEY, task_id, json.dumps(
+            {"batch_id": batch_id, "path": str(Path(path).resolve())}, ensure_ascii=False))
+    except Exception:
+        pass
+
+
+def get(task_id: str) -> Optional[dict]:
+    """{"batch_id", "path"} 또는 None"""
+    if not task_id:
+        return None
+    try:
+        raw = _r.hget(INDEX_KEY, task_id)
+        return json.loads(raw) if raw else None
+    except Exception:
+        return None
+
+
+def lookup_path(task_id: str) -> Optional[Path]:
+    """색인된 결과 파일 경로. 색인이 없거나 파일이 사라졌으면 None."""
+    ent = get(task_id)
+    if not ent or not ent.get("path"):
+        return None
+    p = Path(ent["path"])
+    return p if p.is_file() else None
+
+
+def remove(task_id: str) -> None:
+    try:
+        _r.hdel(INDEX_KEY, task_id)
+    except Exception:
+        pass
+
+
+def iter_batch_results(batch: Path) -> Iterator[Tuple[str, Path]]:
+    """배치 폴더 하나의 결과를 (task_id, path)로 나열 (정본 <task_id>/meta.json 우선)"""
+    seen = set()
+    for f in batch.glob("*/meta.json"):
+        seen.add(f.parent.name)
+        yield f.parent.name, f
+    for f in batch.glob("*.json"):
+        if f.stem not in seen:
+            yield f.stem, f
+
+
+def _iter_results(root: Path) -> Iterator[Tuple[str, str, Path]]:
+    """배치 폴더(레거시+샤딩)의 결과를 (task_id, batch_id, path)로 나열"""
+    for batch in paths.iter_batch_dirs(root):
+        for task_id, f in iter_batch_results(batch):
+            yield task_id, batch.name, f
+
+
+def backfill(root, chunk: int = 500) -> int:
+    """기존 결과 파일을 색인에 채운다(이미 있는 항목은 덮어씀). 색인한 개수 반환."""
+    root = Path(root).resolve()
+    if not root.exists():
+        return 0
+    n = 0
+    pipe = _r.pipeline()
+    for task_id, batch_id, path in _iter_results(root):
+        pipe.hset(INDEX_KEY, task_id, json.dumps(
+            {"batch_id": batch_id, "path": str(path)}, ensure_ascii=False))
+        n += 1
+        if n % chunk == 0:
+            pipe.execute()
+    pipe.execute()
+    return n
+
+
+def main(argv=None) -> None:
+    from config import RESULT_DIR
+
+    ap = argparse.ArgumentParser(description="task_id → 결과 파일 인덱스 관리")
+    ap.add_argument("--backfill", action="store_true", help="RESULT_DIR의 기존 결과를 색인")
+    ap.add_argument("--root", default=str(RESULT_DIR), help="결과 루트 (기본: config.RESULT_DIR)")
+    args = ap.parse_args(argv)
+    if not args.backfill:
+        ap.print_help()
+        return
+    print(f"[task_index] indexed {backfill(args.root)} results under {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# backend/app/utils/task_status.py
+"""
+Celery 작업 상태 일괄 조회.
+
+AsyncResult(tid).state 를 작업마다 부르면 작업 수만큼 Redis 왕복이 생긴다.
+여기서는 결과 백엔드의 celery-task-meta-* 키를 MGET 한 번(큰 배치는 청크 단위)으로 읽고,
+짧은 TTL 캐시를 두어 여러 화면이 같은 배치를 동시에 폴링해도 백엔드 조회는 한 번만 일어나게 한다.
+"""
+from __future__ import annotations
+
+import os, threading, time
+from typing import Callable, Dict, Iterable, List
+
+from workers.celery_app import celery
+
+# 같은 조회 결과를 재사용하는 시간(초). 0이면 캐시 끔
+STATUS_CACHE_TTL = float(os.getenv("PROGRESS_CACHE_TTL", "1.0"))
+_MGET_CHUNK = 500
+_CACHE_MAX = 1024
+
+
+def bulk_task_meta(ids: Iterable[str]) -> Dict[str, dict]:
+    """
+    task_id → {"status": str, "result": Any} (AsyncResult.state / .info 와 같은 값)
+    결과 키가 없으면 PENDING. Redis 결과 백엔드가 아니면 AsyncResult로 하나씩 조회한다.
+    """
+    ids = [t for t in dict.fromkeys(ids) if t]
+    if not ids:
+        return {}
+    backend = celery.backend
+    if not hasattr(backend, "get_key_for_task"):
+        return _one_by_one(ids)
+
+    out: Dict[str, dict] = {}
+    for i in range(0, len(ids), _MGET_CHUNK):
+        chunk = ids[i:i + _MGET_CHUNK]
+        try:
+            raws = backend.mget([backend.get_key_for_task(tid) for tid in chunk])
+        except NotImplementedError:
+            return _one_by_one(ids)
+        for tid, raw in zip(chunk, raws):
+            if raw is None:
+                out[tid] = {"status": "PENDING", "result": None}
+                continue
+            try:
+                meta = backend.decode_result(raw)
+            except Exception:
+                meta = {"status": "PENDING", "result": None}
+            out[tid] = {"status": meta.get("status") or "PENDING", "result": meta.get("result")}
+    return out
+
+
+def _one_by_one(ids: List[str]) -> Dict[str, dict]:
+    out = {}
+    for tid in ids:
+        r = celery.AsyncResult(tid)
+        out[tid] = {"status": r.state, "result": r.info}
+    return out
+
+
+class _TTLCache:
+    """프로세스 내 짧은 캐시 (uvicorn 워커마다 따로)."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._data: Dict[object, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, fn: Callable[[], object]):
+        if self.ttl <= 0:
+            return fn()
+        now = time.monotonic()
+        with self._lock:
+            hit = self._data.get(key)
+            if hit and hit[0] > now:
+                return hit[1]
+        value = fn()
+        with self._lock:
+            if len(self._data) >= _CACHE_MAX:
+                self._data = {k: v for k, v in self._data.items() if v[0] > now}
+                if len(self._data) >= _CACHE_MAX:
+                    self._data.clear()
+            self._data[key] = (now + self.ttl, value)
+        return value
+
+
+_cache = _TTLCache(STATUS_CACHE_TTL)
+
+
+def cached(key, fn: Callable[[], object]):
+    """key 단위로 fn() 결과를 STATUS_CACHE_TTL 동안 재사용"""
+    return _cache.get_or_compute(key, fn)
@@ -0,0 +1,293 @@
+# backend/app/utils/upload_session.py
+"""
+이어받기(resumable) 업로드 세션.
+
+큰 스캔 파일을 한 번의 multipart 요청으로 받으면 중간에 끊겼을 때 처음부터 다시 보내야 하므로,
+  create → PUT 청크(offset 지정) × N → finalize
+로 나눠 받는다. 끊기면 GET으로 현재 offset을 확인하고 그 지점부터 다시 보내면 된다.
+
+- 청크는 최종 저장 위치(utils.paths.staging_dir, file_manager 규칙과 동일한 파일명)에 바로 이어 쓴다
+  → finalize 때 복사/이동/재읽기 없음
+- SHA-256은 청크를 쓰는 동안 누적 계산 (프로세스 메모리).
+  API 프로세스가 재시작됐거나 다른 워커가 청크를 받아 누적값이 없으면, 그때 한 번만 앞부분을 다시 읽어 이어간다.
+
+- 버려진 세션: Redis 세션은 TTL로 사라지지만 받다 만 파일은 남으므로, create 때 reap()이
+  (분당 최대 한 번) 세션 키가 만료된 파일을 지운다. 프로세스 메모리의 누적 해시도 TTL 동안 안 쓰이면 버린다.
+
+Redis 키
+  upload:{upload_id}        HASH  batch_id / filename / path / size / offset / created_at  (TTL: UPLOAD_SESSION_TTL)
+  upload:{upload_id}:lock   STR   같은 세션에 PUT이 동시에 들어오는 것 방지
+  upload:active             ZSET  upload_id (score = 마지막 활동 시각) — 만료 세션 파일 정리용
+  upload:paths              HASH  upload_id → 받는 중인 파일 경로
+"""
+from __future__ import annotations
+
+import hashlib, threading, time
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional, Tuple
+from uuid import uuid4
+
+import aiofiles
+
+from config import RESUMABLE_MAX_BYTES, UPLOAD_CHUNK_MAX_BYTES, UPLOAD_SESSION_TTL
+from utils import blob_store
+from utils.file_manager import _is_allowed_ext, _target_path
+from utils.rcache import _r
+
+_LOCK_TTL = 300
+_REHASH_CHUNK = 1024 * 1024
+_ACTIVE = "upload:active"
+_PATHS = "upload:paths"
+_REAP_LOCK = "upload:reap-lock"
+_REAP_EVERY = 60
+
+# upload_id → (누적된 바이트 수, sha256 객체, 생성/마지막 갱신 시각)
+_hashers: Dict[str, Tuple[int, "hashlib._Hash", float]] = {}
+_hashers_lock = threading.Lock()
+
+
+class UploadSessionError(Exception):
+    """세션 오류. status/code는 그대로 HTTP 응답(status_code, error)으로 쓴다."""
+
+    def __init__(self, status: int, code: str, **extra):
+        super().__init__(code)
+        self.status = status
+        self.code = code
+        self.extra = extra
+
+
+def _key(upload_id: str) -> str:
+    return f"upload:{upload_id}"
+
+
+def _lock_key(upload_id: str) -> str:
+    return f"upload:{upload_id}:lock"
+
+
+def _public(state: dict) -> dict:
+    return {
+        "upload_id": state["upload_id"],
+        "batch_id": state["batch_id"],
+        "filename": state["filename"],
+        "size": state["size"],
+        "offset": state["offset"],
+        "chunk_max": UPLOAD_CHUNK_MAX_BYTES,
+    }
+
+
+def create(batch_id: str, original: str, size: int) -> dict:
+    """세션 생성 + 저장 파일 자리 확보(빈 파일). 파일명 규칙/중복 회피는 save_upload와 같다."""
+    if not _is_allowed_ext(original or ""):
+        raise UploadSessionError(400, "invalid_ext")
+    if size <= 0:
+        raise UploadSessionError(400, "invalid_size")
+    if size > RESUMABLE_MAX_BYTES:
+        raise UploadSessionError(413, "file_too_large", limit=RESUMABLE_MAX_BYTES)
+
+    reap()
+    abs_path, saved_name = _target_path(batch_id, original)
+    abs_path.touch()
+
+    upload_id = uuid4().hex
+    state = {
+        "upload_id": upload_id,
+        "batch_id": batch_id,
+        "filename": saved_name,
+        "path": str(abs_path),
+        "size": size,
+        "offset": 0,
+        "created_at": int(time.time()),
+    }
+    pipe = _r.pipeline()
+    pipe.hset(_key(upload_id), mapping=state)
+    pipe.expire(_key(upload_id), UPLOAD_SESSION_TTL)
+    pipe.zadd(_ACTIVE, {upload_id: state["created_at"]})
+    pipe.hset(_PATHS, upload_id, state["path"])
+    pipe.execute()
+    with _hashers_lock:
+        _hashers[upload_id] = (0, hashlib.sha256(), time.time())
+    return _public(state)
+
+
+def get(upload_id: str) -> Optional[dict]:
+    """세션 상태. 없거나 만료됐으면 None."""
+    h = _r.hgetall(_key(upload_id))
+    if not h:
+        return None
+    for k in ("size", "offset", "created_at"):
+        h[k] = int(h.get(k) or 0)
+    return h
+
+
+def status(upload_id: str) -> dict:
+    state = get(upload_id)
+    if not state:
+        raise UploadSessionError(404, "upload_not_found")
+    return _public(state)
+
+
+def _hasher_at(upload_id: str, path: str, offset: int) -> "hashlib._Hash":
+    """offset까지 누적된 sha256. 메모리에 없거나 어긋나 있으면 파일 앞부분을 다시 읽어 만든다."""
+    with _hashers_lock:
+        ent = _hashers.get(upload_id)
+    if ent and ent[0] == offset:
+        return ent[1]
+    h = hashlib.sha256()
+    left = offset
+    with open(path, "rb") as f:
+        while left > 0:
+            b = f.read(min(_REHASH_CHUNK, left))
+            if not b:
+                break
+            h.update(b)
+            left -= len(b)
+    if left:
+        raise UploadSessionError(409, "file_truncated", offset=offset - left)
+    return h
+
+
+async def append(upload_id: str, offset: int, body: AsyncIterator[bytes]) -> dict:
+    """
+    offset 위치부터 본문을 이어 쓴다. offset은 세션의 현재 offset과 같아야 한다(다르면 409 + 현재 offset).
+    도중에 연결이 끊겨도 실제로 쓴 만큼은 offset에 반영되므로, 클라이언트는 GET 후 이어서 보내면 된다.
+    """
+    state = get(upload_id)
+    if not state:
+        raise UploadSessionError(404, "upload_not_found")
+    if offset != state["offset"]:
+        raise UploadSessionError(409, "offset_mismatch", offset=state["offset"])
+    if not _r.set(_lock_key(upload_id), "1", nx=True, ex=_LOCK_TTL):
+        raise UploadSessionError(409, "upload_busy", offset=state["offset"])
+
+    size, path = state["size"], state["path"]
+    written = 0
+    try:
+        hasher = _hasher_at(upload_id, path, offset)
+    except BaseException:
+        _r.delete(_lock_key(upload_id))
+        raise
+    try:
+        async with aiofiles.open(path, "r+b") as f:
+            await f.seek(offset)
+            try:
+                async for piece in body:
+                    if not piece:
+                        continue
+                    if written + len(piece) > UPLOAD_CHUNK_MAX_BYTES:
+                        raise UploadSessionError(413, "chunk_too_large", limit=UPLOAD_CHUNK_MAX_BYTES)
+                    if offset + written + len(piece) > size:
+                        raise UploadSessionError(416, "beyond_declared_size", size=size)
+                    await f.write(piece)
+                    hasher.update(piece)
+                    written += len(piece)
+            finally:
+                await f.flush()
+    finally:
+        # 예외(연결 끊김 포함)가 나도 실제로 쓴 만큼은 반영
+        new_offset = offset + written
+        with _hashers_lock:
+            _hashers[upload_id] = (new_offset, hasher, time.time())
+        try:
+            pipe = _r.pipeline()
+            pipe.hset(_key(upload_id), "offset", new_offset)
+            pipe.expire(_key(upload_id), UPLOAD_SESSION_TTL)
+            pipe.zadd(_ACTIVE, {upload_id: int(time.time())})
+            pipe.delete(_lock_key(upload_id))
+            pipe.execute()
+        except Exception:
+            pass
+    state["offset"] = new_offset
+    return _public(state)
+
+
+def finalize(upload_id: str) -> Tuple[str, str, str, str, dict]:
+    """
+    모든 바이트를 받은 세션을 닫고 blob 저장소에 등록한다.
+    returns (abs_path, saved_name, sha12, sha256, state) — file_manager.save_upload와 같은 형식 + 세션 상태
+    """
+    state = get(upload_id)
+    if not state:
+        raise UploadSessionError(404, "upload_not_found")
+    if state["offset"] != state["size"]:
+        raise UploadSessionError(409, "incomplete", offset=state["offset"], size=state["size"])
+    if not _r.set(_lock_key(upload_id), "1", nx=True, ex=_LOCK_TTL):
+        raise UploadSessionError(409, "upload_busy", offset=state["offset"])
+    try:
+        digest = _hasher_at(upload_id, state["path"], state["size"]).hexdigest()
+        # 세션 키와 정리 대상 등록을 함께 지운다 → reap()이 완성된 파일을 지우는 일이 없다
+        pipe = _r.pipeline()
+        pipe.delete(_key(upload_id))
+        pipe.zrem(_ACTIVE, upload_id)
+        pipe.hdel(_PATHS, upload_id)
+        pipe.execute()
+    finally:
+        _r.delete(_lock_key(upload_id))
+        with _hashers_lock:
+            _hashers.pop(upload_id, None)
+    blob_store.adopt(state["path"], digest)
+    return state["path"], state["filename"], digest[:12], digest, state
+
+
+def abort(upload_id: str) -> bool:
+    """세션 취소 + 받던 파일 삭제"""
+    state = get(upload_id)
+    with _hashers_lock:
+        _hashers.pop(upload_id, None)
+    if not state:
+        return False
+    pipe = _r.pipeline()
+    pipe.delete(_key(upload_id), _lock_key(upload_id))
+    pipe.zrem(_ACTIVE, upload_id)
+    pipe.hdel(_PATHS, upload_id)
+    pipe.execute()
+    Path(state["path"]).unlink(missing_ok=True)
+    return True
+
+
+def _prune_hashers(now: float) -> None:
+    """TTL 동안 갱신이 없는 누적 해시 제거 (세션이 만료됐거나 다른 프로세스가 이어받은 경우)"""
+    with _hashers_lock:
+        for uid in [u for u, ent in _hashers.items() if now - ent[2] > UPLOAD_SESSION_TTL]:
+            del _hashers[uid]
+
+
+def reap(limit: int = 200) -> int:
+    """
+    세션 키가 만료된(버려진) 업로드의 받다 만 파일을 지운다. 지운 파일 수.
+    API 프로세스들이 번갈아 부르므로 Redis 락으로 _REAP_EVERY초에 한 번만 실제로 돈다.
+    """
+    now = time.time()
+    _prune_hashers(now)
+    try:
+        if not _r.set(_REAP_LOCK, "1", nx=True, ex=_REAP_EVERY):
+            return 0
+        ids = _r.zrangebyscore(_ACTIVE, 0, now - UPLOAD_SESSION_TTL, start=0, num=limit)
+        if not ids:
+            return 0
+        pipe = _r.pipeline(transaction=False)
+        for uid in ids:
+            pipe.exists(_key(uid))
+            pipe.hget(_PATHS, uid)
+        res = pipe.execute()
+    except Exception:
+        return 0
+    removed = 0
+    for uid, alive, path in zip(ids, res[0::2], res[1::2]):
+        if alive:
+            continue   # 활동 기록만 늦은 살아 있는 세션
+        if path:
+            try:
+                Path(path).unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue   # 다음 주기에 다시
+        try:
+            pipe = _r.pipeline()
+            pipe.zrem(_ACTIVE, uid)
+            pipe.hdel(_PATHS, uid)
+            pipe.execute()
+        except Exception:
+            pass
+    return removed
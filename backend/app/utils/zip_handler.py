@@ -1,39 +1,156 @@
 # backend/app/utils/zip_handler.py
 
 from __future__ import annotations
-import shutil
+import os
+import zipfile
 from pathlib import Path
-from config import RESULT_DIR
+from typing import Iterator, List, Tuple
 
-def build_batch_zip(batch_id: str) -> str:
+from config import ZIP_MAX_RATIO, ZIP_MAX_MEMBER_BYTES, ZIP_MAX_UNCOMPRESSED_BYTES
+from utils import paths
+from utils.file_manager import save_stream
+
+# 이미 압축된 포맷 → 다시 deflate 해도 거의 줄지 않으므로 stored(무압축)로 담는다
+COMPRESSED_EXTS = {
+    ".pdf", ".zip", ".docx", ".xlsx", ".pptx", ".hwpx", ".odt",
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".gz", ".7z",
+}
+STORE_MODES = ("auto", "all", "none")
+_CHUNK = 1024 * 1024
+
+# (압축 파일 내 경로, 실제 경로, 압축 방식)
+ZipEntry = Tuple[str, Path, int]
+
+
+class _StreamSink:
     """
-    RESULT_DIR/{batch_id} 디렉토리의 모든 결과(JSON 등)를 ZIP으로 묶어 반환.
-    이미 존재하면 재생성(덮어쓰기).
-    
-    Returns:
-        zip_path (str): 생성된 ZIP 파일의 절대 경로
+    ZipFile이 쓰는 출력 버퍼. tell/seek이 없으므로 ZipFile은 스트리밍 모드
+    (로컬 헤더 뒤 data descriptor에 CRC/크기 기록)로 동작한다.
+    쓰인 바이트는 drain()으로 꺼내 바로 응답으로 흘려보낸다.
+    """
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+
+    def write(self, b) -> int:
+        self._parts.append(bytes(b))
+        return len(b)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+
+def _compress_type(path: Path, store: str) -> int:
+    if store == "all":
+        return zipfile.ZIP_STORED
+    if store == "auto" and path.suffix.lower() in COMPRESSED_EXTS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def batch_entries(batch_id: str, *, include_originals: bool = False, store: str = "auto") -> List[ZipEntry]:
+    """
+    배치 결과 폴더(utils.paths.result_dir)의 결과 파일 목록.
+    - 체크포인트(_stages), 임시 파일(.*), 정본을 가리키는 링크(<task>.json)는 제외
+    - include_originals=True면 원본(utils.paths.upload_dir)을 originals/ 아래에 추가
+
     Raises:
-        FileNotFoundError: batch_id 디렉토리가 없거나 비어 있는 경우
+        FileNotFoundError: 배치 결과 폴더가 없거나 비어 있는 경우
     """
-    batch_dir = Path(RESULT_DIR) / batch_id
-    if not batch_dir.exists() or not batch_dir.is_dir():
+    if store not in STORE_MODES:
+        raise ValueError(f"store must be one of {STORE_MODES}")
+    batch_dir = paths.result_dir(batch_id)
+    if not batch_dir.is_dir():
         raise FileNotFoundError(f"no such batch results dir: {batch_dir}")
 
-    # 결과 파일이 하나도 없으면 오류
-    files = list(batch_dir.glob("*"))
-    if not files:
+    entries: List[ZipEntry] = []
+    for root, dirs, files in os.walk(batch_dir):
+        dirs[:] = sorted(d for d in dirs if d != "_stages" and not d.startswith("."))
+        for name in sorted(files):
+            p = Path(root) / name
+            if name.startswith(".") or p.is_symlink():
+                continue
+            arc = p.relative_to(batch_dir).as_posix()
+            # 결과 JSON/텍스트는 압축이 잘 되므로 항상 deflate
+            entries.append((arc, p, zipfile.ZIP_DEFLATED))
+    if not entries:
         raise FileNotFoundError(f"empty batch result dir: {batch_dir}")
 
-    # base_name = zip 확장자 제외 경로 (shutil.make_archive 요구사항)
-    zip_base = batch_dir.parent / batch_id
-    zip_path = str(zip_base) + ".zip"
+    if include_originals:
+        up = paths.upload_dir(batch_id)
+        if up.is_dir():
+            for p in sorted(up.iterdir()):
+                if p.is_file() and not p.name.startswith("."):
+                    entries.append((f"originals/{p.name}", p, _compress_type(p, store)))
+    return entries
+
+
+def stream_zip(entries: List[ZipEntry], chunk_size: int = _CHUNK) -> Iterator[bytes]:
+    """
+    ZIP을 만들면서 바로 바이트 조각으로 내보낸다 (임시 파일/디스크 사본 없음).
+    CRC는 항목을 쓰는 동안 계산되고, 4GB 이상 항목/아카이브는 ZIP64로 기록된다.
+    목록 작성 후 사라진 파일은 건너뛴다.
+    """
+    sink = _StreamSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+        for arcname, path, compress_type in entries:
+            try:
+                info = zipfile.ZipInfo.from_file(path, arcname)
+                src = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            info.compress_type = compress_type
+            with src, zf.open(info, "w") as dst:
+                while True:
+                    chunk = src.read(chunk_size)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    # central directory
+    data = sink.drain()
+    if data:
+        yield data
+
+
+# ---------- 업로드 ZIP 해제 ----------
+class ZipRejected(Exception):
+    """zip bomb 한도 초과 / 암호화 등으로 거부. code는 API 응답의 error 값."""
+
+    def __init__(self, code: str, detail: str = ""):
+        super().__init__(detail or code)
+        self.code = code
 
-    # 기존 zip 제거 후 새로 생성
-    p = Path(zip_path)
-    if p.exists():
-        p.unlink()
 
-    # shutil.make_archive는 확장자 제외 base_name 사용해야 함
-    shutil.make_archive(str(zip_base), "zip", root_dir=batch_dir)
+def check_archive(infos: List[zipfile.ZipInfo]) -> None:
+    """중앙 디렉터리(선언 크기) 기준 전체 해제 크기 검사 — 아무것도 풀기 전에 거른다."""
+    total = sum(i.file_size for i in infos)
+    if total > ZIP_MAX_UNCOMPRESSED_BYTES:
+        raise ZipRejected("zip_uncompressed_too_large", f"{total} > {ZIP_MAX_UNCOMPRESSED_BYTES}")
 
-    return str(zip_path)
+
+def extract_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo, batch_id: str) -> tuple[str, str, str, str]:
+    """
+    멤버 하나를 업로드 폴더로 스트리밍 해제 (메모리에 통째로 올리지 않음).
+    returns (abs_path, saved_name, sha12, sha256) — file_manager.save_upload와 같은 형식
+    - 암호화 / 멤버 크기 / 압축률 한도 초과는 ZipRejected
+    - 실제 해제량은 선언 크기(file_size)를 넘지 못하고, CRC 불일치는 zipfile이 BadZipFile로 알린다
+    """
+    if info.flag_bits & 0x1:
+        raise ZipRejected("encrypted")
+    if info.file_size > ZIP_MAX_MEMBER_BYTES:
+        raise ZipRejected("member_too_large", f"{info.file_size} > {ZIP_MAX_MEMBER_BYTES}")
+    if info.file_size > max(info.compress_size, 1) * ZIP_MAX_RATIO:
+        raise ZipRejected("ratio_exceeded", f"{info.file_size}/{info.compress_size} > {ZIP_MAX_RATIO}")
+    with zf.open(info) as src:
+        return save_stream(src, Path(info.filename).name, batch_id, max_bytes=info.file_size)
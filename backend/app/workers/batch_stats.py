@@ -0,0 +1,112 @@
+# backend/app/workers/batch_stats.py
+"""
+배치 집계 카운터 (Redis).
+
+batch_status가 매 요청마다 작업 상태를 전부 다시 세지 않도록,
+작업 상태가 바뀔 때마다 배치 단위 합계를 원자적으로(Lua) 갱신해 둔다 → 조회는 O(1).
+
+Redis 키
+  batch:{batch_id}:agg     HASH  total / queued / progress / success / failure / pct_sum
+  batch:{batch_id}:tstate  HASH  task_id → "<state>|<percent>" (직전 값, 증감 계산용)
+
+상태: queued(대기) → progress(처리 중) → success | failure
+실패한 작업도 배치 진행률 계산에서는 끝난 것(100%)으로 본다.
+"""
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+from utils.rcache import _r
+
+STATES = ("queued", "progress", "success", "failure")
+FINAL_STATES = ("success", "failure")
+# 마지막 갱신 이후 보관 기간(초)
+STATS_TTL = int(os.getenv("BATCH_STATS_TTL", str(7 * 24 * 3600)))
+
+
+def _agg(batch_id: str) -> str:
+    return f"batch:{batch_id}:agg"
+
+def _tstate(batch_id: str) -> str:
+    return f"batch:{batch_id}:tstate"
+
+
+# 직전 상태/퍼센트를 빼고 새 값을 더한다. 끝난 작업에 늦게 도착한 진행 보고는 무시.
+# queued는 처음 보는 작업에만 적용 → 등록(register)이 첫 진행 보고보다 늦게 도착해도 되돌리지 않는다.
+_TRANSITION = _r.register_script("""
+local prev = redis.call('HGET', KEYS[2], ARGV[1])
+local new_state, new_pct = ARGV[2], tonumber(ARGV[3])
+if prev and new_state == 'queued' then
+  return 0
+end
+if prev then
+  local sep = string.find(prev, '|', 1, true)
+  local prev_state = string.sub(prev, 1, sep - 1)
+  local prev_pct = tonumber(string.sub(prev, sep + 1))
+  if prev_state == 'success' or prev_state == 'failure' then
+    return 0
+  end
+  if prev_state == new_state and prev_pct == new_pct then
+    return 0
+  end
+  redis.call('HINCRBY', KEYS[1], prev_state, -1)
+  redis.call('HINCRBY', KEYS[1], 'pct_sum', new_pct - prev_pct)
+else
+  redis.call('HINCRBY', KEYS[1], 'total', 1)
+  redis.call('HINCRBY', KEYS[1], 'pct_sum', new_pct)
+end
+redis.call('HINCRBY', KEYS[1], new_state, 1)
+redis.call('HSET', KEYS[2], ARGV[1], new_state .. '|' .. ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+return 1
+""")
+
+
+def transition(batch_id: Optional[str], task_id: Optional[str], state: str, percent: int = 0) -> None:
+    """작업 상태 변경 반영. Redis 장애 시 조용히 무시 (batch_status는 전체 조회로 폴백)."""
+    if not batch_id or not task_id or state not in STATES:
+        return
+    if state in FINAL_STATES:
+        percent = 100
+    try:
+        _TRANSITION(keys=[_agg(batch_id), _tstate(batch_id)],
+                    args=[task_id, state, int(max(0, min(100, percent))), STATS_TTL])
+    except Exception:
+        pass
+
+
+def register(batch_id: str, task_id: str) -> None:
+    """업로드 시점 등록 (queued, 0%)"""
+    transition(batch_id, task_id, "queued", 0)
+
+
+def register_many(batch_id: str, task_ids, pipe=None) -> None:
+    """여러 작업을 한 번에 등록. pipe를 주면 거기에 실어 보내고(실행은 호출 측), 없으면 바로 실행."""
+    if not batch_id or not task_ids:
+        return
+    own = pipe is None
+    try:
+        if own:
+            pipe = _r.pipeline()
+        for tid in task_ids:
+            _TRANSITION(keys=[_agg(batch_id), _tstate(batch_id)],
+                        args=[tid, "queued", 0, STATS_TTL], client=pipe)
+        if own:
+            pipe.execute()
+    except Exception:
+        pass
+
+
+def read(batch_id: str) -> Optional[dict]:
+    """집계 읽기. 카운터가 없으면 None."""
+    try:
+        h = _r.hgetall(_agg(batch_id))
+    except Exception:
+        return None
+    if not h:
+        return None
+    out = {k: max(0, int(h.get(k) or 0)) for k in ("total", *STATES)}
+    out["pct_sum"] = max(0, int(h.get("pct_sum") or 0))
+    return out
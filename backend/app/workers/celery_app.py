@@ -9,6 +9,7 @@ if _APP_DIR not in sys.path:
 
 import os
 from celery import Celery
+from celery.schedules import crontab
 
 # ------------------------------
 # Broker / Backend URL
@@ -45,6 +46,41 @@ celery.conf.update(
     enable_utc=False,
 )
 
+# ------------------------------
+# Queue Routing (단계별 전용 큐 → 큐마다 워커 풀/동시성을 따로 운용)
+# ------------------------------
+# - ingest   : process_pdf(진입점) / ingest_stage (파일 이동 + 문서 텍스트 추출, 가벼움)
+# - ocr      : ocr_stage (PDF 렌더링 + Tesseract, CPU 바운드 → prefork 풀)
+# - ocr_long : 비용 추정상 오래 걸리는 OCR (core/cost_model.py, tasks._ocr_route)
+# - llm      : llm_stage / heartbeat (Ollama 응답 대기 → threads 풀, 높은 동시성)
+# - finalize : finalize_stage (결과 파일 저장)
+INGEST_QUEUE = os.getenv("CELERY_INGEST_QUEUE", "ingest")
+OCR_QUEUE = os.getenv("CELERY_OCR_QUEUE", "ocr")
+OCR_LONG_QUEUE = os.getenv("CELERY_OCR_LONG_QUEUE", "ocr_long")
+LLM_QUEUE = os.getenv("CELERY_LLM_QUEUE", "llm")
+FINALIZE_QUEUE = os.getenv("CELERY_FINALIZE_QUEUE", "finalize")
+celery.conf.task_routes = {
+    "app.workers.tasks.process_pdf": {"queue": INGEST_QUEUE},
+    "app.workers.tasks.ingest_stage": {"queue": INGEST_QUEUE},
+    "app.workers.tasks.ocr_stage": {"queue": OCR_QUEUE},
+    "app.workers.tasks.llm_stage": {"queue": LLM_QUEUE},
+    "app.workers.tasks.finalize_stage": {"queue": FINALIZE_QUEUE},
+    "app.workers.tasks.ollama_heartbeat": {"queue": LLM_QUEUE},
+    "app.workers.tasks.recover_orphans": {"queue": INGEST_QUEUE},
+    "app.workers.tasks.pump_fair_queue": {"queue": INGEST_QUEUE},
+}
+
+# ------------------------------
+# Message Priority (workers/fair_queue.py 의 priority/normal 레인)
+# ------------------------------
+# Redis 브로커는 큐를 우선순위 단계별로 나눠(priority_steps) 작은 숫자부터 소비한다.
+# 우선순위가 실제로 먹히려면 워커 prefetch를 1로 두는 것이 좋다(CELERYD_PREFETCH_MULTIPLIER=1).
+celery.conf.broker_transport_options = {
+    **(celery.conf.broker_transport_options or {}),
+    "priority_steps": list(range(10)),
+}
+celery.conf.task_default_priority = 6
+
 # ------------------------------
 # Extra Config (from .env)
 # ------------------------------
@@ -53,7 +89,8 @@ if str(os.getenv("broker_connection_retry_on_startup", "true")).lower() == "true
     celery.conf.broker_connection_retry_on_startup = True
 
 # 2) result_expires 설정 (초 단위)
-_res_exp = os.getenv("CELERY_RESULT_EXPIRES")
+#    결과 본문은 결과 폴더(utils/result_store)에 남고 백엔드에는 포인터만 있으므로 짧게 유지한다 (기본 6시간).
+_res_exp = os.getenv("CELERY_RESULT_EXPIRES", "21600")
 if _res_exp and _res_exp.isdigit():
     celery.conf.result_expires = int(_res_exp)
 
@@ -62,6 +99,39 @@ _prefetch = os.getenv("CELERYD_PREFETCH_MULTIPLIER")
 if _prefetch and _prefetch.isdigit():
     celery.conf.worker_prefetch_multiplier = int(_prefetch)
 
+# 4) Ollama heartbeat: 업무시간 동안 주기적으로 모델을 상주시킴 (celery beat 필요)
+#    OLLAMA_KEEP_ALIVE는 heartbeat 간격보다 길게 잡아야 한다.
+if str(os.getenv("OLLAMA_HEARTBEAT_ENABLED", "true")).lower() == "true":
+    celery.conf.beat_schedule = {
+        **(celery.conf.beat_schedule or {}),
+        "ollama-heartbeat": {
+            "task": "app.workers.tasks.ollama_heartbeat",
+            "schedule": crontab(
+                minute=f"*/{os.getenv('OLLAMA_HEARTBEAT_MINUTES', '10')}",
+                hour=os.getenv("OLLAMA_HEARTBEAT_HOURS", "8-19"),
+                day_of_week=os.getenv("OLLAMA_HEARTBEAT_DAYS", "mon-fri"),
+            ),
+        },
+    }
+
+# 5) 고아 작업 복구 스윕: 워커 크래시로 멈춘 작업을 체크포인트에서 재개 (celery beat 필요)
+celery.conf.beat_schedule = {
+    **(celery.conf.beat_schedule or {}),
+    "recover-orphans": {
+        "task": "app.workers.tasks.recover_orphans",
+        "schedule": float(os.getenv("PIPELINE_RECOVERY_INTERVAL", "600")),
+    },
+}
+
+# 6) 공정 스케줄러 안전망 pump (빈 슬롯 주기적 채우기)
+celery.conf.beat_schedule = {
+    **(celery.conf.beat_schedule or {}),
+    "fair-queue-pump": {
+        "task": "app.workers.tasks.pump_fair_queue",
+        "schedule": float(os.getenv("FAIR_PUMP_INTERVAL", "5")),
+    },
+}
+
 # ------------------------------
 # Task Auto-discovery
 # ------------------------------
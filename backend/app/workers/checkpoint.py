@@ -0,0 +1,120 @@
+# backend/app/workers/checkpoint.py
+"""
+파이프라인 단계별 체크포인트.
+
+- 위치: {배치 결과 폴더(utils.paths.result_dir)}/{task_id}/_stages/{stage}.json
+- 단계(ingest/ocr/llm)가 끝날 때마다 중간 결과를 원자적으로(temp + rename) 기록하고,
+  재시도/재투입된 태스크는 체크포인트가 있으면 해당 단계를 건너뛴다.
+- 체크포인트는 task_id(경로) + 파일 SHA(_sha 필드)로 식별한다.
+  같은 task_id라도 SHA가 다르면(파일이 바뀌었으면) 무효로 보고 다시 계산한다.
+- 같은 폴더는 문서 변환(ingest)의 작업 폴더이기도 하다. 변환 산출물(PDF/텍스트)은 그 내용이
+  체크포인트에 담기거나(OCR 완료) 작업이 최종 실패하면 바로 지운다(prune_artifacts) → 폴더는 JSON만 남는다.
+- finalize 단계에서 결과 JSON이 저장되면 체크포인트 폴더는 정리한다.
+
+진행 중 작업 레지스트리(Redis ZSET, score = 마지막 진행 보고 시각)도 여기서 관리한다.
+워커가 죽어 진행 보고가 끊긴 작업은 recover_orphans 스윕이 체크포인트에서 이어서 재투입한다.
+"""
+from __future__ import annotations
+
+import json, os, shutil, time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from utils import paths
+from utils.rcache import _r
+
+CKPT_VERSION = 1
+INFLIGHT_KEY = "pipeline:inflight"   # member = "<batch_id>/<task_id>"
+
+
+def stage_dir(batch_id: str, task_id: str) -> Path:
+    return paths.result_dir(batch_id) / task_id / "_stages"
+
+
+def _ckpt_path(batch_id: str, task_id: str, stage: str) -> Path:
+    return stage_dir(batch_id, task_id) / f"{stage}.json"
+
+
+def load(batch_id: str, task_id: str, stage: str, sha: Optional[str] = None) -> Optional[dict]:
+    """
+    체크포인트를 읽는다.
+    없거나 깨졌거나, 버전/SHA가 맞지 않으면 None (→ 단계 재실행).
+    """
+    p = _ckpt_path(batch_id, task_id, stage)
+    if not p.is_file():
+        return None
+    try:
+        data = json.loads(p.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if data.get("_v") != CKPT_VERSION:
+        return None
+    if sha and data.get("_sha") and data.get("_sha") != sha:
+        return None
+    return data
+
+
+def save(batch_id: str, task_id: str, stage: str, data: dict, sha: Optional[str] = None) -> Path:
+    """체크포인트를 temp 파일에 쓴 뒤 rename → 읽는 쪽이 반쯤 쓰인 파일을 보지 않는다."""
+    p = _ckpt_path(batch_id, task_id, stage)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(f".{p.name}.{os.getpid()}.tmp")
+    body = {**data, "_v": CKPT_VERSION, "_sha": sha, "_at": int(time.time())}
+    tmp.write_text(json.dumps(body, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, p)
+    return p
+
+
+def clear(batch_id: str, task_id: str) -> None:
+    """finalize 이후 체크포인트 폴더 정리 (없어도 조용히 무시)."""
+    shutil.rmtree(stage_dir(batch_id, task_id), ignore_errors=True)
+
+
+def prune_artifacts(batch_id: str, task_id: str) -> None:
+    """체크포인트(*.json)만 남기고 작업 폴더의 변환 산출물을 지운다 (없어도 조용히 무시)."""
+    d = stage_dir(batch_id, task_id)
+    try:
+        entries = list(d.iterdir())
+    except OSError:
+        return
+    for p in entries:
+        if p.suffix == ".json" and not p.name.startswith("."):
+            continue
+        try:
+            if p.is_dir():
+                shutil.rmtree(p, ignore_errors=True)
+            else:
+                p.unlink()
+        except OSError:
+            pass
+
+
+# ---------- in-flight registry ----------
+def touch_inflight(batch_id: str, task_id: str) -> None:
+    """진행 보고 시각 갱신. Redis 장애 시 파이프라인은 계속 진행."""
+    try:
+        _r.zadd(INFLIGHT_KEY, {f"{batch_id}/{task_id}": time.time()})
+    except Exception:
+        pass
+
+
+def clear_inflight(batch_id: str, task_id: str) -> None:
+    try:
+        _r.zrem(INFLIGHT_KEY, f"{batch_id}/{task_id}")
+    except Exception:
+        pass
+
+
+def stale_inflight(older_than_sec: int, limit: int = 100) -> List[Tuple[str, str]]:
+    """older_than_sec 동안 진행 보고가 없는 (batch_id, task_id) 목록"""
+    cutoff = time.time() - older_than_sec
+    try:
+        members = _r.zrangebyscore(INFLIGHT_KEY, 0, cutoff, start=0, num=limit)
+    except Exception:
+        return []
+    out = []
+    for m in members:
+        batch_id, _, task_id = m.partition("/")
+        if batch_id and task_id:
+            out.append((batch_id, task_id))
+    return out
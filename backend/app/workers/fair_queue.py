@@ -0,0 +1,223 @@
+# backend/app/workers/fair_queue.py
+"""
+process_pdf 공정(fair-share) 스케줄러 (Redis 기반).
+
+업로드된 작업을 바로 Celery 브로커(FIFO)에 넣지 않고 배치별 대기열에 쌓아 두었다가,
+워커 여유만큼만 꺼내서 투입한다.
+  - 배치 간 라운드로빈: 200개짜리 ZIP 배치와 1개짜리 배치가 번갈아 투입된다.
+  - priority 레인: 작은 단일 파일 업로드는 우선 레인에서 먼저 꺼내고, 브로커 우선순위도 높게 준다.
+  - 사용자별 동시 실행 상한(FAIR_USER_CONCURRENCY): 한 사용자가 워커를 독점하지 못한다.
+  - 전체 동시 실행 상한(FAIR_MAX_INFLIGHT): 브로커에 쌓이는 양을 워커 처리량 수준으로 제한해야
+    라운드로빈 순서가 FIFO에 묻히지 않는다 (대략 전체 워커 동시성에 맞춘다).
+
+Redis 키
+  fq:ring:{lane}        LIST  활성 배치 id 링 (LMOVE로 회전)
+  fq:active:{lane}      SET   링에 올라가 있는 배치 id
+  fq:batch:{batch_id}   LIST  배치 대기 작업(JSON)
+  fq:owner              HASH  batch_id → owner (대기 작업이 있는 동안만)
+  fq:running:{owner}    ZSET  사용자별 실행 중 task_id (score=투입 시각)
+  fq:inflight           ZSET  전체 실행 중 task_id
+  fq:claims             HASH  task_id → owner (release 시 역참조)
+"""
+from __future__ import annotations
+
+import json, logging, os, time
+from typing import Optional
+
+from celery.utils import uuid
+
+from utils.rcache import _r
+
+logger = logging.getLogger(__name__)
+
+FAIR_ENABLED = os.getenv("FAIR_SCHEDULING", "true").lower() == "true"
+FAIR_USER_CAP = int(os.getenv("FAIR_USER_CONCURRENCY", "4"))
+FAIR_MAX_INFLIGHT = int(os.getenv("FAIR_MAX_INFLIGHT", "16"))
+PRIORITY_MAX_BYTES = int(os.getenv("FAIR_PRIORITY_MAX_BYTES", str(20 * 1024 * 1024)))
+# 실행 중 표시가 이 시간보다 오래되면(워커 유실 등) 상한 계산에서 제외 → 카운터 자가 복구
+RUNNING_STALE_SEC = int(os.getenv("FAIR_RUNNING_STALE_SECONDS", str(6 * 3600)))
+
+LANES = ("priority", "normal")
+# Redis 브로커는 숫자가 작을수록 먼저 소비된다 (celery_app.broker_transport_options 참고)
+LANE_PRIORITY = {"priority": 0, "normal": 6}
+
+_INFLIGHT = "fq:inflight"
+_CLAIMS = "fq:claims"
+_OWNER = "fq:owner"
+
+
+def _ring(lane: str) -> str:
+    return f"fq:ring:{lane}"
+
+def _active(lane: str) -> str:
+    return f"fq:active:{lane}"
+
+def _batch_q(batch_id: str) -> str:
+    return f"fq:batch:{batch_id}"
+
+def _running(owner: str) -> str:
+    return f"fq:running:{owner}"
+
+
+# 대기열 push + (처음이면) 링 등록을 원자적으로 → pump가 빈 배치를 링에서 빼는 것과 경합해도 작업이 고립되지 않음
+_SUBMIT = _r.register_script("""
+redis.call('RPUSH', KEYS[1], ARGV[1])
+redis.call('HSET', KEYS[4], ARGV[2], ARGV[3])
+if redis.call('SADD', KEYS[2], ARGV[2]) == 1 then
+  redis.call('RPUSH', KEYS[3], ARGV[2])
+end
+return 1
+""")
+
+# 배치 대기열에서 하나 꺼내고, 비었으면 링에서 제거
+_POP = _r.register_script("""
+local job = redis.call('LPOP', KEYS[1])
+if redis.call('LLEN', KEYS[1]) == 0 then
+  redis.call('SREM', KEYS[2], ARGV[1])
+  redis.call('LREM', KEYS[3], 0, ARGV[1])
+  redis.call('HDEL', KEYS[4], ARGV[1])
+end
+return job
+""")
+
+# 투입 실패한 작업을 배치 대기열 맨 앞으로 되돌리고 (비어서 빠졌으면) 링에 다시 등록
+_REQUEUE = _r.register_script("""
+redis.call('LPUSH', KEYS[1], ARGV[1])
+redis.call('HSET', KEYS[4], ARGV[2], ARGV[3])
+if redis.call('SADD', KEYS[2], ARGV[2]) == 1 then
+  redis.call('RPUSH', KEYS[3], ARGV[2])
+end
+return 1
+""")
+
+
+def pick_lane(n_files: int, total_bytes: int) -> str:
+    """작은 단일 파일 업로드만 priority 레인"""
+    if n_files == 1 and 0 <= total_bytes <= PRIORITY_MAX_BYTES:
+        return "priority"
+    return "normal"
+
+
+def submit(*, owner: str, lane: str, kwargs: dict) -> str:
+    """
+    process_pdf 작업을 공정 대기열에 등록하고 task_id를 돌려준다(투입 전이라도 id는 확정).
+    FAIR_SCHEDULING=false 이면 바로 Celery에 투입한다.
+    kwargs: process_pdf의 keyword 인자(file_path, filename, batch_id, sha)
+    """
+    lane = lane if lane in LANES else "normal"
+    task_id = uuid()
+    job = {
+        "task_id": task_id,
+        "owner": owner,
+        "lane": lane,
+        "kwargs": {**kwargs, "enqueued_at": time.time(), "lane": lane},
+    }
+    if not FAIR_ENABLED:
+        _dispatch(job)
+        return task_id
+
+    batch_id = kwargs["batch_id"]
+    _SUBMIT(keys=[_batch_q(batch_id), _active(lane), _ring(lane), _OWNER],
+            args=[json.dumps(job, ensure_ascii=False), batch_id, owner])
+    pump()
+    return task_id
+
+
+def _dispatch(job: dict) -> None:
+    from workers.tasks import process_pdf   # 순환 import 방지
+
+    now = time.time()
+    task_id, owner = job["task_id"], job["owner"]
+    pipe = _r.pipeline()
+    pipe.zadd(_running(owner), {task_id: now})
+    pipe.zadd(_INFLIGHT, {task_id: now})
+    pipe.hset(_CLAIMS, task_id, owner)
+    pipe.execute()
+    try:
+        process_pdf.apply_async(
+            kwargs=job["kwargs"],
+            task_id=task_id,
+            priority=LANE_PRIORITY.get(job.get("lane"), LANE_PRIORITY["normal"]),
+        )
+    except Exception:
+        # 브로커 발행 실패: 슬롯을 돌려놓지 않으면 끝나지 않을 작업이 상한을 계속 차지한다
+        _unclaim(task_id, owner)
+        if FAIR_ENABLED:
+            lane = job.get("lane") if job.get("lane") in LANES else "normal"
+            batch_id = job["kwargs"]["batch_id"]
+            _REQUEUE(keys=[_batch_q(batch_id), _active(lane), _ring(lane), _OWNER],
+                     args=[json.dumps(job, ensure_ascii=False), batch_id, owner])
+        raise
+
+
+def _unclaim(task_id: str, owner: Optional[str]) -> None:
+    pipe = _r.pipeline()
+    pipe.hdel(_CLAIMS, task_id)
+    pipe.zrem(_INFLIGHT, task_id)
+    if owner:
+        pipe.zrem(_running(owner), task_id)
+    pipe.execute()
+
+
+def _count(key: str) -> int:
+    _r.zremrangebyscore(key, 0, time.time() - RUNNING_STALE_SEC)
+    return int(_r.zcard(key) or 0)
+
+
+def pump() -> int:
+    """
+    여유 슬롯만큼 priority → normal 레인 순으로, 레인 안에서는 배치 라운드로빈으로 투입한다.
+    동시에 하나의 pump만 돌도록 Redis 락을 잡는다(못 잡으면 다른 쪽이 이미 투입 중).
+    """
+    if not FAIR_ENABLED:
+        return 0
+    lock = _r.lock("fq:pump-lock", timeout=30)
+    if not lock.acquire(blocking=False):
+        return 0
+    dispatched = 0
+    try:
+        for lane in LANES:
+            idle = 0
+            while True:
+                if _count(_INFLIGHT) >= FAIR_MAX_INFLIGHT:
+                    return dispatched
+                n = int(_r.llen(_ring(lane)) or 0)
+                if n == 0 or idle >= n:
+                    break   # 이 레인은 비었거나 전부 사용자 상한에 걸림
+                batch_id = _r.lmove(_ring(lane), _ring(lane), "LEFT", "RIGHT")
+                if not batch_id:
+                    break
+                owner = _r.hget(_OWNER, batch_id) or "anon"
+                if _count(_running(owner)) >= FAIR_USER_CAP:
+                    idle += 1
+                    continue
+                raw = _POP(keys=[_batch_q(batch_id), _active(lane), _ring(lane), _OWNER], args=[batch_id])
+                if not raw:
+                    idle += 1
+                    continue
+                try:
+                    _dispatch(json.loads(raw))
+                except Exception as e:
+                    # 작업은 대기열로 되돌려졌다 → 이번 pump는 멈추고 다음 pump(주기 실행/release)에서 재시도
+                    logger.warning("fair_queue dispatch failed for batch %s: %s", batch_id, e)
+                    return dispatched
+                dispatched += 1
+                idle = 0
+        return dispatched
+    finally:
+        try:
+            lock.release()
+        except Exception:
+            pass
+
+
+def release(task_id: Optional[str]) -> None:
+    """작업 종료(성공/최종 실패) 시 슬롯 반납 후 다음 작업 투입. 여러 번 불려도 안전."""
+    if not task_id:
+        return
+    try:
+        _unclaim(task_id, _r.hget(_CLAIMS, task_id))
+        pump()
+    except Exception as e:
+        # Redis 장애 시 파이프라인 결과에는 영향 주지 않음
+        logger.warning("fair_queue.release failed for %s: %s", task_id, e)
@@ -1,5 +1,5 @@
 from __future__ import annotations
-import shutil, re, hashlib, json, logging, os, sys, time, unicodedata
+import shutil, re, hashlib, logging, os, sys, time, unicodedata, threading
 from pathlib import Path
 
 _THIS = os.path.abspath(__file__)
@@ -7,18 +7,29 @@ _APP_DIR = os.path.dirname(os.path.dirname(_THIS))   # .../backend/app
 if _APP_DIR not in sys.path:
     sys.path.insert(0, _APP_DIR)
 
-from .celery_app import celery
-from core.ocr_engine import extract_text_from_pdf
-from core.llm_engine import summarize_with_ollama
+from celery import chain
+from celery.exceptions import SoftTimeLimitExceeded
+from celery.signals import worker_ready, worker_process_shutdown, task_failure, task_success
+
+from .celery_app import celery, OCR_QUEUE, OCR_LONG_QUEUE
+from . import batch_stats, checkpoint, fair_queue
+from core.ocr_engine import extract_text_from_pdf, extract_text_from_image
+from core.llm_engine import summarize_with_ollama, warm_up_model
 from core.category_parser import (
     extract_llm_category,
     parse_category_by_keywords,
     normalize_to_two_levels,
 )
 from core.perf_recorder import perf_scope
-from utils.rcache import set_ocr_text
-from config import RESULT_DIR
-from converters import document_ingest
+from core.cost_model import record_actual
+from utils.rcache import get_ocr_text, set_ocr_text, publish_progress, _r
+from utils import blob_store, paths, result_store, task_index
+from config import (
+    COST_SHORT_SOFT_LIMIT, COST_SHORT_HARD_LIMIT,
+    COST_LONG_SOFT_LIMIT, COST_LONG_HARD_LIMIT,
+    IMAGE_EXTS,
+)
+from converters import document_ingest, loffice
 
 logger = logging.getLogger(__name__)
 
@@ -35,27 +46,59 @@ def make_changed_filename(original_name: str, salt: str = "") -> str:
     return f"{base}_{h}{ext or ''}"
 
 STAGE_PCT = {
-    "QUEUED": 0, "INGEST_START": 10, "INGEST_DONE": 40,
-    "OCR_START": 10, "OCR_DONE": 50,
+    "QUEUED": 0, "INGEST_START": 5, "INGEST_DONE": 40,
+    # 문서 변환(ingest)이 만든 PDF를 OCR할 때는 INGEST_DONE 아래로 되돌아가지 않게 그 지점에서 시작
+    "OCR_START": 10, "OCR_START_AFTER_INGEST": 40, "OCR_DONE": 50,
     "LLM_START": 70, "LLM_DONE": 90,
-    "CATEGORY_START": 92, "DONE": 100,
+    "CATEGORY_START": 92, "FINALIZE_START": 96, "DONE": 100,
 }
 
-@celery.task(
+DOC_INGEST_EXTS = {".doc", ".docx", ".hwp", ".hwpx", ".odt", ".rtf", ".txt", ".pptx", ".xlsx"}
+
+# 각 단계 공통 재시도 정책: 실패한 단계만 재시도되고, 이전 단계는 다시 돌지 않는다.
+# 단계는 체크포인트 덕분에 멱등이므로 acks_late로 두어, 워커 프로세스가 죽으면 메시지가 재전달되게 한다.
+_STAGE_OPTS = dict(
     bind=True,
-    name="app.workers.tasks.process_pdf",
     autoretry_for=(Exception,),
     retry_backoff=5,
     retry_jitter=True,
     max_retries=3,
+    acks_late=True,
+    reject_on_worker_lost=True,
 )
-def process_pdf(self, *, file_path: str, filename: str, batch_id: str, sha: str):
-    """파일 인식/요약/카테고리화 Celery Task"""
-    start = time.time()
+# 중간 단계(ingest/ocr/llm)의 반환값(ctx)은 체인 메시지로만 넘기고 결과 백엔드에는 저장하지 않는다.
+# 실패는 저장해야 체인 뒤쪽(작업 id를 가진 finalize)까지 FAILURE가 전파된다.
+_MID_STAGE_OPTS = dict(_STAGE_OPTS, ignore_result=True, store_errors_even_if_ignored=True)
+
+# 진행 보고가 이 시간 이상 끊긴 작업은 고아(orphan)로 보고 체크포인트에서 재개.
+# 한 단계가 보고 없이 돌 수 있는 최대 시간(가장 긴 hard time limit)보다 짧으면
+# 정상적으로 도는 long OCR까지 재투입되므로, 설정값이 작아도 그 시간 + 여유분 아래로는 내려가지 않는다.
+_MAX_STAGE_HARD_LIMIT = max(COST_SHORT_HARD_LIMIT, COST_LONG_HARD_LIMIT)
+ORPHAN_AFTER_SEC = max(int(os.getenv("PIPELINE_ORPHAN_SECONDS", "3600")), _MAX_STAGE_HARD_LIMIT + 600)
+# 결과 백엔드 상태가 이 중 하나면 아직 살아 있는 작업으로 보고 재투입하지 않는다
+_LIVE_STATES = ("PENDING", "STARTED", "RETRY", "RECEIVED")
+
+
+class _StageProgress:
+    """
+    단계별 진행률/ETA 보고기.
+    ingest → ocr → llm → finalize 가 서로 다른 태스크여도 같은 task_id(작업 id)로 PROGRESS를 올린다.
+    ETA 계산 상태(_hist)는 ctx["progress"]에 실어 다음 단계로 넘겨 진행률이 끊기지 않게 한다.
+    같은 내용을 배치 채널(progress:{batch_id})로도 발행해 SSE 구독자에게 바로 전달한다.
+    """
     TOTAL = 100
-    _hist = {"t": start, "p": 0.0, "ema": 0.0}
 
-    def _emit(stage_key: str, stage_label: str):
+    def __init__(self, task, ctx: dict):
+        self.task = task
+        self.ctx = ctx
+        self.task_id = ctx["task_id"]
+        self.filename = ctx["original_filename"]
+        self.start = ctx["start"]
+        self._hist = ctx.setdefault("progress", {"t": time.time(), "p": 0.0, "ema": 0.0})
+
+    def emit(self, stage_key: str, stage_label: str):
+        TOTAL = self.TOTAL
+        _hist = self._hist
         now = time.time()
         p = float(max(0, min(STAGE_PCT.get(stage_key, 0), TOTAL)))
         dt = max(1e-6, now - _hist["t"])
@@ -67,15 +110,141 @@ def process_pdf(self, *, file_path: str, filename: str, batch_id: str, sha: str)
         _hist.update({"t": now, "p": p, "ema": ema})
         meta = {
             "stage": stage_label, "current": int(p), "total": TOTAL,
-            "percent": int(round(p)), "start_time": int(start),
+            "percent": int(round(p)), "start_time": int(self.start),
             "eta_seconds": eta_seconds, "finish_at": finish_at,
-            "filename": filename,
+            "filename": self.filename,
         }
-        self.update_state(state="PROGRESS", meta=meta)
+        self.task.update_state(task_id=self.task_id, state="PROGRESS", meta=meta)
+        checkpoint.touch_inflight(self.ctx["batch_id"], self.task_id)
+        if stage_key != "DONE":
+            batch_stats.transition(self.ctx["batch_id"], self.task_id,
+                                   "queued" if stage_key == "QUEUED" else "progress", int(p))
+        # DONE은 결과가 백엔드에 저장된 뒤 task_success에서 SUCCESS로 발행
+        # (먼저 보내면 클라이언트가 아직 없는 결과를 조회할 수 있음)
+        if stage_key != "DONE":
+            publish_progress(self.ctx["batch_id"], {
+                "task_id": self.task_id, "batch_id": self.ctx["batch_id"],
+                "state": "PROGRESS", **meta,
+            })
 
-    task_id = self.request.id
-    ttl = int(os.getenv("OCR_CACHE_TTL", "3600"))
-    _emit("QUEUED", "QUEUED")
+
+def _ocr_route(cost: dict | None) -> dict:
+    """
+    비용 등급별 OCR 큐 + 시간 제한.
+    추정치가 없으면(예전 방식 투입) 기본 라우팅(task_routes)을 그대로 쓴다.
+    """
+    if not cost:
+        return {}
+    if cost.get("class") == "short":
+        return {"queue": OCR_QUEUE,
+                "soft_time_limit": COST_SHORT_SOFT_LIMIT, "time_limit": COST_SHORT_HARD_LIMIT}
+    return {"queue": OCR_LONG_QUEUE,
+            "soft_time_limit": COST_LONG_SOFT_LIMIT, "time_limit": COST_LONG_HARD_LIMIT}
+
+
+def build_pipeline(ctx: dict):
+    """
+    ingest → ocr → llm → finalize 체인.
+    마지막(finalize)이 작업 id를 이어받으므로 최종 결과/실패 상태도 그 id로 기록된다.
+    단계별 큐는 celery_app.task_routes 참고.
+    """
+    # 공정 스케줄러의 레인 우선순위를 모든 단계 메시지에 그대로 적용
+    prio = fair_queue.LANE_PRIORITY.get(ctx.get("lane") or "normal")
+    return chain(
+        ingest_stage.s(ctx).set(priority=prio),
+        ocr_stage.s().set(priority=prio, **_ocr_route(ctx.get("cost"))),
+        llm_stage.s().set(priority=prio),
+        finalize_stage.s().set(priority=prio),
+    )
+
+
+@celery.task(
+    bind=True,
+    name="app.workers.tasks.process_pdf",
+    autoretry_for=(Exception,),
+    retry_backoff=5,
+    retry_jitter=True,
+    max_retries=3,
+)
+def process_pdf(self, *, file_path: str, filename: str, batch_id: str, sha: str,
+                enqueued_at: float | None = None, lane: str | None = None,
+                cost: dict | None = None, sha256: str | None = None, owner: str | None = None):
+    """
+    파일 인식/요약/카테고리화 진입점.
+    실제 처리는 단계별 태스크 체인(build_pipeline)으로 자신을 교체(replace)해서 수행한다.
+    교체된 체인의 마지막 태스크가 같은 task_id를 이어받으므로 클라이언트는 기존 id로 계속 폴링하면 된다.
+    enqueued_at/lane은 fair_queue.submit이 채운다 (대기 시간 = 시작 시각 - enqueued_at).
+    cost는 업로드 시점 추정치(core.cost_model.estimate_cost) → OCR 단계 큐/시간 제한 결정.
+    sha256(전체 해시)이 같은 사용자(owner, fair_queue 단위)가 커밋한 결과와 같으면
+    OCR/LLM 체크포인트를 그 결과로 채워 두어 두 단계를 건너뛴다.
+    """
+    start = time.time()
+    queue_wait_ms = int(max(0.0, start - enqueued_at) * 1000) if enqueued_at else None
+    ctx = {
+        "task_id": self.request.id,
+        "batch_id": batch_id,
+        "start": start,
+        "file_path": file_path,
+        "original_filename": filename,  # 사용자가 올린 원래 이름(표시용)
+        "sha": sha,
+        "sha256": sha256,
+        "owner": owner,
+        "lane": lane or "normal",
+        "cost": cost,
+        "queue_wait_ms": queue_wait_ms,
+        "perf": [{"name": "queue_wait", "ms": queue_wait_ms}] if queue_wait_ms is not None else [],
+    }
+    if queue_wait_ms is not None:
+        logger.info("queue wait task=%s lane=%s wait=%sms", ctx["task_id"], ctx["lane"], queue_wait_ms)
+        record_queue_wait(ctx["lane"], queue_wait_ms)
+    _seed_from_committed(ctx)
+    # 재투입(recover_orphans) 시 이어서 처리할 수 있도록 작업 컨텍스트도 체크포인트로 남긴다
+    checkpoint.save(batch_id, ctx["task_id"], "ctx", ctx, sha)
+    _StageProgress(self, ctx).emit("QUEUED", "QUEUED")
+    raise self.replace(build_pipeline(ctx))
+
+
+def _seed_from_committed(ctx: dict) -> None:
+    """
+    같은 사용자가 커밋한 같은 내용(sha256)의 결과가 있으면 ocr/llm 체크포인트를 그 결과로 채운다
+    → ingest(문서 추출)/ocr/llm 단계가 체크포인트를 보고 그대로 통과, finalize만 새 작업 id로 결과를 쓴다.
+    OCR 원문은 결과에 없으므로 이전 작업의 원문 캐시가 남아 있을 때만 이어받는다.
+    원본 작업의 id는 로그에만 남기고 결과 레코드에는 넣지 않는다 (reused 여부만).
+    """
+    prior = blob_store.committed_result(ctx.get("owner"), ctx.get("sha256"))
+    if not prior:
+        return
+    task_id, batch_id, sha = ctx["task_id"], ctx["batch_id"], ctx["sha"]
+    try:
+        text = get_ocr_text(prior.get("task_id")) or ""
+    except Exception:
+        text = ""
+    checkpoint.save(batch_id, task_id, "ocr", {
+        "text": text,
+        "engine": "reuse",
+        "perf": [],
+        "pages": prior.get("pages"),
+        "ocr_stats": prior.get("ocr_stats") or {},
+    }, sha)
+    checkpoint.save(batch_id, task_id, "llm", {
+        "summary": prior.get("summary"),
+        "llm_ok": prior.get("llm_ok"),
+        "llm_meta": prior.get("llm_meta"),
+        "category": prior.get("category"),
+        "category_source": prior.get("category_source"),
+        "perf": [],
+    }, sha)
+    ctx["reused"] = True
+    logger.info("reusing committed result %s/%s for %s", prior.get("batch_id"), prior.get("task_id"), task_id)
+
+
+@celery.task(name="app.workers.tasks.ingest_stage", **_MID_STAGE_OPTS)
+def ingest_stage(self, ctx: dict):
+    """파일명 정규화 + 업로드 폴더로 이동 + (문서 포맷이면) 텍스트 추출"""
+    task_id, batch_id, sha = ctx["task_id"], ctx["batch_id"], ctx["sha"]
+    # 단계 시작 = 진행 보고 (앞 단계 뒤 큐 대기 시간이 고아 판정에 섞이지 않게)
+    checkpoint.touch_inflight(batch_id, task_id)
+    _emit = _StageProgress(self, ctx).emit
 
     # ========= 파일명 정규화(ASCII) + 단일 저장(이동) =========
     def _to_ascii_name(name: str) -> str:
@@ -90,23 +259,24 @@ def process_pdf(self, *, file_path: str, filename: str, batch_id: str, sha: str)
         s = re.sub(r"_+", "_", s).strip("._")
         return s[:64] or "file"
 
-    original_filename = filename  # 사용자가 올린 원래 이름(표시용)
+    original_filename = ctx["original_filename"]
     ascii_name = _to_ascii_name(original_filename)
     stem, ext = os.path.splitext(ascii_name)
     stem = _sanitize_stem(stem)
     short = hashlib.sha1((original_filename + (sha or "") + batch_id).encode("utf-8")).hexdigest()[:8]
     changed_filename = f"{stem}_{short}{(ext or '').lower()}"
 
-    UPLOADS_ROOT = Path(os.getenv("FILE_UPLOADS_DIR",
-                     Path(RESULT_DIR).resolve().parent / "uploads")).resolve()
-    upload_dir = (UPLOADS_ROOT / batch_id).resolve()
+    upload_dir = paths.upload_dir(batch_id)
     upload_dir.mkdir(parents=True, exist_ok=True)
 
     # 원본→정책명으로 '이동'(복사 금지). 이미 있으면 덮어쓰기.
-    src = Path(file_path).resolve()
+    src = Path(ctx["file_path"]).resolve()
+    dst = (upload_dir / changed_filename).resolve()
+    if not src.exists() and dst.exists():
+        # 재시도: 이전 시도에서 이미 이동됨
+        src = dst
     if not src.exists():
         raise FileNotFoundError(f"not found: {src}")
-    dst = (upload_dir / changed_filename).resolve()
     if src != dst:
         dst.parent.mkdir(parents=True, exist_ok=True)
         try:
@@ -125,43 +295,109 @@ def process_pdf(self, *, file_path: str, filename: str, batch_id: str, sha: str)
     except Exception:
         pass
 
-    # ===== OCR / INGESET / LLM / CATEGORY =====
-    with perf_scope() as perf:
-        text = ""
-        ocr_meta = {"perf": []}
-
-        ext = stored_path.suffix.lower()
-        if ext in {".doc", ".docx", ".hwp", ".hwpx", ".odt", ".rtf", ".txt"}:
-            _emit("INGEST_START", "INGEST")
-            try:
-                ingest = document_ingest.extract_text(str(stored_path))
-                if ingest.get("ok") and ingest.get("text"):
-                    text = ingest["text"]
-                    ocr_meta = {
-                        "engine": "ingest",
-                        "perf": ingest.get("perf", []),
-                        "pages": ingest.get("pages"),
-                        "ocr_stats": ingest.get("stats", {}),
-                    }
-                else:
-                    raise ValueError("Ingest returned no text")
-                _emit("INGEST_DONE", "INGEST")
-            except Exception:
-                _emit("OCR_START", "OCR")
-                text, ocr_meta = extract_text_from_pdf(str(stored_path))
-                _emit("OCR_DONE", "OCR")
-        else:
-            _emit("OCR_START", "OCR")
-            text, ocr_meta = extract_text_from_pdf(str(stored_path))
-            _emit("OCR_DONE", "OCR")
+    ctx.update({"changed_filename": changed_filename, "file_path": str(stored_path)})
+    checkpoint.save(batch_id, task_id, "ctx", ctx, sha)
 
+    # ===== INGEST (문서 포맷은 OCR 없이 텍스트 추출 시도) =====
+    if stored_path.suffix.lower() in DOC_INGEST_EXTS and checkpoint.load(batch_id, task_id, "ocr", sha) is None:
+        _emit("INGEST_START", "INGEST")
+        t0 = time.time()
         try:
-            set_ocr_text(task_id=task_id, text=text or "", ttl=ttl)
+            # 변환 산출물(PDF)은 체크포인트 폴더에 둔다 (ZIP 내보내기/원본 목록에서 제외)
+            ingest = document_ingest.extract_text(
+                str(stored_path), work_dir=str(checkpoint.stage_dir(batch_id, task_id)),
+                sha256=ctx.get("sha256"))
+            if ingest.get("ok") and ingest.get("text"):
+                checkpoint.save(batch_id, task_id, "ocr", {
+                    "text": ingest["text"],
+                    "engine": "ingest",
+                    "route": ingest.get("route"),
+                    "perf": ingest.get("perf", []),
+                    "pages": ingest.get("pages"),
+                    "ocr_stats": ingest.get("stats", {}),
+                }, sha)
+                checkpoint.prune_artifacts(batch_id, task_id)
+                _record_cost(ctx, time.time() - t0)
+                _emit("INGEST_DONE", "INGEST")
+            elif ingest.get("pdf_path"):
+                # 텍스트를 직접 뽑을 수 없는 포맷(doc/odt/rtf 등) → soffice로 만든 PDF를 OCR 단계가 처리
+                ctx["ocr_path"] = ingest["pdf_path"]
+                checkpoint.save(batch_id, task_id, "ctx", ctx, sha)
+                _emit("INGEST_DONE", "INGEST")
+            else:
+                raise ValueError(ingest.get("error") or "Ingest returned no text")
         except Exception as e:
-            logger.warning("set_ocr_text failed for %s: %s", task_id, e)
+            # 실패 시 OCR 단계에서 PDF 경로로 처리
+            logger.info("ingest fallback to OCR for %s: %s", task_id, e)
+
+    return ctx
+
+
+@celery.task(name="app.workers.tasks.ocr_stage", **_MID_STAGE_OPTS)
+def ocr_stage(self, ctx: dict):
+    """PDF 렌더링(이미지는 바로 디코딩) + Tesseract OCR (CPU 바운드 → prefork 풀). 체크포인트가 있으면 건너뛴다."""
+    task_id, batch_id, sha = ctx["task_id"], ctx["batch_id"], ctx["sha"]
+    checkpoint.touch_inflight(batch_id, task_id)
+    _emit = _StageProgress(self, ctx).emit
+
+    ocr = checkpoint.load(batch_id, task_id, "ocr", sha)
+    if ocr is None:
+        _emit("OCR_START_AFTER_INGEST" if ctx.get("ocr_path") else "OCR_START", "OCR")
+        t0 = time.time()
+        try:
+            src = ctx.get("ocr_path") or ctx["file_path"]
+            if Path(src).suffix.lower() in IMAGE_EXTS:
+                text, ocr_meta = extract_text_from_image(src)
+            else:
+                text, ocr_meta = extract_text_from_pdf(src)
+        except SoftTimeLimitExceeded:
+            cost = ctx.get("cost")
+            if not cost or cost.get("class") != "short":
+                raise
+            # 과소 추정: long 큐/시간 제한으로 한 번 승격해서 재시도
+            logger.warning("ocr exceeded short limit, escalating to long: %s", task_id)
+            cost["class"] = "long"
+            raise self.retry(args=(ctx,), countdown=0, **_ocr_route(cost))
+        _record_cost(ctx, time.time() - t0)
+        ocr = {
+            "text": text or "",
+            "engine": "ocr",
+            "perf": ocr_meta.get("perf", []),
+            "pages": ocr_meta.get("pages"),
+            "ocr_stats": ocr_meta.get("ocr_stats") or {},
+        }
+        checkpoint.save(batch_id, task_id, "ocr", ocr, sha)
+        # 텍스트가 체크포인트에 담겼으니 변환 PDF 등 작업 폴더 산출물은 더 필요 없다
+        checkpoint.prune_artifacts(batch_id, task_id)
+    _emit("OCR_DONE", "OCR")
+
+    ttl = int(os.getenv("OCR_CACHE_TTL", "3600"))
+    try:
+        set_ocr_text(task_id=task_id, text=ocr.get("text") or "", ttl=ttl)
+    except Exception as e:
+        logger.warning("set_ocr_text failed for %s: %s", task_id, e)
+
+    return ctx
 
+
+@celery.task(name="app.workers.tasks.llm_stage", **_MID_STAGE_OPTS)
+def llm_stage(self, ctx: dict):
+    """
+    LLM 요약/카테고리화 (llm 큐 전용).
+    I/O 대기 위주이므로 `-P threads` 같은 경량 풀에서 높은 동시성으로 돌린다.
+    """
+    task_id, batch_id, sha = ctx["task_id"], ctx["batch_id"], ctx["sha"]
+    checkpoint.touch_inflight(batch_id, task_id)
+    _emit = _StageProgress(self, ctx).emit
+
+    if checkpoint.load(batch_id, task_id, "llm", sha) is not None:
+        return ctx
+
+    text = (checkpoint.load(batch_id, task_id, "ocr", sha) or {}).get("text") or ""
+
+    with perf_scope() as perf:
         _emit("LLM_START", "LLM")
-        summary, llm_ok, llm_meta = summarize_with_ollama(text or "")
+        summary, llm_ok, llm_meta = summarize_with_ollama(text)
         _emit("LLM_DONE", "LLM")
 
         _emit("CATEGORY_START", "CATEGORY")
@@ -179,7 +415,7 @@ def process_pdf(self, *, file_path: str, filename: str, batch_id: str, sha: str)
         elif cat_from_raw:
             raw_category = cat_from_raw
         else:
-            raw_category = parse_category_by_keywords(text or "")
+            raw_category = parse_category_by_keywords(text)
 
         try:
             category = normalize_to_two_levels(raw_category)
@@ -189,42 +425,232 @@ def process_pdf(self, *, file_path: str, filename: str, batch_id: str, sha: str)
         category_source = (
             "llm_meta" if cat_from_meta else "llm_raw" if cat_from_raw else "backup_keywords"
         )
-        display_summary_two_lines = f"요약 : {(summary or '').strip()}\n\n카테고리 : {category}"
-        _emit("DONE", "DONE")
 
-    # ===== 결과 저장 =====
-    batch_dir = Path(RESULT_DIR).resolve() / batch_id
-    batch_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint.save(batch_id, task_id, "llm", {
+        "summary": summary,
+        "llm_ok": llm_ok,
+        "llm_meta": llm_meta,
+        "category": category,
+        "category_source": category_source,
+        "perf": (llm_meta or {}).get("perf", []) + perf.dump(),
+    }, sha)
+    return ctx
+
+
+@celery.task(name="app.workers.tasks.finalize_stage", **_STAGE_OPTS)
+def finalize_stage(self, ctx: dict):
+    """
+    결과 JSON/요약 파일 저장. 체인의 마지막 태스크라 작업 id의 최종 결과가 된다.
+    결과 백엔드에는 전체 레코드 대신 포인터(result_store.pointer)만 반환한다.
+    """
+    task_id, batch_id, sha = ctx["task_id"], ctx["batch_id"], ctx["sha"]
+    checkpoint.touch_inflight(batch_id, task_id)
+    _emit = _StageProgress(self, ctx).emit
+    _emit("FINALIZE_START", "FINALIZE")
+
+    ocr = checkpoint.load(batch_id, task_id, "ocr", sha) or {}
+    llm = checkpoint.load(batch_id, task_id, "llm", sha)
+    if llm is None:
+        raise RuntimeError(f"llm checkpoint missing for {batch_id}/{task_id}")
 
+    summary = llm.get("summary")
+    category = llm.get("category")
+    display_summary_two_lines = f"요약 : {(summary or '').strip()}\n\n카테고리 : {category}"
+
+    # ===== 결과 저장 =====
     result = {
         "task_id": task_id,
         "batch_id": batch_id,
-        "original_filename": original_filename,   # 표시용(한글 가능)
-        "changed_filename": changed_filename,     # 저장된 정책명(ASCII)
-        "file_path": str(stored_path),            # 절대경로
-        "sha": sha,
+        "original_filename": ctx["original_filename"],  # 표시용(한글 가능)
+        "changed_filename": ctx["changed_filename"],    # 저장된 정책명(ASCII)
+        "file_path": ctx["file_path"],                  # 절대경로
+        "sha": ctx["sha"],
+        "sha256": ctx.get("sha256"),
+        "reused": bool(ctx.get("reused")),
         "summary": summary,
         "summary_two_lines": display_summary_two_lines,
         "category": category,
         "category_name": category,
-        "category_source": category_source,
-        "llm_ok": llm_ok,
-        "perf": (ocr_meta.get("perf", []) + (llm_meta or {}).get("perf", []) + perf.dump()),
-        "pages": ocr_meta.get("pages"),
-        "ocr_stats": ocr_meta.get("ocr_stats") or {},
-        "llm_meta": llm_meta,
+        "category_source": llm.get("category_source"),
+        "llm_ok": llm.get("llm_ok"),
+        "perf": ctx.get("perf", []) + ocr.get("perf", []) + llm.get("perf", []),
+        "pages": ocr.get("pages"),
+        "ocr_stats": ocr.get("ocr_stats") or {},
+        "llm_meta": llm.get("llm_meta"),
+        "lane": ctx.get("lane"),
+        "queue_wait_ms": ctx.get("queue_wait_ms"),
+        "cost": ctx.get("cost"),
         "committed": False,
     }
 
-    (batch_dir / f"{task_id}.json").write_text(
-        json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8"
-    )
+    # 정본 <task>/meta.json 한 곳에만 기록 (<task>.json 은 링크)
+    result_path = result_store.write_result(batch_id, task_id, result)
+    task_index.put(task_id, batch_id, result_path)
+
+    llm_dir = result_path.parent / "llm"
+    llm_dir.mkdir(parents=True, exist_ok=True)
+    (llm_dir / "summary.txt").write_text(summary or "", encoding="utf-8")
+
+    checkpoint.clear(batch_id, task_id)
+    _emit("DONE", "DONE")
+    checkpoint.clear_inflight(batch_id, task_id)
+    fair_queue.release(task_id)
+    return result_store.pointer(result, result_path)
+
+
+@celery.task(name="app.workers.tasks.recover_orphans", ignore_result=True)
+def recover_orphans():
+    """
+    celery beat 주기 호출: 워커 크래시 등으로 진행 보고가 끊긴 작업을 체크포인트에서 재개한다.
+    - 이미 결과 JSON이 있거나 최종 상태(SUCCESS/FAILURE/REVOKED)면 레지스트리에서만 제거
+    - 워커가 실행/예약 중(inspect active/reserved/scheduled)이거나 결과 백엔드가 아직 대기/실행 상태로
+      보고하는 작업은 건너뜀 (같은 작업 체인이 둘이 되어 체크포인트/결과 파일을 두고 경쟁하지 않게)
+    - 아니면 저장된 ctx로 체인을 같은 작업 id로 다시 투입 (완료된 단계는 체크포인트로 건너뜀)
+    """
+    stale = checkpoint.stale_inflight(ORPHAN_AFTER_SEC)
+    if not stale:
+        return 0
+    live = _live_task_ids()
+    if live is None:
+        logger.warning("recover_orphans: worker inspect failed; skipping this sweep")
+        return 0
+
+    resumed = 0
+    for batch_id, task_id in stale:
+        state = (celery.AsyncResult(task_id).state or "").upper()
+        done = result_store.find(batch_id, task_id) is not None
+        if done or state in ("SUCCESS", "FAILURE", "REVOKED"):
+            checkpoint.clear_inflight(batch_id, task_id)
+            continue
+        if task_id in live or state in _LIVE_STATES:
+            continue
+
+        ctx = checkpoint.load(batch_id, task_id, "ctx")
+        if not ctx:
+            logger.warning("orphan %s/%s has no ctx checkpoint; dropping", batch_id, task_id)
+            checkpoint.clear_inflight(batch_id, task_id)
+            fair_queue.release(task_id)
+            continue
+
+        for k in ("_v", "_sha", "_at"):
+            ctx.pop(k, None)
+        checkpoint.touch_inflight(batch_id, task_id)
+        build_pipeline(ctx).apply_async(task_id=task_id)
+        resumed += 1
+        logger.info("resumed orphaned task %s/%s", batch_id, task_id)
+    return resumed
+
+
+def _live_task_ids() -> set | None:
+    """
+    워커가 실행 중이거나 받아 둔 작업 id 집합. 체인의 단계 태스크는 자기 id가 따로 있으므로
+    root_id와 ctx["task_id"](작업 id)도 함께 모은다. 조회 자체가 실패하면 None.
+    """
+    try:
+        insp = celery.control.inspect(timeout=2.0)
+        replies = [insp.active(), insp.reserved(), insp.scheduled()]
+    except Exception as e:
+        logger.warning("inspect failed: %s", e)
+        return None
+    live: set = set()
+    for reply in replies:
+        for reqs in (reply or {}).values():
+            for req in reqs or []:
+                req = req.get("request", req)   # scheduled()는 {"eta", "request"} 형태
+                live.update(x for x in (req.get("id"), req.get("root_id")) if x)
+                args = req.get("args") or []
+                if args and isinstance(args[0], dict) and args[0].get("task_id"):
+                    live.add(args[0]["task_id"])
+    return live
+
+
+STAGE_TASK_NAMES = {
+    "app.workers.tasks.process_pdf",
+    "app.workers.tasks.ingest_stage",
+    "app.workers.tasks.ocr_stage",
+    "app.workers.tasks.llm_stage",
+    "app.workers.tasks.finalize_stage",
+}
+
+
+@task_failure.connect
+def _release_slot_on_failure(sender=None, task_id=None, args=None, kwargs=None, **extra):
+    """재시도까지 모두 실패한 작업은 공정 스케줄러 슬롯을 반납하고 작업 폴더의 변환 산출물을 지운다 (체인이 거기서 멈추므로)."""
+    if getattr(sender, "name", None) not in STAGE_TASK_NAMES:
+        return
+    ctx = (args[0] if args and isinstance(args[0], dict) else None) or {}
+    job_id = ctx.get("task_id") or task_id
+    batch_id = ctx.get("batch_id") or (kwargs or {}).get("batch_id")
+    fair_queue.release(job_id)
+    if batch_id and job_id:
+        checkpoint.prune_artifacts(batch_id, job_id)
+    batch_stats.transition(batch_id, job_id, "failure")
+    publish_progress(batch_id, {
+        "task_id": job_id, "state": "FAILURE",
+        "percent": None, "eta_seconds": None, "finish_at": None,
+    })
+
+
+@task_success.connect
+def _publish_done(sender=None, result=None, **extra):
+    """finalize 결과가 저장된 뒤 SUCCESS 이벤트 발행 (폴링 응답과 같은 모양)"""
+    if getattr(sender, "name", None) != "app.workers.tasks.finalize_stage" or not isinstance(result, dict):
+        return
+    batch_stats.transition(result.get("batch_id"), result.get("task_id"), "success")
+    publish_progress(result.get("batch_id"), {
+        "task_id": result.get("task_id"), "batch_id": result.get("batch_id"),
+        "state": "SUCCESS", "percent": 100, "eta_seconds": 0, "finish_at": int(time.time()),
+    })
+
+
+def _record_cost(ctx: dict, actual_sec: float) -> None:
+    """추정 vs 실측 소요를 결과(ctx.cost)와 보정 샘플(core.cost_model)에 남긴다."""
+    cost = ctx.get("cost")
+    if not cost:
+        return
+    cost["actual_seconds"] = round(actual_sec, 2)
+    record_actual(cost, actual_sec)
+
+
+def record_queue_wait(lane: str, ms: int, keep: int = 10000) -> None:
+    """레인별 최근 대기 시간 샘플 (SLO 확인용: fq:wait:{lane} 리스트, 최신순)"""
+    try:
+        pipe = _r.pipeline()
+        pipe.lpush(f"fq:wait:{lane}", ms)
+        pipe.ltrim(f"fq:wait:{lane}", 0, keep - 1)
+        pipe.execute()
+    except Exception:
+        pass
+
+
+@celery.task(name="app.workers.tasks.pump_fair_queue", ignore_result=True)
+def pump_fair_queue():
+    """celery beat 안전망: 이벤트(submit/release)로 못 채운 빈 슬롯을 주기적으로 채운다."""
+    return fair_queue.pump()
+
+
+@worker_process_shutdown.connect
+def _stop_loffice_pool(**kwargs):
+    """prefork 자식은 os._exit로 끝나 atexit이 돌지 않는다 → 상주 soffice를 여기서 정리"""
+    loffice.shutdown_pool()
+
+
+# ───────────────────────────────────────────────
+# Ollama 모델 상주 관리 (warm-up / heartbeat)
+# ───────────────────────────────────────────────
+@worker_ready.connect
+def _warm_ollama_on_boot(sender=None, **kwargs):
+    """워커 부팅 직후 모델을 미리 로드해서 첫 태스크가 로딩 지연을 떠안지 않게 한다."""
+    if os.getenv("OLLAMA_WARMUP_ON_BOOT", "true").lower() != "true":
+        return
+    # 로딩에 수십 초가 걸릴 수 있으므로 consumer를 막지 않게 별도 스레드에서 수행
+    threading.Thread(target=warm_up_model, name="ollama-warmup", daemon=True).start()
 
-    task_dir = batch_dir / task_id
-    (task_dir / "llm").mkdir(parents=True, exist_ok=True)
-    (task_dir / "llm" / "summary.txt").write_text(summary or "", encoding="utf-8")
-    (task_dir / "meta.json").write_text(
-        json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8"
-    )
 
-    return result
\ No newline at end of file
+@celery.task(name="app.workers.tasks.ollama_heartbeat", ignore_result=True)
+def ollama_heartbeat():
+    """celery beat 주기 호출: keep_alive 갱신 + 콜드스타트(load_ms) 기록"""
+    info = warm_up_model()
+    if info.get("load_ms"):
+        logger.info("ollama cold start on heartbeat: %sms", info["load_ms"])
+    return info
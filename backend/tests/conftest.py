@@ -0,0 +1,7 @@
+# backend/tests/conftest.py
+import os, sys
+
+# 앱 모듈은 backend/app 기준으로 import 된다 (workers.tasks, core.ocr_engine, ...)
+_APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+if _APP_DIR not in sys.path:
+    sys.path.insert(0, _APP_DIR)
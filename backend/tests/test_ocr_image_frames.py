@@ -0,0 +1,65 @@
+# backend/tests/test_ocr_image_frames.py
+"""
+이미지 OCR 프레임 이터레이터: 깨진 프레임 하나 때문에 뒤 프레임을 버리지 않고,
+MPO(휴대폰 사진)는 JPEG처럼 draft 축소 + 첫 프레임만 OCR 한다.
+"""
+import pytest
+
+pytest.importorskip("celery")
+pytest.importorskip("fitz")
+pytest.importorskip("pytesseract")
+Image = pytest.importorskip("PIL.Image")
+
+from PIL import JpegImagePlugin      # MpoImageFile은 JpegImageFile.draft()를 상속
+
+from core import cost_model, ocr_engine
+
+
+def _tiff(path, n):
+    frames = [Image.new("RGB", (40, 30), (i * 40, 0, 0)) for i in range(n)]
+    frames[0].save(path, save_all=True, append_images=frames[1:])
+    return path
+
+
+def test_bad_frame_is_skipped(tmp_path, monkeypatch):
+    src = _tiff(tmp_path / "scan.tiff", 3)
+    real_fit = ocr_engine._fit_frame
+    calls = []
+
+    def flaky_fit(frame, max_side):
+        calls.append(frame)
+        if len(calls) == 2:
+            raise OSError("broken data stream")
+        return real_fit(frame, max_side)
+
+    monkeypatch.setattr(ocr_engine, "_fit_frame", flaky_fit)
+    frames = list(ocr_engine._image_frames(str(src), 0))
+
+    assert len(calls) == 3
+    assert [f.getpixel((0, 0))[0] for f, _ in frames] == [0, 80]
+
+
+def test_mpo_uses_draft_and_first_frame_only(tmp_path, monkeypatch):
+    src = tmp_path / "photo.jpg"
+    first = Image.new("RGB", (800, 600), (255, 255, 255))
+    first.save(src, format="MPO", save_all=True, append_images=[Image.new("RGB", (800, 600))])
+    with Image.open(src) as im:
+        if im.format != "MPO":
+            pytest.skip("Pillow build cannot write MPO")
+
+    drafted = []
+    real_draft = JpegImagePlugin.JpegImageFile.draft
+
+    def spy_draft(self, mode, size):
+        drafted.append(size)
+        return real_draft(self, mode, size)
+
+    monkeypatch.setattr(JpegImagePlugin.JpegImageFile, "draft", spy_draft)
+    frames = list(ocr_engine._image_frames(str(src), 200))
+
+    assert drafted
+    assert len(frames) == 1
+    assert max(frames[0][0].size) <= 200
+    assert ocr_engine._count_frames(str(src)) == 1
+    # 비용 추정도 같은 규칙 → 휴대폰 사진이 ocr_long으로 잘못 가지 않는다
+    assert cost_model.estimate_cost(str(src))["pages"] == 1
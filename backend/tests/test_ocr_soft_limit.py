@@ -0,0 +1,92 @@
+# backend/tests/test_ocr_soft_limit.py
+"""
+short 클래스 OCR이 소프트 시간 제한에 걸리면 ocr_engine이 예외를 삼키지 않고 올려서,
+ocr_stage가 ocr_long 큐 / long 시간 제한으로 재시도해야 한다.
+"""
+import pytest
+
+pytest.importorskip("celery")
+pytest.importorskip("fitz")
+pytest.importorskip("pytesseract")
+Image = pytest.importorskip("PIL.Image")
+
+from celery.exceptions import Retry, SoftTimeLimitExceeded
+
+from config import COST_LONG_HARD_LIMIT, COST_LONG_SOFT_LIMIT
+from core import ocr_engine
+from workers import tasks
+from workers.celery_app import OCR_LONG_QUEUE
+
+
+class _Page:
+    def get_text(self, kind="text"):
+        return ""            # 텍스트 레이어 없음 → OCR 경로
+
+    def get_pixmap(self, dpi=300):
+        return object()
+
+
+class _Doc:
+    def __init__(self, n=3):
+        self._pages = [_Page() for _ in range(n)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __len__(self):
+        return len(self._pages)
+
+    def __iter__(self):
+        return iter(self._pages)
+
+
+@pytest.fixture
+def soft_limit_in_tesseract(monkeypatch):
+    calls = []
+
+    def _image_to_string(*a, **k):
+        calls.append(1)
+        raise SoftTimeLimitExceeded()
+
+    monkeypatch.setattr(ocr_engine.fitz, "open", lambda path: _Doc())
+    monkeypatch.setattr(ocr_engine, "_pixmap_to_pil", lambda pix: Image.new("RGB", (40, 40), "white"))
+    monkeypatch.setattr(ocr_engine.pytesseract, "image_to_string", _image_to_string)
+    return calls
+
+
+def test_engine_propagates_soft_time_limit(soft_limit_in_tesseract):
+    with pytest.raises(SoftTimeLimitExceeded):
+        ocr_engine.extract_text_from_pdf("scan.pdf")
+    # 첫 페이지에서 바로 중단 (나머지 페이지/폴백 패스로 넘어가지 않음)
+    assert soft_limit_in_tesseract == [1]
+
+
+def test_short_job_escalates_to_long_queue(soft_limit_in_tesseract, monkeypatch):
+    monkeypatch.setattr(tasks.checkpoint, "load", lambda *a, **k: None)
+    monkeypatch.setattr(tasks.checkpoint, "save", lambda *a, **k: None)
+    monkeypatch.setattr(tasks.checkpoint, "touch_inflight", lambda *a, **k: None)
+    monkeypatch.setattr(tasks._StageProgress, "emit", lambda self, *a, **k: None)
+
+    retried = {}
+
+    def _retry(*args, **kwargs):
+        retried.update(kwargs)
+        raise Retry()
+
+    monkeypatch.setattr(tasks.ocr_stage, "retry", _retry)
+
+    ctx = {
+        "task_id": "t-short", "batch_id": "b1", "sha": "abc", "start": 0,
+        "original_filename": "scan.pdf", "file_path": "scan.pdf", "cost": {"class": "short", "kind": "pdf_scan"},
+    }
+    with pytest.raises(Retry):
+        tasks.ocr_stage.run(ctx)
+
+    assert retried["queue"] == OCR_LONG_QUEUE
+    assert retried["soft_time_limit"] == COST_LONG_SOFT_LIMIT
+    assert retried["time_limit"] == COST_LONG_HARD_LIMIT
+    assert retried["args"][0]["cost"]["class"] == "long"
+    assert "exc" not in retried     # autoretry(일반 실패 재시도)가 아니라 승격 경로
@@ -22,6 +22,9 @@ import {
 
 import {
   uploadFile,                    // XHR 업로드 (onprogress 지원)
+  uploadResumable,               // 큰 파일: 청크 이어받기 업로드
+  RESUMABLE_MIN_BYTES,
+  uploadByHashIfKnown,           // 서버에 같은 내용이 있으면 본문 없이 등록
   createBatchProgressManager,    // 배치 폴링 매니저
   absUrl,
   authHeaders,
@@ -498,7 +501,8 @@ export default function UploadPage() {
       try {
         // 1) 업로드(진행도)
         const rel = cur.file?.webkitRelativePath || cur.file?._relPath || "";
-        const data = await uploadFile({
+        const send = cur.file?.size >= RESUMABLE_MIN_BYTES ? uploadResumable : uploadFile;
+        const data = (await uploadByHashIfKnown({ file: cur.file })) || await send({
           file: cur.file,
           url: "/api/v1/ocr/upload",
           signal: controller.signal,
@@ -574,7 +578,8 @@ export default function UploadPage() {
 
         if (!taskId) throw new Error("업로드 응답에 task_id가 없습니다.");
 
-        // 3) 업로드 완료 표기 + 배치 폴링 등록
+        // 3) 업로드 완료 표기 + 진행도 구독 등록
+        //    파일마다 배치가 달라도 세션 공용 SSE 연결 1개로 받는다 (연결이 닫히면 폴링)
         setItems((prev) =>
           prev.map((it) =>
             it.id === id
@@ -582,7 +587,7 @@ export default function UploadPage() {
               : it
           )
         );
-        progressMgr.watch(taskId);
+        progressMgr.watch(taskId, batchId);
       } catch (err) {
         setItems((prev) =>
           prev.map((it) =>
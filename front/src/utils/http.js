@@ -225,6 +225,106 @@ export function uploadFiles({
   });
 }
 
+// ============================================
+//  이어받기(resumable) 업로드 — 큰 파일을 청크로 보내고, 끊기면 서버 offset부터 재개
+//  POST /api/v1/ocr/uploads → PUT /uploads/{id}?offset=N × n → POST /uploads/{id}/finalize
+//  완료 응답은 /api/v1/ocr/upload 와 같은 형식 ({ batch_id, tasks: [...] })
+// ============================================
+export const RESUMABLE_MIN_BYTES = 16 * 1024 * 1024;
+
+function putChunk({ url, blob, onLoaded, signal, timeoutMs, withCredentials }) {
+  return new Promise((resolve, reject) => {
+    const xhr = new XMLHttpRequest();
+    xhr.open("PUT", absUrl(url), true);
+    const token = getToken();
+    if (token) xhr.setRequestHeader("Authorization", `Bearer ${token}`);
+    xhr.setRequestHeader("Content-Type", "application/octet-stream");
+    if (withCredentials) xhr.withCredentials = true;
+    setupXhr({ xhr, signal, timeoutMs });
+    xhr.upload.onprogress = (evt) => onLoaded?.(evt.loaded);
+    xhr.onload = () => handleXhrDone(xhr, resolve, reject);
+    xhr.onerror = () => reject(new Error("네트워크 오류"));
+    xhr.onabort = () => reject(new Error("사용자 취소"));
+    xhr.ontimeout = () => reject(new Error("요청이 시간 초과되었습니다."));
+    xhr.send(blob);
+  });
+}
+
+export async function uploadResumable({
+  file, onProgress, signal, batchId, chunkSize = 8 * 1024 * 1024, maxRetries = 5,
+  timeoutMs, withCredentials,
+}) {
+  const base = "/api/v1/ocr/uploads";
+  const session = await jsonFetch(base, {
+    method: "POST",
+    body: { filename: file.name, size: file.size, batch_id: batchId || null },
+  });
+  const id = session.upload_id;
+  const size = file.size;
+  const step = Math.min(chunkSize, session.chunk_max || chunkSize);
+  let offset = session.offset || 0;
+  let retries = 0;
+
+  const report = (loaded) => {
+    if (typeof onProgress !== "function") return;
+    onProgress(Math.round((loaded / size) * 100), { loaded, total: size, ts: Date.now() });
+  };
+
+  while (offset < size) {
+    if (signal?.aborted) throw new Error("사용자 취소");
+    const end = Math.min(size, offset + step);
+    try {
+      const res = await putChunk({
+        url: `${base}/${id}?offset=${offset}`,
+        blob: file.slice(offset, end),
+        onLoaded: (n) => report(offset + n),
+        signal, timeoutMs, withCredentials,
+      });
+      offset = res.offset;
+      retries = 0;
+    } catch (e) {
+      if (signal?.aborted || retries >= maxRetries) throw e;
+      retries += 1;
+      await new Promise((r) => setTimeout(r, Math.min(1000 * 2 ** retries, 15000)));
+      // 서버가 실제로 받은 지점부터 다시
+      const st = await jsonFetch(`${base}/${id}`).catch(() => null);
+      if (st && typeof st.offset === "number") offset = st.offset;
+    }
+  }
+  report(size);
+  return jsonFetch(`${base}/${id}/finalize`, { method: "POST" });
+}
+
+// ============================================
+//  내용 해시(SHA-256)로 서버 보유 여부를 먼저 확인 → 이미 있으면 본문 없이 등록
+//  (크기 상한 이하 파일만: 브라우저에서 파일 전체를 읽어 해시를 계산하므로)
+// ============================================
+export const HASH_CHECK_MAX_BYTES = 64 * 1024 * 1024;
+
+export async function sha256Hex(file) {
+  const digest = await crypto.subtle.digest("SHA-256", await file.arrayBuffer());
+  return Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, "0")).join("");
+}
+
+// 서버에 같은 내용이 있으면 /upload 와 같은 형식의 응답, 없으면(또는 확인 실패 시) null
+export async function uploadByHashIfKnown({ file, batchId }) {
+  if (!file || file.size > HASH_CHECK_MAX_BYTES || !globalThis.crypto?.subtle) return null;
+  try {
+    const sha256 = await sha256Hex(file);
+    const chk = await jsonFetch("/api/v1/ocr/blobs/check", {
+      method: "POST",
+      body: { hashes: [sha256] },
+    });
+    if (!chk?.known?.includes(sha256)) return null;
+    return await jsonFetch("/api/v1/ocr/upload-by-hash", {
+      method: "POST",
+      body: { sha256, filename: file.name, batch_id: batchId || null },
+    });
+  } catch {
+    return null;
+  }
+}
+
 export function convertFile({ file, onProgress, signal, timeoutMs, withCredentials }) {
   console.warn("[convertFile] Deprecated: /ocr/tesseract 등 단일화된 OCR 엔드포인트를 쓰는 게 권장됩니다.");
   return uploadFile({ file, url: "/convert", onProgress, signal, timeoutMs, withCredentials });
@@ -551,37 +651,134 @@ export async function getProgressBatch(ids = []) {
   return data?.results || {};
 }
 
-//  배치 폴링 매니저
-//      - watch(taskId)로 등록하면 1초마다 묶어서 조회
+//  배치 진행도 매니저
+//      - watch(taskId, batchId): batchId가 있으면 SSE 스트림으로 구독
+//        업로드 세션 전체가 EventSource 1개(/api/v1/progress/stream?batches=a,b,...)를 공유
+//        (배치마다 연결을 열면 브라우저의 호스트당 연결 6개 제한을 금방 다 써 버린다)
+//      - 구독 배치가 바뀌면 스트림을 새 목록으로 다시 연다 (재연결 시 snapshot으로 빈틈 보정)
+//      - 일시적 오류는 EventSource가 스스로 재연결하므로 그대로 두고,
+//        연결이 완전히 닫혔을 때(readyState === CLOSED)만 1초 폴링(/api/v1/progress/batch)으로 전환
 //      - onUpdate(results)로 { [taskId]: {percent, eta_seconds, ...} } 전달
-export function createBatchProgressManager({ intervalMs = 1000 } = {}) {
-  let ids = new Set();
+export function createBatchProgressManager({ intervalMs = 1000, useStream = true } = {}) {
+  let ids = new Set();             // 폴링 대상
+  let batchOf = new Map();         // taskId -> batchId (스트림으로 받는 작업)
+  let es = null;                   // 세션 공용 EventSource
+  let streamKey = "";              // 현재 스트림이 구독 중인 배치 목록(정렬, 쉼표 구분)
+  let reopenTimer = null;
+  let streamBroken = false;        // 한 번 CLOSED 되면 이후 작업은 폴링으로
   let timer = null;
+  let handler = null;
+
+  const isDone = (v) => v?.state === "SUCCESS" || v?.state === "FAILURE" || v?.percent === 100;
+  const canStream = () =>
+    useStream && !streamBroken && typeof window !== "undefined" && "EventSource" in window;
+
+  function deliver(results) {
+    if (!results || Object.keys(results).length === 0) return;
+    handler?.(results);
+    // 완료/실패는 자동 제거
+    for (const [tid, v] of Object.entries(results)) {
+      if (isDone(v)) unwatch(tid);
+    }
+  }
+
+  function closeStream() {
+    if (reopenTimer) { clearTimeout(reopenTimer); reopenTimer = null; }
+    if (es) { es.close(); es = null; }
+    streamKey = "";
+  }
+
+  // 스트림이 완전히 닫힘 → 스트림으로 보던 작업 전부 폴링으로
+  function fallbackToPolling() {
+    closeStream();
+    streamBroken = true;
+    for (const tid of batchOf.keys()) ids.add(tid);
+    batchOf = new Map();
+  }
+
+  function openStream() {
+    const batches = Array.from(new Set(batchOf.values())).sort();
+    const key = batches.join(",");
+    if (key === streamKey) return;
+    if (es) { es.close(); es = null; }
+    streamKey = key;
+    if (batches.length === 0) return;
+
+    const qs = new URLSearchParams({ batches: key });
+    const source = new EventSource(absUrl(`/api/v1/progress/stream?${qs}`));
+    es = source;
+
+    // 연결(재연결 포함) 직후 스냅샷: 구독 전에 지나간 상태 보정 (내가 보는 작업만)
+    source.addEventListener("snapshot", (e) => {
+      const all = safeJsonParse(e.data, {})?.results || {};
+      const mine = {};
+      for (const [tid, v] of Object.entries(all)) {
+        if (batchOf.has(tid)) mine[tid] = v;
+      }
+      deliver(mine);
+    });
+    source.addEventListener("progress", (e) => {
+      const v = safeJsonParse(e.data, null);
+      if (v?.task_id && batchOf.has(v.task_id)) deliver({ [v.task_id]: v });
+    });
+    source.onerror = () => {
+      if (source !== es) return;   // 이미 교체된 스트림
+      if (source.readyState === EventSource.CLOSED) {
+        console.warn("progress stream closed, falling back to polling");
+        fallbackToPolling();
+      }
+      // CONNECTING: 브라우저가 재연결 중 → 기다린다
+    };
+  }
+
+  // 같은 틱에 여러 파일이 watch/unwatch 되어도 스트림은 한 번만 다시 연다
+  function scheduleReopen() {
+    if (reopenTimer) return;
+    reopenTimer = setTimeout(() => { reopenTimer = null; openStream(); }, 0);
+  }
 
-  async function tick(onUpdate) {
+  async function tick() {
     if (ids.size === 0) return;
     try {
-      const results = await getProgressBatch(Array.from(ids));
-      onUpdate?.(results);
-      // 완료/실패는 자동 제거
-      for (const [tid, v] of Object.entries(results)) {
-        if (v.state === "SUCCESS" || v.state === "FAILURE" || v.percent === 100) {
-          ids.delete(tid);
-        }
-      }
+      deliver(await getProgressBatch(Array.from(ids)));
     } catch (e) {
       console.error("batch progress error", e);
     }
   }
 
   function start(onUpdate) {
+    handler = onUpdate;
     if (timer) return;
-    timer = setInterval(() => tick(onUpdate), intervalMs);
+    timer = setInterval(tick, intervalMs);
+  }
+  function stop() {
+    if (timer) { clearInterval(timer); timer = null; }
+    closeStream();
+  }
+  function watch(tid, batchId) {
+    if (!tid) return;
+    if (batchId && canStream()) {
+      const isNewBatch = ![...batchOf.values()].includes(batchId);
+      batchOf.set(tid, batchId);
+      if (isNewBatch) scheduleReopen();
+    } else {
+      ids.add(tid);
+    }
+  }
+  function unwatch(tid) {
+    ids.delete(tid);
+    const b = batchOf.get(tid);
+    if (b === undefined) return;
+    batchOf.delete(tid);
+    // 볼 작업이 하나도 없으면 스트림 종료 (끝난 배치만 빠질 때는 재연결하지 않고 이벤트만 무시)
+    if (batchOf.size === 0) closeStream();
+  }
+  function reset() {
+    ids = new Set();
+    batchOf = new Map();
+    streamBroken = false;
+    closeStream();
   }
-  function stop() { if (timer) { clearInterval(timer); timer = null; } }
-  function watch(tid) { if (tid) ids.add(tid); }
-  function unwatch(tid) { ids.delete(tid); }
-  function reset() { ids = new Set(); }
 
   return { start, stop, watch, unwatch, reset };
 }
\ No newline at end of file